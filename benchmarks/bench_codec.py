@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark files/awx_codec.py against the stdlib json paths it replaced.
+
+Builds a synthetic awx-manage style export (roles, memberships, teams,
+organizations, job templates with nested extra_vars/survey data), then times
+the three hot paths:
+
+  1. transform_export read+write: json.load + json.dump(indent=2)
+  2. the same with awx_codec.load_file + dump_file (pretty and --compact)
+  3. emit(): json.dumps(separators) vs awx_codec.dumps per event line
+
+Usage:
+  python3 benchmarks/bench_codec.py [--job-templates 60000] [--events 200000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "files"))
+import awx_codec  # noqa: E402
+
+
+def synthetic_export(n_jt: int) -> dict:
+    rnd = random.Random(42)
+    users = [f"user{i:05d}" for i in range(max(50, n_jt // 20))]
+    return {
+        "users": [{"username": u, "email": f"{u}@example.com", "first_name": "Ünïcode"} for u in users],
+        "roles": [{"user": rnd.choice(users), "role": "admin", "content_object": i} for i in range(n_jt)],
+        "memberships": [{"user": rnd.choice(users), "team": i % 200} for i in range(n_jt // 2)],
+        "teams": [{"name": f"team{i}", "members": rnd.sample(users, 10)} for i in range(200)],
+        "organizations": [{"name": f"org{i}", "created_by": rnd.choice(users), "modified_by": rnd.choice(users)}
+                          for i in range(50)],
+        "job_templates": [
+            {
+                "name": f"jt-{i}", "created_by": rnd.choice(users), "modified_by": rnd.choice(users),
+                "playbook": "site.yml", "forks": 0, "verbosity": rnd.randint(0, 4), "limit": "",
+                "extra_vars": "---\n" + "\n".join(f"var_{k}: {rnd.random()}" for k in range(8)),
+                "survey_spec": {"name": "", "description": "", "spec": [
+                    {"variable": f"q{k}", "type": "text", "question_name": f"Question {k}",
+                     "required": bool(k % 2), "default": "x" * 20} for k in range(5)]},
+            }
+            for i in range(n_jt)
+        ],
+    }
+
+
+def best_of(fn, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--job-templates", type=int, default=60000)
+    ap.add_argument("--events", type=int, default=200000)
+    args = ap.parse_args()
+
+    print(f"codec backend: {awx_codec.BACKEND}")
+    data = synthetic_export(args.job_templates)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "export.json")
+        out = os.path.join(tmp, "out.json")
+        with open(src, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"synthetic export: {os.path.getsize(src) / 1e6:.1f} MB, {args.job_templates} job templates")
+
+        def stdlib_roundtrip() -> None:
+            with open(src, "r", encoding="utf-8") as f:
+                d = json.load(f)
+            with open(out, "w", encoding="utf-8") as f:
+                json.dump(d, f, indent=2)
+
+        def codec_roundtrip(compact: bool) -> None:
+            awx_codec.dump_file(awx_codec.load_file(src), out, compact=compact)
+
+        base = best_of(stdlib_roundtrip)
+        pretty = best_of(lambda: codec_roundtrip(False))
+        compact = best_of(lambda: codec_roundtrip(True))
+        compact_size = os.path.getsize(out)
+        print(f"transform_export I/O  stdlib        {base:7.2f}s")
+        print(f"transform_export I/O  codec pretty  {pretty:7.2f}s  ({base / pretty:4.1f}x)")
+        print(f"transform_export I/O  codec compact {compact:7.2f}s  ({base / compact:4.1f}x, "
+              f"{compact_size / 1e6:.1f} MB)")
+
+    rec = {"ts": "2025-01-01T00:00:00+00:00", "event": "schedule.create.ok", "attempt": 1, "variant": "full-id",
+           "name": "nightly", "ujt": "1877", "timezone": "America/Chicago",
+           "rrule": "DTSTART;TZID=America/Chicago:20250101T010000\nRRULE:FREQ=DAILY;INTERVAL=1"}
+    n = args.events
+    t_std = best_of(lambda: [json.dumps(rec, separators=(",", ":"), ensure_ascii=False) for _ in range(n)])
+    t_cod = best_of(lambda: [awx_codec.dumps(rec) for _ in range(n)])
+    print(f"emit() encode x{n}   stdlib {t_std:6.2f}s  codec {t_cod:6.2f}s  ({t_std / t_cod:4.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
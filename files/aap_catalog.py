@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+In-memory catalog of the AAP (target) objects a migration resolves by name.
+
+Catalog.load() pages each endpoint once at startup into dict indexes:
+
+- by (name, organization) for projects, job templates, credentials,
+  notification templates and inventories (read with ?organization=<org>)
+- by name for credential types and execution environments (read unfiltered;
+  both are often global, organization null)
+- by id for all of them
+
+Lookups are then dict hits instead of one ?name= query each. The migrators
+call add() with every object they create, so the catalog stays current for
+the rest of the run. Recovery lookups after an ambiguous create failure must
+still ask AAP; the catalog only knows what this process has seen.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import awx_http
+
+ORG_KINDS = ("projects", "job_templates", "credentials", "notification_templates", "inventories")
+GLOBAL_KINDS = ("credential_types", "execution_environments")
+KINDS = ORG_KINDS + GLOBAL_KINDS
+
+
+class Catalog:
+    def __init__(self, aap_host: str, token: str, verify: bool, org_id: int,
+                 kinds: Iterable[str] = KINDS) -> None:
+        self.aap_host = aap_host
+        self.token = token
+        self.verify = verify
+        self.org_id = org_id
+        self.kinds = tuple(kinds)
+        for kind in self.kinds:
+            if kind not in KINDS:
+                raise ValueError(f"unknown catalog kind: {kind}")
+        self._lock = threading.Lock()
+        self._by_id: Dict[str, Dict[int, Dict[str, Any]]] = {k: {} for k in self.kinds}
+        self._by_name: Dict[str, Dict[Tuple[str, Optional[int]], List[Dict[str, Any]]]] = {k: {} for k in self.kinds}
+
+    def load(self) -> Dict[str, int]:
+        """Page every cataloged endpoint once; returns object counts per kind."""
+        hdrs = awx_http.headers(self.token)
+        for kind in self.kinds:
+            u = f"{self.aap_host}/api/controller/v2/{kind}/?page_size=200&order_by=id"
+            if kind in ORG_KINDS:
+                u += f"&organization={self.org_id}"
+            for obj in awx_http.iter_pages(u, hdrs, self.verify):
+                self.add(kind, obj)
+        return self.counts()
+
+    def covers(self, kind: str) -> bool:
+        return kind in self._by_id
+
+    def add(self, kind: str, obj: Dict[str, Any]) -> None:
+        """Index (or re-index) one object, e.g. right after creating it."""
+        if kind not in self._by_id or obj.get("id") is None:
+            return
+        with self._lock:
+            old = self._by_id[kind].get(obj["id"])
+            if old is not None:
+                self._unindex(kind, old)
+            self._by_id[kind][obj["id"]] = obj
+            bucket = self._by_name[kind].setdefault(self._key(kind, obj), [])
+            bucket.append(obj)
+            bucket.sort(key=lambda o: o["id"])
+
+    def get(self, kind: str, obj_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._by_id[kind].get(obj_id)
+
+    def find_all(self, kind: str, name: str) -> List[Dict[str, Any]]:
+        """Objects of kind with this exact name (in the catalog's org for org-scoped kinds), in id order."""
+        org = self.org_id if kind in ORG_KINDS else None
+        with self._lock:
+            return list(self._by_name[kind].get((name, org), []))
+
+    def find(self, kind: str, name: str, credential_type: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        for obj in self.find_all(kind, name):
+            if credential_type is None or obj.get("credential_type") == credential_type:
+                return obj
+        return None
+
+    def objects(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._by_id[kind][i] for i in sorted(self._by_id[kind])]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {k: len(v) for k, v in self._by_id.items()}
+
+    def _key(self, kind: str, obj: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        return (obj.get("name") or "", obj.get("organization") if kind in ORG_KINDS else None)
+
+    def _unindex(self, kind: str, obj: Dict[str, Any]) -> None:
+        bucket = self._by_name[kind].get(self._key(kind, obj), [])
+        bucket[:] = [o for o in bucket if o.get("id") != obj.get("id")]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for AWX source reads (SQLite).
+
+Cutover rehearsals rerun the migrators many times against an AWX whose data
+barely changes. awx_http consults this cache for AWX /api/v2/ GETs:
+
+- younger than --cache-ttl seconds: served from disk, no request at all
+- older: revalidated with If-None-Match / If-Modified-Since; a 304 costs
+  one empty round trip and the stored body is reused
+- otherwise the fresh 200 body replaces the entry
+
+Entries are keyed by URL plus a hash of the Authorization header (different
+tokens may see different objects). The file is kept under max_bytes by
+evicting least-recently-used entries.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PATH = os.path.join("artifacts", "awx_http_cache.sqlite")
+DEFAULT_MAX_MB = 512
+
+
+class HttpCache:
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = 0, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.counts = {"fresh": 0, "revalidated": 0, "miss": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT,"
+            " body TEXT, size INTEGER, stored_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(accessed_at)")
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(url: str, hdrs: Dict[str, str]) -> str:
+        auth = hashlib.sha256((hdrs.get("Authorization") or "").encode()).hexdigest()[:16]
+        return f"{auth} {url}"
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str], Optional[str], float]]:
+        """(body, etag, last_modified, stored_at) or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def hit(self, kind: str) -> None:
+        with self._lock:
+            self.counts[kind] += 1
+
+    def is_fresh(self, stored_at: float) -> bool:
+        return self.ttl > 0 and (time.time() - stored_at) < self.ttl
+
+    def revalidated(self, key: str) -> None:
+        """A 304 came back: the stored body is current again."""
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def put(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str], body: str) -> None:
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, body, size, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, body, size, now, now),
+            )
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Drop least-recently-used rows until we are back under 90% of the cap.
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.counts["evicted"] += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counts)
+            out["bytes"] = self._total
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+JSON codec used by the migrators for event lines, exports and index files.
+
+orjson is used when it is installed (several times faster on multi-hundred-MB
+awx-manage exports); otherwise the stdlib json module. Both produce the same
+JSON text modulo whitespace:
+
+- compact=True   -> no whitespace, like json.dumps(separators=(",", ":"))
+- compact=False  -> 2-space indent, like json.dumps(indent=2)
+
+Non-ASCII is written as UTF-8, never \\u-escaped. Values orjson refuses
+(e.g. integers beyond 64 bits) fall back to the stdlib encoder.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson  # optional
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any, compact: bool = True) -> str:
+    if orjson is not None:
+        opts = orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2)
+        try:
+            return orjson.dumps(obj, option=opts).decode("utf-8")
+        except TypeError:
+            pass  # orjson.JSONEncodeError is a TypeError; let stdlib try
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: str) -> Any:
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def dump_file(obj: Any, path: str, compact: bool = False) -> None:
+    if orjson is not None:
+        opts = orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2)
+        try:
+            data = orjson.dumps(obj, option=opts)
+        except TypeError:
+            data = None
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+                if not compact:
+                    f.write(b"\n")
+            return
+    text = dumps(obj, compact=compact)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+        if not compact:
+            f.write("\n")
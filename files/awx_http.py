@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the AWX -> AAP migrators.
+
+Every migrator talks to the same two or three hosts (AWX source, AAP gateway)
+thousands of times per bulk run. Instead of a bare requests.get/post per call
+(new TCP + TLS handshake each time), all traffic goes through one keep-alive
+requests.Session per host with a bounded connection pool, so a warmed-up run
+reuses its TLS sessions instead of renegotiating them. Headers and timeouts
+live here too, so the scripts only deal with URLs and payloads.
+
+Ship this file next to the migrator scripts (the playbooks copy it alongside).
+"""
+import asyncio
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+TIMEOUT = 30        # seconds, per request
+POOL_SIZE = 10      # keep-alive connections per host
+LATENCY_TARGET = 1.5  # seconds; p95 the limiter tries to stay under
+THROTTLE_STATUSES = {429, 502, 503, 504}
+MAX_RETRY_AFTER = 120  # seconds; cap on a server-requested pause
+RETRIES = 4           # extra attempts for GETs / idempotent writes / recoverable creates
+BACKOFF_BASE = 0.5    # seconds; attempt n waits up to BACKOFF_BASE * 2**n (full jitter)
+BACKOFF_MAX = 30.0
+PAGE_WINDOW = 4       # list pages fetched ahead of the consumer
+SCAN_BUFFER = 400     # objects a parallel id-range scanner may read ahead of the consumer
+
+_settings: Dict[str, Any] = {"timeout": TIMEOUT, "pool_size": POOL_SIZE, "latency_target": LATENCY_TARGET,
+                             "page_window": PAGE_WINDOW, "scan_mode": "page", "scan_ranges": 1}
+_clients: Dict[str, "HostClient"] = {}
+_clients_lock = threading.Lock()
+_async: Optional["AsyncTransport"] = None
+_finished_async: List[Dict[str, Dict[str, int]]] = []
+_budgets: Dict[str, int] = {}
+_limiters: Dict[str, "AdaptiveLimiter"] = {}
+_event_hook: Optional[Callable[..., None]] = None
+_retry_stats: Dict[str, float] = {"retries": 0, "wait_s": 0.0, "recovered_creates": 0}
+_retry_lock = threading.Lock()
+_cache: Optional[Any] = None        # awx_cache.HttpCache, see set_cache()
+_cache_hosts: set = set()
+_transient_exc: tuple = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)
+
+
+class TransientHTTPError(RuntimeError):
+    """A failure worth retrying: 429/502/503/504 or a connection/timeout error."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HTTPStatusError(RuntimeError):
+    """A reply that retrying will not fix (400, 404, 500, ...); status is its HTTP status."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def configure(pool_size: Optional[int] = None, timeout: Optional[float] = None,
+              latency_target: Optional[float] = None, page_window: Optional[int] = None,
+              scan_mode: Optional[str] = None, scan_ranges: Optional[int] = None) -> None:
+    """Set pool size / timeout / p95 target / list scanning (call before the first request)."""
+    if scan_mode:
+        _settings["scan_mode"] = scan_mode
+    if scan_ranges:
+        _settings["scan_ranges"] = max(1, int(scan_ranges))
+    if page_window is not None:
+        _settings["page_window"] = max(1, int(page_window))
+    if pool_size:
+        _settings["pool_size"] = max(1, int(pool_size))
+    if timeout:
+        _settings["timeout"] = float(timeout)
+    if latency_target:
+        _settings["latency_target"] = float(latency_target)
+
+
+def set_host_budget(url: str, max_inflight: int) -> None:
+    """Cap concurrent requests to url's host (AWX source and AAP target get separate budgets)."""
+    _budgets[host_key(url)] = max(1, int(max_inflight))
+
+
+def set_cache(cache: Any, hosts: List[str]) -> None:
+    """Serve AWX /api/v2/ GETs to the given source hosts through an awx_cache.HttpCache."""
+    global _cache, _cache_hosts
+    _cache = cache
+    _cache_hosts = {host_key(h) for h in hosts if h}
+
+
+def cache_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache is not None else None
+
+
+def set_event_hook(fn: Optional[Callable[..., None]]) -> None:
+    """fn(event, **fields) receives limiter window/throttle events (the JT migrator passes emit)."""
+    global _event_hook
+    _event_hook = fn
+
+
+def _event(event: str, **fields: Any) -> None:
+    if _event_hook is not None:
+        _event_hook(event, **fields)
+
+
+def headers(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept": "application/json"}
+
+
+def host_key(url: str) -> str:
+    u = urlsplit(url)
+    return f"{u.scheme.lower()}://{u.netloc.lower()}"
+
+
+class HostClient:
+    """Keep-alive session + connection pool for one scheme://host[:port]."""
+
+    def __init__(self, base: str, pool_size: int, timeout: float) -> None:
+        self.base = base
+        self.timeout = timeout
+        self.requests = 0
+        self.session = requests.Session()
+        # max_retries=0: retry policy is the caller's business, not urllib3's.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapter = adapter
+
+    def request(self, method: str, url: str, hdrs: Dict[str, str], verify: bool,
+                payload: Optional[Dict[str, Any]] = None) -> requests.Response:
+        self.requests += 1
+        return self.session.request(method, url, headers=hdrs, json=payload,
+                                    verify=verify, timeout=self.timeout)
+
+    def connections_opened(self) -> int:
+        """Number of TCP/TLS connections this host's pools have had to open."""
+        total = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                total += getattr(pool, "num_connections", 0)
+        return total
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# ---------------- adaptive concurrency ----------------
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            secs = parsedate_to_datetime(value).timestamp() - time.time()
+        except Exception:
+            return None
+    return min(max(secs, 0.0), MAX_RETRY_AFTER)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD window of concurrent requests for one host.
+
+    Additive increase: every successful reply grows the window by 1/window
+    (about +1 per window's worth of replies) while p95 latency over the last
+    `samples` replies stays under the target. Multiplicative decrease: a
+    429/502/503/504 or a transport error halves it, and Retry-After pauses new
+    requests to that host. A p95 over target shrinks it gently (x0.9).
+    """
+
+    def __init__(self, host: str, maximum: int, target: float, samples: int = 50) -> None:
+        self.host = host
+        self.maximum = maximum
+        self.target = target
+        self.window = float(min(4, maximum))
+        self.inflight = 0
+        self.throttles = 0
+        self._pause_until = 0.0
+        self._lat: Deque[float] = deque(maxlen=samples)
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._pause_until - time.monotonic()
+                if wait <= 0 and self.inflight < int(self.window):
+                    self.inflight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def _p95(self) -> Optional[float]:
+        if len(self._lat) < 10:
+            return None
+        ordered = sorted(self._lat)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def release(self, latency: float, status: Optional[int], retry_after: Optional[str]) -> None:
+        events: List[Dict[str, Any]] = []
+        with self._cond:
+            self.inflight -= 1
+            before = int(self.window)
+            pause = _retry_after_seconds(retry_after) if status in THROTTLE_STATUSES else None
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttles += 1
+                self.window = max(1.0, self.window / 2)
+                if pause:
+                    self._pause_until = max(self._pause_until, time.monotonic() + pause)
+                events.append({"event": "http.throttle", "host": self.host, "status": status,
+                               "retry_after": pause, "window": int(self.window)})
+            else:
+                self._lat.append(latency)
+                p95 = self._p95()
+                if p95 is not None and p95 > self.target:
+                    self.window = max(1.0, self.window * 0.9)
+                elif self.window < self.maximum:
+                    self.window = min(float(self.maximum), self.window + 1.0 / self.window)
+            if int(self.window) != before and not events:
+                p95 = self._p95()
+                events.append({"event": "http.window", "host": self.host, "window": int(self.window),
+                               "p95_ms": round(p95 * 1000) if p95 is not None else None})
+            self._cond.notify_all()
+        for e in events:
+            _event(e.pop("event"), **e)
+
+
+def limiter_for(url: str) -> AdaptiveLimiter:
+    key = host_key(url)
+    lim = _limiters.get(key)
+    if lim is None:
+        with _clients_lock:
+            lim = _limiters.get(key)
+            if lim is None:
+                maximum = _budgets.get(key, _settings["pool_size"])
+                lim = AdaptiveLimiter(key, maximum, _settings["latency_target"])
+                _limiters[key] = lim
+    return lim
+
+
+def client_for(url: str) -> HostClient:
+    key = host_key(url)
+    c = _clients.get(key)
+    if c is None:
+        with _clients_lock:
+            c = _clients.get(key)
+            if c is None:
+                c = HostClient(key, _settings["pool_size"], _settings["timeout"])
+                _clients[key] = c
+    return c
+
+
+def request(method: str, url: str, hdrs: Dict[str, str], verify: bool,
+            payload: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Raw request through the pooled client for url's host; caller checks status.
+    Returns a requests.Response, or a Reply when the async transport is active.
+    Every call takes a slot in the host's AdaptiveLimiter first. Connection
+    errors and timeouts surface as TransientHTTPError.
+    """
+    lim = limiter_for(url)
+    lim.acquire()
+    t0 = time.monotonic()
+    status: Optional[int] = None
+    retry_after: Optional[str] = None
+    try:
+        if _async is not None:
+            r = _async.request(method, url, hdrs, verify, payload)
+        else:
+            r = client_for(url).request(method, url, hdrs, verify, payload)
+        status, retry_after = r.status_code, r.headers.get("Retry-After")
+        return r
+    except _transient_exc as e:
+        raise TransientHTTPError(f"{method} {url} -> {type(e).__name__}: {e}") from e
+    finally:
+        lim.release(time.monotonic() - t0, status, retry_after)
+
+
+# ---------------- retries ----------------
+def _backoff(attempt: int, retry_after: Optional[float]) -> None:
+    """Sleep before retry #attempt (0-based): full-jitter exponential, never shorter than Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, retry_after)
+    with _retry_lock:
+        _retry_stats["retries"] += 1
+        _retry_stats["wait_s"] += delay
+    time.sleep(delay)
+
+
+def _check_transient(method: str, url: str, r: Any) -> None:
+    if r.status_code in THROTTLE_STATUSES:
+        raise TransientHTTPError(f"{method} {url} -> {r.status_code}:\n{r.text}",
+                                 _retry_after_seconds(r.headers.get("Retry-After")))
+
+
+def _with_retries(fn: Callable[[], Any], retries: int = RETRIES) -> Any:
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except TransientHTTPError as e:
+            if attempt >= retries:
+                raise
+            _backoff(attempt, e.retry_after)
+
+
+def get(url: str, hdrs: Dict[str, str], verify: bool) -> Any:
+    """GET with retries on transient failures; returns the last response whatever its status."""
+    for attempt in range(RETRIES + 1):
+        try:
+            r = request("GET", url, hdrs, verify)
+        except TransientHTTPError:
+            if attempt >= RETRIES:
+                raise
+            _backoff(attempt, None)
+            continue
+        if r.status_code not in THROTTLE_STATUSES or attempt >= RETRIES:
+            return r
+        _backoff(attempt, _retry_after_seconds(r.headers.get("Retry-After")))
+    raise RuntimeError("unreachable")
+
+
+def _cached_get_json(url: str, hdrs: Dict[str, str], verify: bool) -> Dict[str, Any]:
+    key = _cache.key(url, hdrs)
+    entry = _cache.get(key)
+    if entry and _cache.is_fresh(entry[3]):
+        _cache.hit("fresh")
+        return json.loads(entry[0])
+    cond = dict(hdrs)
+    if entry and entry[1]:
+        cond["If-None-Match"] = entry[1]
+    if entry and entry[2]:
+        cond["If-Modified-Since"] = entry[2]
+
+    def once() -> Any:
+        r = request("GET", url, cond, verify)
+        if r.status_code == 304 and entry:
+            return None
+        _check_transient("GET", url, r)
+        if r.status_code != 200:
+            raise RuntimeError(f"GET {url} -> {r.status_code}: {r.text}")
+        return r
+
+    r = _with_retries(once)
+    if r is None:
+        _cache.revalidated(key)
+        _cache.hit("revalidated")
+        return json.loads(entry[0])
+    _cache.hit("miss")
+    _cache.put(key, url, r.headers.get("ETag"), r.headers.get("Last-Modified"), r.text)
+    return r.json()
+
+
+def get_json(url: str, hdrs: Dict[str, str], verify: bool) -> Dict[str, Any]:
+    if _cache is not None and "/api/v2/" in url and host_key(url) in _cache_hosts:
+        return _cached_get_json(url, hdrs, verify)
+
+    def once() -> Dict[str, Any]:
+        r = request("GET", url, hdrs, verify)
+        _check_transient("GET", url, r)
+        if r.status_code != 200:
+            raise RuntimeError(f"GET {url} -> {r.status_code}: {r.text}")
+        return r.json()
+    return _with_retries(once)
+
+
+def _send_once(method: str, url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool) -> Dict[str, Any]:
+    r = request(method, url, hdrs, verify, payload)
+    if r.status_code in (200, 201, 202):
+        try:
+            return r.json()
+        except ValueError:
+            return {}
+    if r.status_code == 204:  # AAP often returns 204 for association endpoints
+        return {}
+    _check_transient(method, url, r)
+    raise HTTPStatusError(f"{method} {url} -> {r.status_code}:\n{r.text}", r.status_code)
+
+
+def send_json(method: str, url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool,
+              idempotent: bool = False) -> Dict[str, Any]:
+    """
+    POST/PATCH/PUT; 200/201/202 return the body (or {} if not JSON), 204 returns {}.
+    Only idempotent writes are retried; creates go through create_json().
+    """
+    if not idempotent:
+        return _send_once(method, url, hdrs, payload, verify)
+    return _with_retries(lambda: _send_once(method, url, hdrs, payload, verify))
+
+
+def post_json(url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool,
+              idempotent: bool = False) -> Dict[str, Any]:
+    """idempotent=True for association/replace endpoints (attach cred, survey_spec) that are safe to repeat."""
+    return send_json("POST", url, hdrs, payload, verify, idempotent)
+
+
+def patch_json(url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool) -> Dict[str, Any]:
+    return send_json("PATCH", url, hdrs, payload, verify, idempotent=True)
+
+
+def create_json(url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool,
+                lookup: Callable[[], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    POST a new object, retrying transient failures without creating duplicates.
+
+    A timed-out or 502'd create may still have gone through, so before every
+    retry lookup() (the caller's name+organization query) is asked whether the
+    object exists now; if it does, that object is returned as the result.
+    """
+    for attempt in range(RETRIES + 1):
+        try:
+            return _send_once("POST", url, hdrs, payload, verify)
+        except TransientHTTPError as e:
+            if attempt >= RETRIES:
+                raise
+            _backoff(attempt, e.retry_after)
+            found = lookup()
+            if found:
+                with _retry_lock:
+                    _retry_stats["recovered_creates"] += 1
+                _event("http.create.recovered", url=url, name=payload.get("name"), id=found.get("id"))
+                return found
+    raise RuntimeError("unreachable")
+
+
+# ---------------- pagination ----------------
+def with_query(url: str, **params: Any) -> str:
+    """url with the given query parameters set (replacing existing ones)."""
+    u = urlsplit(url)
+    q = [(k, v) for k, v in parse_qsl(u.query, keep_blank_values=True) if k not in params]
+    q.extend((k, str(v)) for k, v in params.items() if v is not None)
+    return urlunsplit((u.scheme, u.netloc, u.path, urlencode(q), u.fragment))
+
+
+def iter_pages(url: str, hdrs: Dict[str, str], verify: bool, window: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every object of a paginated list endpoint, in server order.
+
+    The first page gives `count`; the remaining ?page=N URLs are then known up
+    front and fetched concurrently, at most `window` pages ahead of the
+    consumer. Endpoints without `count` fall back to following `next`.
+    """
+    window = window or _settings["page_window"]
+    first = get_json(url, hdrs, verify)
+    results = first.get("results", [])
+    yield from results
+    count, nxt = first.get("count"), first.get("next")
+    if not nxt:
+        return
+    per_page = len(results)  # a page with a `next` is full, whatever page_size the server capped us to
+    if window <= 1 or not isinstance(count, int) or per_page <= 0:
+        while nxt:
+            nxt = urljoin(url, nxt)  # AWX returns `next` as a path
+            d = get_json(nxt, hdrs, verify)
+            yield from d.get("results", [])
+            nxt = d.get("next")
+        return
+    start = int(dict(parse_qsl(urlsplit(url).query)).get("page") or 1)
+    pages = [with_query(url, page=n) for n in range(start + 1, (count - 1) // per_page + 2)]
+    pool = ThreadPoolExecutor(max_workers=window, thread_name_prefix="page")
+    pending: Deque[Future] = deque()
+    try:
+        it = iter(pages)
+        for page_url in it:
+            pending.append(pool.submit(get_json, page_url, hdrs, verify))
+            if len(pending) >= window:
+                break
+        while pending:
+            d = pending.popleft().result()
+            nxt_url = next(it, None)
+            if nxt_url is not None:
+                pending.append(pool.submit(get_json, nxt_url, hdrs, verify))
+            yield from d.get("results", [])
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_keyset(url: str, hdrs: Dict[str, str], verify: bool,
+                after_id: int = 0, upto_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield objects with after_id < id <= upto_id in id order, walking
+    ?order_by=id&id__gt=<last seen id> instead of ?page=N. Every request is a
+    cheap index range scan on the AWX database, however deep into the list,
+    and objects created mid-scan cannot shift later pages.
+    """
+    last = after_id
+    while True:
+        d = get_json(with_query(url, order_by="id", id__gt=last, id__lte=upto_id, page=None), hdrs, verify)
+        results = d.get("results", [])
+        yield from results
+        if not results or not d.get("next"):
+            return
+        last = results[-1]["id"]
+
+
+def max_id(url: str, hdrs: Dict[str, str], verify: bool) -> int:
+    d = get_json(with_query(url, order_by="-id", page_size=1, page=None), hdrs, verify)
+    results = d.get("results", [])
+    return int(results[0]["id"]) if results else 0
+
+
+def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def iter_keyset_ranges(url: str, hdrs: Dict[str, str], verify: bool, ranges: int,
+                       after_id: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Split (after_id, max id] into `ranges` equal id ranges and keyset-scan them
+    in parallel, yielding range 1, then range 2, ... so the overall order is
+    still ascending id. Each range may read at most SCAN_BUFFER objects ahead.
+    The upper bound is fixed when the scan starts; objects created later are
+    left for the next run.
+    """
+    top = max_id(url, hdrs, verify)
+    if top <= after_id:
+        return
+    step = -(-(top - after_id) // ranges)
+    bounds = [(lo, min(top, lo + step)) for lo in range(after_id, top, step)]
+    queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=SCAN_BUFFER) for _ in bounds]
+    stop = threading.Event()
+
+    def scan(q: "queue.Queue[Any]", lo: int, hi: int) -> None:
+        try:
+            for obj in iter_keyset(url, hdrs, verify, lo, hi):
+                if not _put(q, ("obj", obj), stop):
+                    return
+            _put(q, ("end", None), stop)
+        except BaseException as e:
+            _put(q, ("err", e), stop)
+
+    for q, (lo, hi) in zip(queues, bounds):
+        threading.Thread(target=scan, args=(q, lo, hi), daemon=True, name=f"scan-{lo}").start()
+    try:
+        for q in queues:
+            while True:
+                kind, val = q.get()
+                if kind == "end":
+                    break
+                if kind == "err":
+                    raise val
+                yield val
+    finally:
+        stop.set()
+
+
+def iter_list(url: str, hdrs: Dict[str, str], verify: bool, after_id: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Top-level AWX listing in the configured scan mode: "page" (prefetched
+    ?page=N, see iter_pages) or "keyset" (id cursor, optionally split into
+    scan_ranges parallel id ranges). after_id resumes past a saved cursor.
+    """
+    if _settings["scan_mode"] == "keyset":
+        if _settings["scan_ranges"] > 1:
+            return iter_keyset_ranges(url, hdrs, verify, _settings["scan_ranges"], after_id)
+        return iter_keyset(url, hdrs, verify, after_id)
+    if after_id:
+        url = with_query(url, order_by="id", id__gt=after_id)
+    return iter_pages(url, hdrs, verify)
+
+
+class ScanCursor:
+    """
+    Persists the id of the last object handled by a bulk loop, so a later run
+    can pass it back as --resume-after-id. Objects are reported by their
+    position in the listing; the cursor only moves past a position once every
+    earlier one is done, which keeps it correct when objects finish out of
+    order (async engine, worker pools).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.last_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._done: Dict[int, Any] = {}
+        self._next = 1
+
+    def done(self, seq: int, obj_id: Any) -> None:
+        with self._lock:
+            self._done[seq] = obj_id
+            moved = False
+            while self._next in self._done:
+                self.last_id = self._done.pop(self._next)
+                self._next += 1
+                moved = True
+            if moved and self.last_id is not None:
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(f"{self.last_id}\n")
+                os.replace(tmp, self.path)
+
+    def track(self, objs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass objs through, marking each done once the loop asks for the next one."""
+        for seq, obj in enumerate(objs, start=1):
+            yield obj
+            self.done(seq, obj.get("id"))
+
+
+class OrderedOutput:
+    """
+    stdout/stderr stand-in for concurrent bulk loops (async JT engine, project
+    worker pool). Each worker thread is bound to its object's slot; what it
+    prints is held until every earlier slot has finished, then released in
+    input order. The console and NDJSON stream therefore read exactly like a
+    sequential run. Writes from unbound threads pass straight through.
+    header(slot), if given, is written ahead of each slot that printed
+    anything, when that slot is released.
+    """
+
+    class _Stream:
+        def __init__(self, owner: "OrderedOutput", which: str) -> None:
+            self._owner, self._which = owner, which
+
+        def write(self, text: str) -> int:
+            self._owner.write(self._which, text)
+            return len(text)
+
+        def flush(self) -> None:
+            pass
+
+    def __init__(self, header: Optional[Callable[[int], str]] = None) -> None:
+        self.real = {"out": sys.stdout, "err": sys.stderr}
+        self.header = header
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots: Dict[int, List[Tuple[str, str]]] = {}
+        self._done: Set[int] = set()
+        self._next = 1
+
+    def install(self) -> None:
+        sys.stdout, sys.stderr = self._Stream(self, "out"), self._Stream(self, "err")
+
+    def uninstall(self) -> None:
+        sys.stdout, sys.stderr = self.real["out"], self.real["err"]
+
+    def bind(self, slot: Optional[int]) -> None:
+        self._local.slot = slot
+
+    def write(self, which: str, text: str) -> None:
+        slot = getattr(self._local, "slot", None)
+        with self._lock:
+            if slot is None:
+                self.real[which].write(text)
+            else:
+                self._slots.setdefault(slot, []).append((which, text))
+
+    def finish(self, slot: int) -> None:
+        with self._lock:
+            self._done.add(slot)
+            while self._next in self._done:
+                held = self._slots.pop(self._next, [])
+                if held and self.header:
+                    self.real["out"].write(self.header(self._next))
+                for which, text in held:
+                    self.real[which].write(text)
+                self._done.discard(self._next)
+                self._next += 1
+            self.real["out"].flush()
+            self.real["err"].flush()
+
+
+def read_ahead(objs: Iterable[Any], depth: int, fetch: Optional[Callable[[Any], Any]] = None,
+               out: Optional[OrderedOutput] = None) -> Iterator[Tuple[Any, "Future[Any]"]]:
+    """
+    Pipeline stage between an AWX listing and the AAP writers. A reader thread
+    walks objs and runs fetch(obj) (the per-object sub-resource GETs) for
+    each, at most `depth` objects ahead of the consumer: the bounded queue
+    blocks the reader whenever the writers fall behind, so memory stays flat
+    however large the listing is. Yields (obj, future) in listing order; the
+    future holds what fetch returned or raised for that object, so one bad
+    object does not end the stream. A failing listing does, at the point it
+    failed. With `out`, what fetch prints for the n-th object is bound to
+    slot n, ahead of the writer's output for it.
+    """
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def reader() -> None:
+        try:
+            for seq, obj in enumerate(objs, start=1):
+                fut: "Future[Any]" = Future()
+                if out:
+                    out.bind(seq)
+                try:
+                    fut.set_result(fetch(obj) if fetch else None)
+                except Exception as e:
+                    fut.set_exception(e)
+                finally:
+                    if out:
+                        out.bind(None)
+                if not _put(q, ("obj", (obj, fut)), stop):
+                    return
+            _put(q, ("end", None), stop)
+        except BaseException as e:
+            _put(q, ("err", e), stop)
+
+    threading.Thread(target=reader, daemon=True, name="read-ahead").start()
+    try:
+        while True:
+            kind, val = q.get()
+            if kind == "end":
+                return
+            if kind == "err":
+                raise val
+            yield val
+    finally:
+        stop.set()
+
+
+def retry_stats() -> Dict[str, float]:
+    """Retries performed, seconds spent backing off, and creates recovered by lookup."""
+    with _retry_lock:
+        out = dict(_retry_stats)
+    out["wait_s"] = round(out["wait_s"], 2)
+    return out
+
+
+# ---------------- async transport ----------------
+class Reply:
+    """The slice of requests.Response the migrators use, for replies read by aiohttp."""
+
+    def __init__(self, status_code: int, text: str, headers: Dict[str, str]) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.headers = CaseInsensitiveDict(headers)
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class AsyncTransport:
+    """
+    aiohttp sessions (one per host) owned by a running event loop.
+
+    The migrators' per-object flows stay ordinary blocking functions; they run
+    in worker threads and request() hands each call to the loop, so all sockets
+    are multiplexed by asyncio while every flow keeps its own step order.
+    """
+
+    def __init__(self, aiohttp_mod: Any, loop: asyncio.AbstractEventLoop, pool_size: int, timeout: float) -> None:
+        self._aiohttp = aiohttp_mod
+        self.loop = loop
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions: Dict[str, Any] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def _session(self, base: str) -> Any:
+        sess = self._sessions.get(base)
+        if sess is None:
+            aiohttp = self._aiohttp
+            counts = self.counts.setdefault(base, {"requests": 0, "connections": 0})
+
+            async def _on_conn(_session: Any, _ctx: Any, _params: Any) -> None:
+                counts["connections"] += 1
+
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(_on_conn)
+            sess = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace],
+            )
+            self._sessions[base] = sess
+        return sess
+
+    async def fetch(self, method: str, url: str, hdrs: Dict[str, str], verify: bool,
+                    payload: Optional[Dict[str, Any]] = None) -> Reply:
+        base = host_key(url)
+        sess = self._session(base)
+        self.counts[base]["requests"] += 1
+        async with sess.request(method, url, headers=hdrs, json=payload, ssl=None if verify else False) as r:
+            text = await r.text()
+            return Reply(r.status, text, r.headers)
+
+    def request(self, method: str, url: str, hdrs: Dict[str, str], verify: bool,
+                payload: Optional[Dict[str, Any]] = None) -> Reply:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            raise RuntimeError("awx_http.request() called on the event loop thread; run the flow in a worker")
+        fut = asyncio.run_coroutine_threadsafe(self.fetch(method, url, hdrs, verify, payload), self.loop)
+        return fut.result()
+
+    async def aclose(self) -> None:
+        for sess in self._sessions.values():
+            await sess.close()
+        self._sessions.clear()
+
+
+async def start_async() -> AsyncTransport:
+    """Route request() through aiohttp on the running loop until stop_async()."""
+    global _async, _transient_exc
+    try:
+        import aiohttp
+    except ImportError:
+        raise RuntimeError("The async engine needs aiohttp (pip install aiohttp)")
+    _transient_exc = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError, aiohttp.ClientError)
+    _async = AsyncTransport(aiohttp, asyncio.get_running_loop(), _settings["pool_size"], _settings["timeout"])
+    return _async
+
+
+async def stop_async() -> None:
+    global _async
+    t, _async = _async, None
+    if t is not None:
+        # Keep the counters visible to stats() after the sessions are gone.
+        _finished_async.append(t.counts)
+        await t.aclose()
+
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Per-host request and connection counts (connections ~= TLS handshakes), limiter window and throttles."""
+    out = {k: {"requests": c.requests, "connections": c.connections_opened()} for k, c in list(_clients.items())}
+    live = [_async.counts] if _async is not None else []
+    for counts in _finished_async + live:
+        for k, v in counts.items():
+            agg = out.setdefault(k, {"requests": 0, "connections": 0})
+            agg["requests"] += v["requests"]
+            agg["connections"] += v["connections"]
+    for k, lim in list(_limiters.items()):
+        agg = out.setdefault(k, {"requests": 0, "connections": 0})
+        agg["window"] = int(lim.window)
+        agg["throttles"] = lim.throttles
+    return out
+
+
+def close_all() -> None:
+    with _clients_lock:
+        for c in _clients.values():
+            c.close()
+        _clients.clear()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Crash-safe checkpoint journal for long migration runs.
+
+Every completed step of an object is appended as one JSON line and fsync'd
+before the migrator moves on: JT 412 found/created as AAP 1877, its survey
+posted, its credentials attached, schedule 9031 created, JT 412 done. If
+the run dies (pod eviction, expired token), a rerun with --resume <journal>
+skips the recorded steps without any API calls and picks up at the first
+step that has no record. Steps that failed are never recorded, so they are
+retried.
+
+The file is only ever appended to; each run starts with a header line
+naming the AWX and AAP hosts, and resuming against different AWX or AAP
+hosts is refused. A torn last line (killed mid-write) is ignored on load.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import awx_codec
+
+
+class Journal:
+    def __init__(self, path: str, aap_host: str, awx_hosts: Iterable[Optional[str]], resume: bool = False) -> None:
+        self.path = path
+        self.counts = {"skipped": 0, "recorded": 0, "loaded": 0}
+        self._lock = threading.Lock()
+        self._steps: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        awx = [h for h in awx_hosts if h]
+        if resume and os.path.exists(path):
+            self._load(path, aap_host, awx)
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        new = not os.path.exists(path)
+        self._f = open(path, "ab")
+        if not new and self._f.tell() and not self._ends_with_newline(path):
+            self._f.write(b"\n")
+        self._append({"journal": 1, "started_at": datetime.now(timezone.utc).isoformat(),
+                      "aap": aap_host, "awx": awx, "resume": resume})
+        if new:
+            self._sync_dir(d or ".")
+
+    def _load(self, path: str, aap_host: str, awx_hosts: List[str]) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = awx_codec.loads(line)
+                except ValueError:
+                    continue  # torn write at the end of a killed run
+                if "journal" in rec:
+                    if rec.get("aap") != aap_host:
+                        raise SystemExit(f"Journal {path} was written for AAP {rec.get('aap')}, not {aap_host}")
+                    if rec.get("awx") != awx_hosts:
+                        raise SystemExit(f"Journal {path} was written for AWX {', '.join(rec.get('awx') or [])}, "
+                                         f"not {', '.join(awx_hosts)}")
+                    continue
+                self._steps[(rec.get("o"), rec.get("step"))] = rec
+        self.counts["loaded"] = len(self._steps)
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _sync_dir(d: str) -> None:
+        try:
+            fd = os.open(d, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        self._f.write(awx_codec.dumps(rec).encode("utf-8") + b"\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def done(self, obj: str, step: str) -> Optional[Dict[str, Any]]:
+        """The record of a step completed by an earlier run (only when resuming), counted as skipped."""
+        with self._lock:
+            rec = self._steps.get((obj, step))
+            if rec is not None:
+                self.counts["skipped"] += 1
+            return rec
+
+    def record(self, obj: str, step: str, **data: Any) -> None:
+        rec = {"o": obj, "step": step, "ts": datetime.now(timezone.utc).isoformat()}
+        rec.update(data)
+        with self._lock:
+            self._append(rec)
+            self.counts["recorded"] += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Persistent AWX -> AAP id ledger (SQLite).
+
+The migrators record every mapping they establish (object created, or an
+existing AAP object matched by name): AWX JT 412 became AAP JT 1877, AWX
+project 106 became AAP project 233, and so on for notification templates
+and schedules. Rows are keyed by (kind, AWX host, AWX id, AAP host), so ATST
+and PROD ids never collide.
+
+On later runs the migrators ask the ledger first and confirm the AAP id
+still exists (one by-id check, free when the AAP catalog is loaded) before
+falling back to name lookups. A mapping whose AAP object is gone is dropped.
+
+  python3 awx_ledger.py export --ledger artifacts/awx_aap_ledger.sqlite --out ledger.json
+
+writes the ledger as JSON for the playbooks to fetch alongside the receipts.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import awx_codec
+
+DEFAULT_PATH = os.path.join("artifacts", "awx_aap_ledger.sqlite")
+
+
+class Ledger:
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.counts = {"hit": 0, "stale": 0, "recorded": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS mapping ("
+            " kind TEXT, awx_host TEXT, awx_id INTEGER, aap_host TEXT, aap_id INTEGER,"
+            " name TEXT, updated_at TEXT,"
+            " PRIMARY KEY (kind, awx_host, awx_id, aap_host))"
+        )
+
+    def lookup(self, kind: str, awx_host: str, awx_id: int, aap_host: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT aap_id FROM mapping WHERE kind = ? AND awx_host = ? AND awx_id = ? AND aap_host = ?",
+                (kind, awx_host, awx_id, aap_host),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, kind: str, awx_host: str, awx_id: Optional[int], aap_host: str,
+               aap_id: Optional[int], name: Optional[str] = None) -> None:
+        if awx_id is None or aap_id is None or aap_id < 0:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT aap_id, name FROM mapping WHERE kind = ? AND awx_host = ? AND awx_id = ? AND aap_host = ?",
+                (kind, awx_host, awx_id, aap_host),
+            ).fetchone()
+            if row == (aap_id, name):
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO mapping (kind, awx_host, awx_id, aap_host, aap_id, name, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, awx_host, awx_id, aap_host, aap_id, name, now),
+            )
+            self.counts["recorded"] += 1
+
+    def forget(self, kind: str, awx_host: str, awx_id: int, aap_host: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM mapping WHERE kind = ? AND awx_host = ? AND awx_id = ? AND aap_host = ?",
+                (kind, awx_host, awx_id, aap_host),
+            )
+
+    def hit(self, kind: str) -> None:
+        """Count a lookup outcome: "hit" (mapping confirmed) or "stale" (AAP object gone)."""
+        with self._lock:
+            self.counts[kind] += 1
+
+    def rows(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT kind, awx_host, awx_id, aap_host, aap_id, name, updated_at FROM mapping"
+                " ORDER BY kind, awx_host, awx_id, aap_host"
+            )
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def export_json(self, out_path: str) -> int:
+        rows = self.rows()
+        data = {"version": 1, "exported_at": datetime.now(timezone.utc).isoformat(), "mappings": rows}
+        tmp = f"{out_path}.{os.getpid()}.tmp"  # --shard processes may export side by side
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(awx_codec.dumps(data, compact=False))
+        os.replace(tmp, out_path)
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="AWX -> AAP id ledger")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("export", help="Write the ledger as JSON")
+    e.add_argument("--ledger", default=DEFAULT_PATH)
+    e.add_argument("--out", required=True)
+    args = p.parse_args()
+    if not os.path.exists(args.ledger):
+        raise SystemExit(f"ledger not found: {args.ledger}")
+    n = Ledger(args.ledger).export_json(args.out)
+    print(f"Exported {n} mapping(s) -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Deterministic sharding of the bulk migrators, and merging the shards back.
+
+`--shard i/N` makes a bulk run handle only the AWX objects whose id hashes to
+shard i. Every shard still walks the whole listing, so positions ([idx]),
+include/exclude and --limit are decided exactly as in a single-process run;
+the other shards' objects are passed over without output. The N runs can
+go to different hosts or forks at the same time.
+
+Run as a script, this module merges what the shards left behind into the
+artifacts of a single run:
+
+  python3 awx_shards.py events --out migration_events.json [--console-out migration_console.txt] shard1.out ...
+  python3 awx_shards.py receipts --out migrate_projects_receipt.txt shard1.json shard2.json ...
+
+events: the stdout of each migrate_job_templates.py shard (NDJSON lines
+among the console text). Per-template events are put back in listing order
+by their shard.slot markers. The run totals (bulk.summary,
+schedule.variants) are added up into one event each. Other run-level
+events are kept per shard, in shard order, except that an event every
+shard emitted alike (aap.catalog, preflight.ok, ...) is kept once.
+--console-out also writes the console text of the shards' stdout: each
+template's lines in listing order, framed by each shard's own run-level
+text (start-up, totals) in shard order. stderr is not part of the merge.
+
+receipts: the partial PROD receipts (JSON) that migrate_projects.py writes
+with --shard, merged into the text receipt of a single run.
+"""
+import argparse
+import hashlib
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import awx_codec
+
+SLOT_EVENT = "shard.slot"   # output of listing position `seq` starts here
+END_EVENT = "shard.end"     # the bulk loop of one shard finished
+SUMMARY_EVENT = "bulk.summary"
+SUMMED_EVENTS = (SUMMARY_EVENT, "schedule.variants")   # run totals, added up over the shards
+
+# The baseline receipt's four summary lines keep their order; later counts go after them.
+RECEIPT_COUNTS = (("matches", "Matches (skipped)"), ("migrated", "Migrated"), ("filtered", "Filtered"),
+                  ("failures", "Failures"), ("already", "Already migrated"))
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """argparse type for --shard i/N, 1 <= i <= N."""
+    try:
+        i, n = (int(x) for x in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 2/4, got {text!r}")
+    if not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"shard {i}/{n} out of range")
+    return i, n
+
+
+def label(shard: Tuple[int, int]) -> str:
+    return f"{shard[0]}/{shard[1]}"
+
+
+def in_shard(obj_id: Any, shard: Optional[Tuple[int, int]]) -> bool:
+    """
+    Whether shard (i, N) owns an AWX object. The owner is picked by a hash of
+    the object id (blake2b, not Python's per-process hash()), so every process
+    and every host agree without talking to each other, an object keeps its
+    shard from one run to the next, and consecutive ids spread over all shards.
+    Without --shard every object is owned.
+    """
+    if not shard:
+        return True
+    i, n = shard
+    digest = hashlib.blake2b(str(obj_id).encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % n == i - 1
+
+
+def _check_complete(path_labels: Sequence[Tuple[str, Optional[str]]]) -> None:
+    """Every shard of one N must be there exactly once, or the merge would silently drop objects."""
+    for path, lab in path_labels:
+        if lab is None:
+            raise SystemExit(f"{path}: no shard end marker (did that shard finish?)")
+    seen = sorted(parse_shard(lab) for _, lab in path_labels)
+    n = seen[0][1]
+    if seen != [(i, n) for i in range(1, n + 1)]:
+        raise SystemExit(f"Need shards 1/{n} .. {n}/{n} once each, got {', '.join(label(s) for s in seen)}")
+
+
+# ---------------- NDJSON events ----------------
+def _lines(path: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Each line of a shard's stdout with its event, or None for console text."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            ev = None
+            if line.startswith("{"):
+                try:
+                    ev = awx_codec.loads(line)
+                except ValueError:
+                    pass
+            yield line, ev
+
+
+def _events(path: str) -> Iterator[Dict[str, Any]]:
+    return (ev for _, ev in _lines(path) if ev is not None)
+
+
+def _add(into: Dict[str, Any], ev: Dict[str, Any]) -> None:
+    for k, v in ev.items():
+        if isinstance(v, dict) and isinstance(into.get(k), dict):
+            _add(into[k], v)
+        elif isinstance(v, int) and not isinstance(v, bool) and isinstance(into.get(k), int):
+            into[k] += v
+
+
+def merge_events(paths: Sequence[str]) -> List[Dict[str, Any]]:
+    pre: List[Dict[str, Any]] = []
+    post: List[Dict[str, Any]] = []
+    slots: Dict[int, List[Dict[str, Any]]] = {}
+    totals: Dict[str, Dict[str, Any]] = {}
+    seen = set()  # run-level events already kept, minus their timestamp
+    labels: List[Tuple[str, Optional[str]]] = []
+    for path in paths:
+        where, lab = pre, None
+        for ev in _events(path):
+            kind = ev.get("event")
+            if kind == SLOT_EVENT:
+                where = slots.setdefault(ev["seq"], [])
+            elif kind == END_EVENT:
+                where, lab = post, ev.get("shard")
+            elif kind in totals:
+                _add(totals[kind], ev)
+            elif kind in SUMMED_EVENTS:
+                totals[kind] = awx_codec.loads(awx_codec.dumps(ev))  # a copy the other shards add into
+                where.append(totals[kind])
+            elif where is pre or where is post:
+                key = awx_codec.dumps({k: v for k, v in ev.items() if k != "ts"})
+                if key not in seen:
+                    seen.add(key)
+                    where.append(ev)
+            else:
+                where.append(ev)
+        labels.append((path, lab))
+    _check_complete(labels)
+    return pre + [ev for seq in sorted(slots) for ev in slots[seq]] + post
+
+
+def merge_console(paths: Sequence[str]) -> str:
+    """The console text of the shards: run-level text per shard around the templates' text in listing order."""
+    runs: List[Tuple[Optional[str], List[str], List[str]]] = []
+    slots: Dict[int, List[str]] = {}
+    labels: List[Tuple[str, Optional[str]]] = []
+    for path in paths:
+        pre: List[str] = []
+        post: List[str] = []
+        where, lab = pre, None
+        for line, ev in _lines(path):
+            kind = ev.get("event") if ev else None
+            if kind == SLOT_EVENT:
+                where = slots.setdefault(ev["seq"], [])
+            elif kind == END_EVENT:
+                where, lab = post, ev.get("shard")
+            elif ev is None:
+                where.append(line if line.endswith("\n") else line + "\n")
+        runs.append((lab, pre, post))
+        labels.append((path, lab))
+    _check_complete(labels)
+    runs.sort(key=lambda run: parse_shard(run[0] or ""))
+    text = [line for lab, pre, _ in runs for line in [f"== shard {lab} ==\n"] + pre]
+    text += [line for seq in sorted(slots) for line in slots[seq]]
+    text += [line for lab, _, post in runs for line in [f"== shard {lab} ==\n"] + post]
+    return "".join(text)
+
+
+# ---------------- PROD receipts ----------------
+def write_receipt(path: str, header: Sequence[str], lines: Sequence[str], counts: Dict[str, int]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("== PROJECT MIGRATION RECEIPT ==\n")
+        for h in header:
+            f.write(h + "\n")
+        f.write("\n")
+        for line in lines:
+            f.write(line + "\n")
+        f.write("\nSummary:\n")
+        for key, text in RECEIPT_COUNTS:
+            f.write(f"  {text + ':':<19}{counts.get(key, 0)}\n")
+
+
+def write_partial_receipt(path: str, shard: Tuple[int, int], header: Sequence[str],
+                          lines: Sequence[Tuple[int, str]], counts: Dict[str, int]) -> None:
+    """One shard's receipt, with each line's listing position so merge_receipts can restore the order."""
+    awx_codec.dump_file({"shard": label(shard), "header": list(header), "lines": [list(x) for x in lines],
+                         "counts": counts}, path)
+
+
+def merge_receipts(paths: Sequence[str], out: str) -> int:
+    parts = [awx_codec.load_file(p) for p in paths]
+    _check_complete([(p, part.get("shard")) for p, part in zip(paths, parts)])
+    header = parts[0]["header"]
+    for p, part in zip(paths, parts):
+        if part["header"] != header:
+            raise SystemExit(f"{p}: receipt header differs from {paths[0]} (not the same run?)")
+    lines = sorted((idx, line) for part in parts for idx, line in part["lines"])
+    counts = {key: sum(part["counts"].get(key, 0) for part in parts) for key, _ in RECEIPT_COUNTS}
+    write_receipt(out, header, [line for _, line in lines], counts)
+    return len(lines)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Merge the outputs of --shard i/N runs into single-run artifacts")
+    p.add_argument('kind', choices=('events', 'receipts'))
+    p.add_argument('--out', required=True, help='Merged file to write')
+    p.add_argument('--console-out', metavar='FILE', help='events: also write the merged console text here')
+    p.add_argument('shards', nargs='+', metavar='FILE', help='One output per shard, any order')
+    args = p.parse_args()
+    if args.kind == 'events':
+        merged = merge_events(args.shards)
+        awx_codec.dump_file(merged, args.out)
+        print(f"Merged {len(args.shards)} shard(s): {len(merged)} event(s) -> {args.out}")
+        if args.console_out:
+            with open(args.console_out, "w", encoding="utf-8") as f:
+                f.write(merge_console(args.shards))
+            print(f"Console text -> {args.console_out}")
+    else:
+        n = merge_receipts(args.shards, args.out)
+        print(f"Merged {len(args.shards)} shard(s): {n} receipt line(s) -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
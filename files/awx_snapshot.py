@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Offline AWX source snapshot (SQLite).
+
+  python3 awx_snapshot.py snapshot --awx-host https://awx.example.com --awx-token TOKEN \\
+      --out artifacts/awx_snapshot.sqlite
+
+crawls, concurrently, into one indexed file:
+
+- projects, job templates, credentials (metadata only; AWX never returns
+  secrets), notification templates and schedules (list endpoints)
+- survey specs of JTs with survey_enabled
+- which JTs each notification template is attached to (started/success/error)
+- the /credentials/ sub-list of JTs whose summary_fields are truncated
+
+  python3 awx_snapshot.py refresh --snapshot artifacts/awx_snapshot.sqlite \\
+      --awx-host https://awx.example.com --awx-token TOKEN
+
+brings an existing snapshot up to date incrementally (see refresh()).
+
+migrate_projects.py and migrate_job_templates.py take --source-snapshot PATH
+and then read AWX from the file instead of the API. The snapshot records the
+AWX host it was taken from; the migrators only use it for that host.
+
+The file is written under a temporary name and renamed when complete, so an
+interrupted crawl never leaves a half snapshot behind.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import awx_codec
+import awx_http
+
+SCHEMA_VERSION = 1
+DEFAULT_PATH = os.path.join("artifacts", "awx_snapshot.sqlite")
+LIST_KINDS = ("projects", "job_templates", "credentials", "notification_templates", "schedules")
+NOTIF_KINDS = ("started", "success", "error")
+SCHEDULE_DETAIL_FIELDS = ("rrule", "extra_data")
+INSERT_BATCH = 500
+PROBE_CHUNK = 200          # ids per id__in existence probe
+CLOCK_MARGIN = timedelta(minutes=10)  # slack between our clock and AWX's for time-based filters
+
+
+class Snapshot:
+    """
+    Rows are (kind, id, name, parent, modified, body). Besides the LIST_KINDS,
+    derived kinds keyed by JT id: "survey_specs", "jt_credentials" and
+    "jt_notifications" ({"started": [nt ids], ...}). Schedules carry their
+    unified_job_template as parent.
+    """
+
+    def __init__(self, path: str, create: bool = False) -> None:
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(f"snapshot not found: {path}")
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            " kind TEXT, id INTEGER, name TEXT, parent INTEGER, modified TEXT, body TEXT,"
+            " PRIMARY KEY (kind, id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_name ON objects(kind, name)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_parent ON objects(kind, parent)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # ---- writing ----
+    def put_many(self, kind: str, objs: Iterable[Dict[str, Any]], key: str = "id", parent: Optional[str] = None) -> int:
+        n = 0
+        batch: List[Tuple[Any, ...]] = []
+        for o in objs:
+            batch.append((kind, o[key], o.get("name"), o.get(parent) if parent else None,
+                          o.get("modified"), awx_codec.dumps(o)))
+            if len(batch) >= INSERT_BATCH:
+                n += self._insert(batch)
+                batch = []
+        if batch:
+            n += self._insert(batch)
+        return n
+
+    def put(self, kind: str, oid: int, body: Any) -> None:
+        self._insert([(kind, oid, None, None, None, awx_codec.dumps(body))])
+
+    def _insert(self, rows: List[Tuple[Any, ...]]) -> int:
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    def delete(self, kind: str, ids: Iterable[int]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("DELETE FROM objects WHERE kind = ? AND id = ?", [(kind, i) for i in ids])
+            self._db.execute("COMMIT")
+
+    def clear(self, kind: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE kind = ?", (kind,))
+
+    def ids(self, kind: str) -> List[int]:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT id FROM objects WHERE kind = ? ORDER BY id", (kind,))]
+
+    def watermark(self, kind: str) -> Optional[str]:
+        """Newest AWX 'modified' stored for a kind (AWX's clock, so no skew)."""
+        with self._lock:
+            return self._db.execute("SELECT MAX(modified) FROM objects WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def set_meta(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def source(self) -> str:
+        return (self.meta("source") or "").rstrip("/")
+
+    # ---- reading ----
+    def _rows(self, sql: str, params: Tuple[Any, ...]) -> List[Any]:
+        with self._lock:
+            return [awx_codec.loads(r[0]) for r in self._db.execute(sql, params).fetchall()]
+
+    def objects(self, kind: str, after_id: int = 0) -> Iterator[Dict[str, Any]]:
+        """All objects of a kind in id order (read in chunks, like a keyset scan)."""
+        last = after_id
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, body FROM objects WHERE kind = ? AND id > ? ORDER BY id LIMIT ?",
+                    (kind, last, INSERT_BATCH),
+                ).fetchall()
+            if not rows:
+                return
+            for _, body in rows:
+                yield awx_codec.loads(body)
+            last = rows[-1][0]
+
+    def get(self, kind: str, oid: int) -> Optional[Any]:
+        res = self._rows("SELECT body FROM objects WHERE kind = ? AND id = ?", (kind, oid))
+        return res[0] if res else None
+
+    def children(self, kind: str, parent: int) -> List[Dict[str, Any]]:
+        return self._rows("SELECT body FROM objects WHERE kind = ? AND parent = ? ORDER BY id", (kind, parent))
+
+    def survey_spec(self, jt_id: int) -> Optional[Dict[str, Any]]:
+        spec = self.get("survey_specs", jt_id)
+        return spec if isinstance(spec, dict) and spec.get("spec") else None
+
+    def jt_credentials(self, jt_id: int) -> List[Dict[str, Any]]:
+        """The JT's credentials as /credentials/ rows (crawled sub-list, else summary ids joined to credentials)."""
+        stored = self.get("jt_credentials", jt_id)
+        if stored is not None:
+            return stored
+        jt = self.get("job_templates", jt_id) or {}
+        out = []
+        for c in (jt.get("summary_fields") or {}).get("credentials") or []:
+            full = self.get("credentials", c.get("id"))
+            if full:
+                out.append(full)
+        return out
+
+    def jt_notifications(self, jt_id: int) -> Dict[str, List[Dict[str, Any]]]:
+        ids = self.get("jt_notifications", jt_id) or {}
+        return {k: [n for n in (self.get("notification_templates", i) for i in ids.get(k, [])) if n]
+                for k in NOTIF_KINDS}
+
+    def notification_map(self) -> Dict[int, Dict[str, List[Dict[str, Any]]]]:
+        """{jt id: {"started": [notification template], ...}} for every JT with attachments."""
+        notifs = {n["id"]: n for n in self.objects("notification_templates")}
+        out: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        with self._lock:
+            rows = self._db.execute("SELECT id, body FROM objects WHERE kind = 'jt_notifications'").fetchall()
+        for jt_id, body in rows:
+            ids = awx_codec.loads(body)
+            out[jt_id] = {k: [notifs[i] for i in ids.get(k, []) if i in notifs] for k in NOTIF_KINDS}
+        return out
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT kind, COUNT(*) FROM objects GROUP BY kind").fetchall())
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_for(path: str, awx_host: str) -> Snapshot:
+    """Open a snapshot and make sure it was taken from awx_host."""
+    snap = Snapshot(path)
+    if snap.source != awx_host.rstrip("/"):
+        raise SystemExit(f"Snapshot {path} was taken from {snap.source or '?'}, not {awx_host}")
+    return snap
+
+
+# ---------- crawl ----------
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _summary_truncated(jt: Dict[str, Any]) -> bool:
+    creds = (jt.get("summary_fields") or {}).get("credentials")
+    if isinstance(creds, dict):
+        results = creds.get("results") or []
+        return creds.get("count", len(results)) > len(results)
+    return not isinstance(creds, list)
+
+
+def _ts(stamp: str) -> datetime:
+    return datetime.fromisoformat(stamp.replace("Z", "+00:00"))  # AWX writes 'Z', we write '+00:00'
+
+
+def rewind(stamp: str) -> str:
+    """A timestamp CLOCK_MARGIN before stamp, as the lower bound of a time-based filter."""
+    return (_ts(stamp) - CLOCK_MARGIN).isoformat()
+
+
+def _earlier(a: str, b: Optional[str]) -> str:
+    """The earlier of two timestamps; a when b is missing."""
+    return a if not b or _ts(a) <= _ts(b) else b
+
+
+def _list_url(awx_host: str, kind: str, **params: Any) -> str:
+    return awx_http.with_query(f"{awx_host}/api/v2/{kind}/?page_size=200", **params)
+
+
+def _parent(kind: str) -> Optional[str]:
+    return "unified_job_template" if kind == "schedules" else None
+
+
+class _Crawl:
+    """Per-object follow-up reads shared by crawl() and refresh()."""
+
+    def __init__(self, snap: Snapshot, awx_host: str, hdrs: Dict[str, str], verify: bool,
+                 pool: ThreadPoolExecutor) -> None:
+        self.snap, self.host, self.hdrs, self.verify, self.pool = snap, awx_host, hdrs, verify, pool
+
+    def get(self, path: str) -> Any:
+        return awx_http.get_json(f"{self.host}/api/v2/{path}", self.hdrs, self.verify)
+
+    def jt_details(self, jts: List[Dict[str, Any]]) -> None:
+        """Survey spec and (when the summary is truncated) /credentials/ for each JT; stale rows are dropped."""
+        def one(jt: Dict[str, Any]) -> None:
+            spec = self.get(f"job_templates/{jt['id']}/survey_spec/") if jt.get("survey_enabled") else None
+            if isinstance(spec, dict) and spec.get("spec"):
+                self.snap.put("survey_specs", jt["id"], spec)
+            else:
+                self.snap.delete("survey_specs", [jt["id"]])
+            if _summary_truncated(jt):
+                u = f"{self.host}/api/v2/job_templates/{jt['id']}/credentials/?page_size=200"
+                self.snap.put("jt_credentials", jt["id"], list(awx_http.iter_pages(u, self.hdrs, self.verify)))
+            else:
+                self.snap.delete("jt_credentials", [jt["id"]])
+        list(self.pool.map(one, jts))
+
+    def schedule_details(self, scheds: List[Dict[str, Any]]) -> None:
+        thin = [sch for sch in scheds if any(k not in sch for k in SCHEDULE_DETAIL_FIELDS)]
+        full = list(self.pool.map(lambda sch: self.get(f"schedules/{sch['id']}/"), thin))
+        self.snap.put_many("schedules", full, parent="unified_job_template")
+
+    def notification_map(self) -> None:
+        """Rebuild jt_notifications with reverse filters (3 queries per notification template)."""
+        def attached(nt_kind: Tuple[int, str]) -> Tuple[int, str, List[int]]:
+            nt_id, kind = nt_kind
+            u = _list_url(self.host, "job_templates", **{f"notification_templates_{kind}": nt_id})
+            return nt_id, kind, [jt["id"] for jt in awx_http.iter_pages(u, self.hdrs, self.verify)]
+
+        by_jt: Dict[int, Dict[str, List[int]]] = {}
+        jobs = [(nt_id, k) for nt_id in self.snap.ids("notification_templates") for k in NOTIF_KINDS]
+        for nt_id, kind, jt_ids in self.pool.map(attached, jobs):
+            for jt_id in jt_ids:
+                by_jt.setdefault(jt_id, {k: [] for k in NOTIF_KINDS})[kind].append(nt_id)
+        self.snap.clear("jt_notifications")
+        for jt_id in sorted(by_jt):
+            self.snap.put("jt_notifications", jt_id, by_jt[jt_id])
+
+    def deleted_ids(self, kind: str, ids: List[int]) -> List[int]:
+        return deleted_ids(self.host, kind, ids, self.hdrs, self.verify, self.pool)
+
+
+def deleted_ids(awx_host: str, kind: str, ids: List[int], hdrs: Dict[str, str], verify: bool,
+                pool: Optional[ThreadPoolExecutor] = None) -> List[int]:
+    """
+    Which of `ids` no longer exist in AWX. Each chunk of PROBE_CHUNK ids costs
+    one ?id__in=...&page_size=1 request that only returns a count; a chunk is
+    listed only when its count comes back short.
+    """
+    def probe(chunk: List[int]) -> List[int]:
+        ids_param = ",".join(str(i) for i in chunk)
+        d = awx_http.get_json(_list_url(awx_host, kind, id__in=ids_param, page_size=1), hdrs, verify)
+        if d.get("count", 0) >= len(chunk):
+            return []
+        present = {o["id"] for o in awx_http.iter_pages(_list_url(awx_host, kind, id__in=ids_param), hdrs, verify)}
+        return [i for i in chunk if i not in present]
+
+    chunks = [ids[k:k + PROBE_CHUNK] for k in range(0, len(ids), PROBE_CHUNK)]
+    results = pool.map(probe, chunks) if pool else map(probe, chunks)
+    return [i for gone in results for i in gone]
+
+
+def _finish(snap: Snapshot, tmp: str, out_path: str) -> Dict[str, int]:
+    snap.set_meta("finished_at", _now())
+    counts = snap.counts()
+    snap.close()
+    os.replace(tmp, out_path)
+    return counts
+
+
+def crawl(awx_host: str, token: str, verify: bool, out_path: str, workers: int = 8) -> Dict[str, int]:
+    awx_host = awx_host.rstrip("/")
+    hdrs = awx_http.headers(token)
+    d = os.path.dirname(out_path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{out_path}.partial"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    snap = Snapshot(tmp, create=True)
+    snap.set_meta("version", SCHEMA_VERSION)
+    snap.set_meta("source", awx_host)
+    snap.set_meta("started_at", _now())
+
+    def list_kind(kind: str) -> List[Dict[str, Any]]:
+        objs = list(awx_http.iter_pages(_list_url(awx_host, kind), hdrs, verify))
+        snap.put_many(kind, objs, parent=_parent(kind))
+        return objs
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="snap") as pool:
+        lists = dict(zip(LIST_KINDS, pool.map(list_kind, LIST_KINDS)))
+        c = _Crawl(snap, awx_host, hdrs, verify, pool)
+        c.jt_details(lists["job_templates"])
+        c.schedule_details(lists["schedules"])
+        c.notification_map()
+    return _finish(snap, tmp, out_path)
+
+
+def refresh(path: str, awx_host: str, token: str, verify: bool, workers: int = 8) -> Dict[str, Any]:
+    """
+    Bring a snapshot up to date without recrawling it:
+
+    - each kind: ?modified__gt=<start of the last crawl, or the newest stored
+      modified if older> returns what changed, including objects edited
+      while that crawl ran; deletions are found by count-only id__in probes
+      over the stored ids
+    - JTs are also re-read when their project, inventory or credentials
+      changed (their summary_fields embed those names), and when the activity
+      stream shows credential/notification (dis)associations since the last
+      crawl, which do not bump the JT's own modified
+    - survey specs / truncated credential lists follow the changed JTs; the
+      notification -> JT map is rebuilt (3 small queries per notification)
+
+    The result matches a full crawl taken at the same moment. Works on a copy
+    that replaces the snapshot only when complete.
+    """
+    awx_host = awx_host.rstrip("/")
+    hdrs = awx_http.headers(token)
+    old = Snapshot(path)
+    if old.source != awx_host:
+        raise SystemExit(f"Snapshot {path} was taken from {old.source or '?'}, not {awx_host}")
+    since_raw = old.meta("started_at")
+    old.close()
+    tmp = f"{path}.partial"
+    shutil.copyfile(path, tmp)
+    snap = Snapshot(tmp)
+    since = rewind(since_raw) if since_raw else None
+    snap.set_meta("started_at", _now())
+    report: Dict[str, Any] = {"changed": {}, "deleted": {}}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="snap") as pool:
+        c = _Crawl(snap, awx_host, hdrs, verify, pool)
+
+        def changed(kind: str) -> List[Dict[str, Any]]:
+            wm = snap.watermark(kind)
+            if not wm:
+                return list(awx_http.iter_pages(_list_url(awx_host, kind), hdrs, verify))
+            # The last crawl was not atomic: an object on an early page edited while later pages
+            # were read is older than the watermark those pages set. So start at that crawl's start.
+            return list(awx_http.iter_pages(_list_url(awx_host, kind, modified__gt=_earlier(wm, since)),
+                                            hdrs, verify))
+
+        stored = {kind: snap.ids(kind) for kind in LIST_KINDS}
+        delta = dict(zip(LIST_KINDS, pool.map(changed, LIST_KINDS)))
+        # one kind at a time: deleted_ids runs its probes on this pool, so it must not wait inside it
+        gone = {kind: c.deleted_ids(kind, stored[kind]) for kind in LIST_KINDS}
+
+        jts = {jt["id"]: jt for jt in delta["job_templates"]}
+        if since:
+            for rel in ("project", "inventory", "credentials"):
+                u = _list_url(awx_host, "job_templates", **{f"{rel}__modified__gt": since})
+                jts.update((jt["id"], jt) for jt in awx_http.iter_pages(u, hdrs, verify))
+            try:
+                u = _list_url(awx_host, "activity_stream", timestamp__gt=since,
+                              operation__in="associate,disassociate")
+                touched = {jt["id"] for e in awx_http.iter_pages(u, hdrs, verify)
+                           for jt in (e.get("summary_fields") or {}).get("job_template", [])}
+                todo = sorted(touched - set(jts))
+                for k in range(0, len(todo), PROBE_CHUNK):
+                    ids_param = ",".join(str(i) for i in todo[k:k + PROBE_CHUNK])
+                    u = _list_url(awx_host, "job_templates", id__in=ids_param)
+                    jts.update((jt["id"], jt) for jt in awx_http.iter_pages(u, hdrs, verify))
+            except Exception as e:
+                print(f"WARN: activity stream unavailable ({e}); credential (dis)associations on otherwise "
+                      f"unchanged JTs are not picked up", file=sys.stderr)
+        delta["job_templates"] = [jts[i] for i in sorted(jts)]
+
+        for kind in LIST_KINDS:
+            snap.put_many(kind, delta[kind], parent=_parent(kind))
+            snap.delete(kind, gone[kind])
+            report["changed"][kind] = len(delta[kind])
+            report["deleted"][kind] = len(gone[kind])
+        for derived in ("survey_specs", "jt_credentials"):
+            snap.delete(derived, gone["job_templates"])
+        c.jt_details(delta["job_templates"])
+        c.schedule_details(delta["schedules"])
+        c.notification_map()
+    report["counts"] = _finish(snap, tmp, path)
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Offline AWX source snapshot for the migrators")
+    sub = p.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("snapshot", help="Crawl AWX into a new SQLite snapshot")
+    s.add_argument('--out', default=DEFAULT_PATH, help=f'Snapshot file (default: {DEFAULT_PATH})')
+    r = sub.add_parser("refresh", help="Update an existing snapshot with what changed in AWX since it was taken")
+    r.add_argument('--snapshot', default=DEFAULT_PATH, help=f'Snapshot file (default: {DEFAULT_PATH})')
+    for sp in (s, r):
+        sp.add_argument('--awx-host', required=True)
+        sp.add_argument('--awx-token', required=True)
+        sp.add_argument('--verify-tls', action='store_true')
+        sp.add_argument('--workers', type=int, default=8, help='Concurrent crawl requests (default: 8)')
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    awx_http.configure(pool_size=max(awx_http.POOL_SIZE, args.workers))
+    awx_http.set_host_budget(args.awx_host, args.workers)
+    if args.command == "refresh":
+        report = refresh(args.snapshot, args.awx_host, args.awx_token, args.verify_tls, args.workers)
+        counts = report["counts"]
+        print(f"Snapshot refreshed: {args.snapshot}")
+        for kind in LIST_KINDS:
+            print(f"  {kind:24s} {report['changed'][kind]} changed, {report['deleted'][kind]} deleted")
+    else:
+        counts = crawl(args.awx_host, args.awx_token, args.verify_tls, args.out, args.workers)
+        print(f"Snapshot written to {args.out}")
+    for kind, n in sorted(counts.items()):
+        print(f"  {kind:24s} {n}")
+    st = awx_http.stats().get(awx_http.host_key(args.awx_host), {})
+    print(f"  AWX requests: {st.get('requests', 0)}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr); sys.exit(1)
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
 from pathlib import Path
 
+import awx_codec
+
 
 def map_username(username, user_map, seen_users):
     """Map an AWX username to a target LDAP username using a provided map."""
@@ -12,12 +13,9 @@ def map_username(username, user_map, seen_users):
     return user_map.get(username, username)
 
 
-def transform_export(input_path, output_path, user_mapping_path, strip_users):
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    with open(user_mapping_path, "r", encoding="utf-8") as f:
-        user_map = json.load(f)
+def transform_export(input_path, output_path, user_mapping_path, strip_users, compact=False):
+    data = awx_codec.load_file(input_path)
+    user_map = awx_codec.load_file(user_mapping_path)
 
     seen_users = set()
 
@@ -63,8 +61,7 @@ def transform_export(input_path, output_path, user_mapping_path, strip_users):
             print(f"   - {u}")
 
     # Write the output
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    awx_codec.dump_file(data, output_path, compact=compact)
     print(f"✅ Output written to: {output_path}")
 
 
@@ -76,6 +73,7 @@ def main():
     parser.add_argument("--output", required=True, help="Path to write the transformed JSON")
     parser.add_argument("--mapping", required=True, help="Path to user mapping JSON")
     parser.add_argument("--strip-local-users", action="store_true", help="Remove local users section")
+    parser.add_argument("--compact", action="store_true", help="Write the output without indentation (smaller, faster)")
     args = parser.parse_args()
 
     for path in (args.input, args.mapping):
@@ -83,7 +81,7 @@ def main():
             print(f"❌ File not found: {path}")
             sys.exit(1)
 
-    transform_export(args.input, args.output, args.mapping, args.strip_local_users)
+    transform_export(args.input, args.output, args.mapping, args.strip_local_users, args.compact)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Migrate AWX job templates to AAP together with what they depend on, as one
+dependency graph instead of one script per object type:
+
+  project ---------------> job template --> survey
+  credential lookup -----------------------> credential attachments
+  email notification template -------------> notification attachments
+                           job template --> schedules
+
+A node runs as soon as every node it depends on has succeeded, with up to
+--workers nodes in flight (the per-host limits in awx_http still apply). A
+failed node blocks only its own dependents: a missing credential stops that
+JT's credential attachment, not its schedules or any other template.
+
+The node bodies are the migrators' per-object functions
+(migrate_projects.ensure_project / clean_project_for_aap,
+migrate_job_templates.find_or_create_jt / jt_payload_from_awx, sync_survey,
+resolve_cred_ids, EmailNotifications.ensure, sync_schedules /
+try_create_schedule), so AAP sees the same requests as from the two
+scripts. Console output is held per node and released in the order the
+graph was built (per template: its project, credentials and notifications,
+then the template and its attachments).
+
+  python3 migrate_dag.py --awx-host ... --awx-token ... --aap-host ... --aap-token ... \\
+    --organization-id 1 --force-ee-id 5 --force-machine-cred-id 31 \\
+    --with-notifications --with-schedules --workers 16
+"""
+import argparse
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+import aap_catalog
+import awx_http
+import awx_ledger
+import awx_snapshot
+import migrate_job_templates as mjt
+import migrate_projects as mp
+
+DEFAULT_WORKERS = 8
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Migrate AWX projects, notifications and job templates to AAP as a DAG")
+    p.add_argument('--awx-host', required=True)
+    p.add_argument('--awx-token', required=True)
+    p.add_argument('--aap-host', required=True)
+    p.add_argument('--aap-token', required=True)
+    p.add_argument('--organization-id', required=True, type=int)
+
+    p.add_argument('--include', help='regex on template name')
+    p.add_argument('--exclude', help='regex on template name')
+    p.add_argument('--resume-after-id', type=int, default=0, help='Only AWX JTs with id greater than this')
+    p.add_argument('--dry-run', action='store_true')
+    p.add_argument('--verify-tls', action='store_true')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                   help=f'Graph nodes run concurrently (default: {DEFAULT_WORKERS})')
+    p.add_argument('--http-pool-size', type=int, default=awx_http.POOL_SIZE,
+                   help=f'Keep-alive connections per host (default: {awx_http.POOL_SIZE})')
+    p.add_argument('--awx-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AWX (source) requests')
+    p.add_argument('--aap-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AAP (target) requests')
+    p.add_argument('--latency-target-ms', type=int, default=int(awx_http.LATENCY_TARGET * 1000),
+                   help='p95 latency under which the limiter keeps widening its window')
+    p.add_argument('--source-snapshot', metavar='PATH',
+                   help='Read AWX from a snapshot made by awx_snapshot.py instead of the API')
+    p.add_argument('--no-aap-catalog', dest='aap_catalog', action='store_false',
+                   help='Look AAP objects up by name one query at a time instead of preloading the org catalog')
+    p.add_argument('--ledger', metavar='PATH', default=awx_ledger.DEFAULT_PATH,
+                   help=f'AWX -> AAP id ledger ("" = off; default: {awx_ledger.DEFAULT_PATH})')
+    p.add_argument('--ledger-json', metavar='PATH', help='After the run, export the ledger as JSON here')
+
+    p.add_argument('--force-ee-id', type=int, help='AAP Execution Environment id set on migrated JTs')
+    p.add_argument('--force-machine-cred-id', type=int, help='AAP Credential id attached for AWX Machine creds')
+    p.add_argument('--force-inventory-id', type=int, default=50,
+                   help='AAP Inventory id set on migrated JTs and schedules (default: 50)')
+
+    p.add_argument('--with-notifications', action='store_true', help='Migrate and attach EMAIL notification templates')
+    p.add_argument('--notif-secrets-file', help='YAML/JSON for redacted email fields, keyed by notif name')
+    p.add_argument('--with-schedules', action='store_true', help='Migrate schedules of each JT')
+    p.add_argument('--schedule-stats', metavar='PATH', default=mjt.DEFAULT_VARIANT_STATS,
+                   help=f'Schedule payload variant counts ("" = this run only; default: {mjt.DEFAULT_VARIANT_STATS})')
+    p.add_argument('--probe-all-surveys', action='store_true',
+                   help='Also read survey_spec for JTs with survey_enabled=false')
+    p.add_argument('--verify-surveys', action='store_true',
+                   help='After the run, re-read every copied survey from AAP and compare it with AWX')
+    args = p.parse_args()
+    args.awx_host = mjt.norm(args.awx_host)
+    args.aap_host = mjt.norm(args.aap_host)
+    # Options of migrate_job_templates that the shared per-object functions read.
+    args.schedules_only = False
+    args.shard = None
+    args.all = True
+    return args
+
+
+class Node:
+    def __init__(self, key: str, kind: str, label: str, fn: Callable[..., Any], deps: Tuple[str, ...]) -> None:
+        self.key = key
+        self.kind = kind
+        self.label = label
+        self.fn = fn
+        self.deps = deps
+        self.slot = 0
+        self.status = "pending"  # -> ok | failed | blocked
+        self.result: Any = None
+        self.waiting = len(deps)
+        self.dependents: List["Node"] = []
+
+
+class Dag:
+    """
+    Nodes are added dependencies first (add() refuses unknown deps, so the
+    graph cannot have cycles). run() starts every node without dependencies
+    and each completion releases the dependents it was the last one holding.
+    A node's fn gets the results of its deps, in the order they were listed.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Node] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.nodes
+
+    def add(self, key: str, kind: str, label: str, fn: Callable[..., Any], deps: Iterable[str] = ()) -> str:
+        if key in self.nodes:
+            return key
+        deps = tuple(dict.fromkeys(deps))
+        for d in deps:
+            if d not in self.nodes:
+                raise ValueError(f"{key}: unknown dependency {d}")
+        node = Node(key, kind, label, fn, deps)
+        node.slot = len(self.nodes) + 1
+        for d in deps:
+            self.nodes[d].dependents.append(node)
+        self.nodes[key] = node
+        return key
+
+    def run(self, workers: int) -> None:
+        if not self.nodes:
+            return
+        out = awx_http.OrderedOutput()
+        pool = ThreadPoolExecutor(max(1, workers), thread_name_prefix="dag")
+        lock = threading.Lock()
+        left = [len(self.nodes)]
+        finished = threading.Event()
+        aborted: List[BaseException] = []  # KeyboardInterrupt/SystemExit in a node; re-raised once the pool is down
+
+        def execute(node: Node) -> None:
+            out.bind(node.slot)
+            try:
+                if aborted:
+                    node.status = "blocked"  # drain the graph without starting more work
+                else:
+                    node.result = node.fn(*[self.nodes[d].result for d in node.deps])
+                    node.status = "ok"
+            except Exception as e:
+                node.status = "failed"
+                print(f"[{node.key}] ERROR: {node.label}: {e}", file=sys.stderr)
+                mjt.emit("dag.fail", node=node.key, error=str(e))
+            except BaseException as e:
+                node.status = "failed"
+                aborted.append(e)
+            finally:
+                out.bind(None)
+                complete(node)
+
+        def complete(node: Node) -> None:
+            ready: List[Node] = []
+            blocked: List[Node] = []
+            with lock:
+                left[0] -= 1
+                for d in node.dependents:
+                    if d.status != "pending":
+                        continue
+                    if node.status != "ok":
+                        d.status = "blocked"
+                        blocked.append(d)
+                    else:
+                        d.waiting -= 1
+                        if d.waiting == 0:
+                            ready.append(d)
+                if left[0] == 0:
+                    finished.set()
+            out.finish(node.slot)
+            for d in blocked:
+                out.bind(d.slot)
+                print(f"[{d.key}] BLOCKED: {d.label}: {node.key} {node.status}")
+                out.bind(None)
+                complete(d)
+            for d in ready:
+                pool.submit(execute, d)
+
+        out.install()
+        try:
+            for node in list(self.nodes.values()):
+                if not node.deps:
+                    pool.submit(execute, node)
+            finished.wait()
+        finally:
+            pool.shutdown(wait=True)
+            out.uninstall()
+        if aborted:
+            raise aborted[0]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {status: n}} over all nodes."""
+        out: Dict[str, Dict[str, int]] = {}
+        for node in self.nodes.values():
+            by = out.setdefault(node.kind, {"ok": 0, "failed": 0, "blocked": 0})
+            by[node.status] = by.get(node.status, 0) + 1
+        return out
+
+
+# ---------- node bodies ----------
+def project_node(args: argparse.Namespace, awx_proj: Optional[Dict[str, Any]], proj_id: int,
+                 key: str) -> Callable[[], Optional[Dict[str, Any]]]:
+    def run() -> Optional[Dict[str, Any]]:
+        if awx_proj is None:
+            raise RuntimeError(f"AWX project {proj_id} not found")
+        name = awx_proj.get('name', f"project-{proj_id}")
+        return mp.ensure_project(args, awx_proj, name, f"[{key}] ")[1]
+    return run
+
+
+def jt_node(args: argparse.Namespace, obj: Dict[str, Any]) -> Callable[..., Tuple[Optional[int], Any]]:
+    def run(proj: Optional[Dict[str, Any]] = None) -> Tuple[Optional[int], Any]:
+        proj_id = proj.get('id') if proj else None
+        return mjt.find_or_create_jt(args, obj, proj_id, args.force_inventory_id, args.force_ee_id)
+    return run
+
+
+def survey_node(args: argparse.Namespace, obj: Dict[str, Any], ctx: mjt.RunContext) -> Callable[..., None]:
+    def run(jt: Tuple[Optional[int], Any]) -> None:
+        jt_id, existing = jt
+        if jt_id is None:
+            return
+        spec = mjt.awx_jt_survey_spec(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
+        if spec:
+            mjt.sync_survey(args, jt_id, obj.get('name', ''), existing, spec, ctx)
+    return run
+
+
+def credential_node(args: argparse.Namespace, cred: Dict[str, Any]) -> Callable[[], int]:
+    def run() -> int:
+        return mjt.resolve_cred_ids(args.aap_host, args.aap_token, args.organization_id, args.verify_tls,
+                                    [cred], args.force_machine_cred_id)[0]
+    return run
+
+
+def attach_credentials_node(args: argparse.Namespace) -> Callable[..., None]:
+    def run(jt: Tuple[Optional[int], Any], *cred_ids: int) -> None:
+        jt_id = jt[0]
+        if jt_id is None:
+            return
+        if args.dry_run:
+            print("  DRY-RUN: would attach credentials")
+            return
+        ids = list(dict.fromkeys(cred_ids))
+        for cid in ids:
+            mjt.attach_cred_to_jt(args.aap_host, args.aap_token, jt_id, cid, args.verify_tls)
+        print(f"  Attached {len(ids)} credential(s)")
+    return run
+
+
+def attach_notifications_node(args: argparse.Namespace, notifs: Dict[str, List[Dict[str, Any]]],
+                              secrets: Dict[str, Dict[str, Any]],
+                              catalog: mjt.EmailNotifications) -> Callable[..., None]:
+    def run(jt: Tuple[Optional[int], Any], *_notif_ids: int) -> None:
+        jt_id = jt[0]
+        if jt_id is None:
+            return
+        if args.dry_run:
+            print("  DRY-RUN: would create/attach email notifications")
+            return
+        mjt.attach_notifs_email(args.aap_host, args.aap_token, jt_id, args.organization_id, args.verify_tls,
+                                notifs, secrets, args.dry_run, catalog)
+        print("  Processed notifications (email)")
+    return run
+
+
+def schedules_node(args: argparse.Namespace, schedules: List[Dict[str, Any]], rejected: Set[int],
+                   ctx: mjt.RunContext) -> Callable[..., None]:
+    def run(jt: Tuple[Optional[int], Any]) -> None:
+        if jt[0] is not None:
+            mjt.sync_schedules(args, jt[0], args.force_inventory_id, schedules, rejected, ctx)
+    return run
+
+
+def credential_key(args: argparse.Namespace, cred: Dict[str, Any]) -> Optional[str]:
+    type_name = ((cred.get('summary_fields') or {}).get('credential_type') or {}).get('name') or ''
+    if args.force_machine_cred_id is not None and type_name.lower() == 'machine':
+        return "credential:forced-machine"
+    if not cred.get('name'):
+        return None
+    return f"credential:{type_name}/{cred['name']}"
+
+
+# ---------- graph ----------
+def build(args: argparse.Namespace, ctx: mjt.RunContext, secrets: Dict[str, Dict[str, Any]],
+          inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> Tuple[Dag, int]:
+    """
+    Walk the in-scope AWX JTs and add their nodes; AWX reads (credentials,
+    notification mapping, schedules with local rrule checks) happen here,
+    AAP writes only in Dag.run(). Returns the graph and the filtered count.
+    """
+    a, t, v = args.awx_host, args.awx_token, args.verify_tls
+    dag = Dag()
+    filtered = 0
+    projects: Optional[Dict[int, Dict[str, Any]]] = None
+    ctx.set_filter(inc, exc)
+    if args.with_notifications:
+        ctx.notifications = mjt.EmailNotifications(args, secrets)
+        ctx.notifications.scan(inc, exc)
+
+    for obj in ctx.preload(mjt.awx_jts(a, t, v, args.resume_after_id)):
+        name = obj.get('name', f"jt-{obj.get('id', '?')}")
+        if not mjt.filt(name, inc, exc):
+            print(f"SKIP (filtered): {name}")
+            filtered += 1
+            continue
+        jkey = f"jt:{obj['id']}"
+        jt_deps: List[str] = []
+
+        proj_ref = ((obj.get('summary_fields') or {}).get('project') or {}).get('id') or obj.get('project')
+        if proj_ref:
+            pkey = f"project:{proj_ref}"
+            if pkey not in dag:
+                if projects is None:
+                    projects = {p['id']: p for p in mp.paged_awx_projects(a, t, v)}
+                proj = projects.get(proj_ref)
+                dag.add(pkey, "project", (proj or {}).get('name', pkey), project_node(args, proj, proj_ref, pkey))
+            jt_deps.append(pkey)
+
+        creds = mjt.jt_creds_from_summary(obj)
+        if creds is None:
+            creds = list(mjt.awx_jt_creds(a, t, obj['id'], v))
+        cred_keys: List[str] = []
+        for c in creds:
+            ckey = credential_key(args, c)
+            if ckey:
+                dag.add(ckey, "credential", c.get('name', ckey), credential_node(args, c))
+                cred_keys.append(ckey)
+
+        notifs: Dict[str, List[Dict[str, Any]]] = {}
+        notif_keys: List[str] = []
+        if args.with_notifications:
+            notifs = ctx.notifications.for_jt(obj['id']) or mjt.awx_jt_notifications(a, t, obj['id'], v)
+            for n in (n for kind in notifs.values() for n in kind if mjt._is_email(n)):
+                nkey = f"notification:{n['name']}"
+                dag.add(nkey, "notification", n['name'], lambda n=n: ctx.notifications.ensure(n))
+                notif_keys.append(nkey)
+
+        schedules: List[Dict[str, Any]] = []
+        rejected: Set[int] = set()
+        if args.with_schedules:
+            schedules, rejected = mjt.read_schedules(args, obj, ctx)
+
+        dag.add(jkey, "job_template", name, jt_node(args, obj), jt_deps)
+        if obj.get('survey_enabled') or args.probe_all_surveys:
+            dag.add(f"{jkey}:survey", "survey", name, survey_node(args, obj, ctx), [jkey])
+        if cred_keys:
+            dag.add(f"{jkey}:credentials", "credential_attach", name, attach_credentials_node(args), [jkey] + cred_keys)
+        if any(notifs.values()):
+            dag.add(f"{jkey}:notifications", "notification_attach", name,
+                    attach_notifications_node(args, notifs, secrets, ctx.notifications), [jkey] + notif_keys)
+        if schedules:
+            dag.add(f"{jkey}:schedules", "schedules", name, schedules_node(args, schedules, rejected, ctx), [jkey])
+    return dag, filtered
+
+
+def share_state(args: argparse.Namespace) -> None:
+    """Open the snapshot, catalog and ledger once and hand them to both migrator modules."""
+    if args.source_snapshot:
+        snap = awx_snapshot.open_for(args.source_snapshot, args.awx_host)
+        mjt._snapshot = snap
+        mp._snapshots[args.awx_host] = snap
+    if args.aap_catalog:
+        cat = aap_catalog.Catalog(args.aap_host, args.aap_token, args.verify_tls, args.organization_id,
+                                  mjt.catalog_kinds(args))
+        mjt.emit("aap.catalog", org=args.organization_id, counts=cat.load())
+        mjt._catalog = mp._catalog = cat
+    if args.ledger:
+        mjt._ledger = mp._ledger = awx_ledger.Ledger(args.ledger)
+
+
+def main() -> int:
+    args = parse_args()
+    awx_http.configure(pool_size=args.http_pool_size, latency_target=args.latency_target_ms / 1000.0)
+    awx_http.set_host_budget(args.awx_host, args.awx_max_inflight)
+    awx_http.set_host_budget(args.aap_host, args.aap_max_inflight)
+    awx_http.set_event_hook(mjt.emit)
+    mjt.ping(args.aap_host, args.aap_token, args.verify_tls)
+    mp.assert_org_exists(args.aap_host, args.aap_token, args.organization_id, args.verify_tls)
+    share_state(args)
+    mjt.preflight_forced_refs(args)
+
+    inc: Optional[Pattern[str]] = re.compile(args.include) if args.include else None
+    exc: Optional[Pattern[str]] = re.compile(args.exclude) if args.exclude else None
+    secrets = mjt.load_notif_secrets(args.notif_secrets_file) if args.with_notifications else {}
+
+    ctx = mjt.RunContext(args)
+    dag, filtered = build(args, ctx, secrets, inc, exc)
+    mjt.emit("dag.built", nodes=len(dag.nodes), workers=args.workers)
+    dag.run(args.workers)
+
+    survey_bad = mjt.verify_surveys(args, ctx.survey_checks) if ctx.survey_checks else 0
+    ctx.variants.save()
+    exported = mjt.finish_ledger(args)
+    counts = dag.counts()
+    mjt.emit("dag.summary", counts=counts, filtered=filtered)
+
+    print("\nSummary:")
+    print(f"  Filtered templates:   {filtered}")
+    for kind, by in counts.items():
+        print(f"  {kind + ':':21} {by['ok']} ok, {by['failed']} failed, {by['blocked']} blocked")
+    if args.verify_surveys:
+        print(f"  Surveys verified:     {len(ctx.survey_checks)} ({survey_bad} mismatched)")
+    if args.with_schedules:
+        print(f"  Schedules invalid:    {ctx.invalid_schedules} (rrule rejected locally, not sent)")
+    if mjt._ledger:
+        lc = mjt._ledger.counts
+        print(f"  Id ledger:            {lc['hit']} reused, {lc['stale']} stale dropped, {lc['recorded']} recorded"
+              + (f" (exported {exported} to {args.ledger_json})" if args.ledger_json else ""))
+    rs = awx_http.retry_stats()
+    print(f"  HTTP retries:         {rs['retries']} (waited {rs['wait_s']}s, creates recovered {rs['recovered_creates']})")
+    mjt.emit("http.stats", hosts=awx_http.stats(), retries=awx_http.retry_stats(), cache=awx_http.cache_stats())
+    failed = sum(by['failed'] for by in counts.values())
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
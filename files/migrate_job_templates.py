@@ -5,7 +5,7 @@ Migrate AWX Job Templates → AAP (Controller), single or bulk.
 Features:
 - Force EE by AAP id:              --force-ee-id 5
 - Force Machine cred by AAP id:    --force-machine-cred-id 31
-- Surveys: auto-copied from /survey_spec/ and enabled after create
+- Surveys: copied from /survey_spec/ and enabled (skipped when AAP already matches)
 - Email notifications:             --with-notifications [--notif-secrets-file secrets.(yml|json)]
 - Schedules:                       --with-schedules
 
@@ -15,25 +15,46 @@ Single JT:
 Bulk:
   python3 migrate_job_templates.py ... --all --force-ee-id 5 --force-machine-cred-id 31 \
     --with-notifications --with-schedules
+
+Bulk, many templates in flight (needs aiohttp):
+  python3 migrate_job_templates.py ... --all --engine async --concurrency 16
+
+Bulk, AWX reads overlapped with AAP writes (bounded read-ahead):
+  python3 migrate_job_templates.py ... --all --pipeline-depth 16
+
+Bulk, split over 4 processes (then: python3 awx_shards.py events --out ... shard outputs):
+  python3 migrate_job_templates.py ... --all --shard 1/4    # ... through --shard 4/4
 """
 import argparse
+import asyncio
+import calendar
+import functools
+import hashlib
 import os
 import sys
+import threading
 import datetime as dt
 import re
 import json
-from typing import Any, Optional, Dict, Iterable, Optional, Tuple, Pattern, List
+from typing import Any, Optional, Dict, Iterable, Iterator, Set, Tuple, Pattern, List
 from datetime import datetime, timezone
 try:
     from zoneinfo import ZoneInfo  # py>=3.9
 except Exception:  # pragma: no cover
     ZoneInfo = None
-
-import requests
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-TIMEOUT = 30
+try:
+    from dateutil import rrule as dateutil_rrule  # what Controller itself parses rrules with
+except Exception:
+    dateutil_rrule = None
+
+import aap_catalog
+import awx_cache
+import awx_codec
+import awx_http
+import awx_journal
+import awx_ledger
+import awx_shards
+import awx_snapshot
 
 RRULE_DT_RE   = re.compile(r"^DTSTART(?:;TZID=[^:]+)?:", re.IGNORECASE | re.MULTILINE)
 RRULE_RULE_RE = re.compile(r"^RRULE:", re.IGNORECASE | re.MULTILINE)
@@ -71,6 +92,54 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--exclude', help='regex on template name (bulk)')
     p.add_argument('--dry-run', action='store_true')
     p.add_argument('--verify-tls', action='store_true')
+    p.add_argument('--http-pool-size', type=int, default=awx_http.POOL_SIZE,
+                   help=f'Keep-alive connections per host (default: {awx_http.POOL_SIZE})')
+    p.add_argument('--source-snapshot', metavar='PATH',
+                   help='Read AWX from a snapshot made by awx_snapshot.py instead of the API (zero AWX calls)')
+    p.add_argument('--no-aap-catalog', dest='aap_catalog', action='store_false',
+                   help='Look AAP objects up by name one query at a time instead of preloading the org catalog')
+    p.add_argument('--ledger', metavar='PATH', default=awx_ledger.DEFAULT_PATH,
+                   help='AWX -> AAP id ledger, consulted before name lookups and updated as objects are mapped '
+                        f'("" = off; default: {awx_ledger.DEFAULT_PATH})')
+    p.add_argument('--ledger-json', metavar='PATH', help='After the run, export the ledger as JSON here')
+    j = p.add_mutually_exclusive_group()
+    j.add_argument('--journal', metavar='PATH',
+                   help='Append each completed step (JT found/created, survey, credentials, notifications, '
+                        'schedules) to this fsync\'d journal')
+    j.add_argument('--resume', metavar='PATH',
+                   help='Skip the steps recorded in this journal (no API calls for them) and keep appending to it')
+    p.add_argument('--http-cache', metavar='PATH',
+                   help=f'Persistent SQLite cache for AWX GETs (e.g. {awx_cache.DEFAULT_PATH}); off by default')
+    p.add_argument('--cache-ttl', type=float, default=0,
+                   help='Seconds a cached AWX response is used without asking AWX; after that it is revalidated (default: 0)')
+    p.add_argument('--cache-max-mb', type=int, default=awx_cache.DEFAULT_MAX_MB,
+                   help=f'Cache size cap; least-recently-used entries are evicted (default: {awx_cache.DEFAULT_MAX_MB})')
+    p.add_argument('--page-prefetch', type=int, default=awx_http.PAGE_WINDOW,
+                   help=f'AWX list pages fetched concurrently ahead of processing; 1 = sequential (default: {awx_http.PAGE_WINDOW})')
+    p.add_argument('--scan', choices=('page', 'keyset'), default='page',
+                   help='How the JT list is walked: page (?page=N) or keyset (?order_by=id&id__gt=<last id>)')
+    p.add_argument('--scan-ranges', type=int, default=1,
+                   help='With --scan keyset, split the id space into N ranges scanned in parallel (default: 1)')
+    p.add_argument('--resume-after-id', type=int, default=0,
+                   help='Only process AWX JTs with id greater than this (e.g. the value left in --cursor-file)')
+    p.add_argument('--cursor-file', metavar='PATH',
+                   help='Write the id of the last handled JT here as the bulk run progresses')
+    p.add_argument('--awx-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AWX (source) requests')
+    p.add_argument('--aap-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AAP (target) requests')
+    p.add_argument('--latency-target-ms', type=int, default=int(awx_http.LATENCY_TARGET * 1000),
+                   help='p95 latency under which the limiter keeps widening its window')
+    p.add_argument('--engine', choices=('sync', 'async'), default='sync',
+                   help='Bulk execution engine: sync (one JT at a time) or async (aiohttp, --concurrency JTs in flight)')
+    p.add_argument('--concurrency', type=int, default=8,
+                   help='Templates migrated concurrently with --engine async (default: 8)')
+    p.add_argument('--pipeline-depth', type=int, default=0,
+                   help='Read AWX templates and their sub-resources on a separate thread, up to N templates '
+                        'ahead of the AAP writes (0 = read and write in turn)')
+    p.add_argument('--shard', type=awx_shards.parse_shard, metavar='I/N',
+                   help='Bulk: only migrate the templates whose AWX id hashes to shard I of N; '
+                        'merge the N outputs with awx_shards.py events')
 
     # EE / credential overrides (by AAP ids)
     env_force_ee_id = os.getenv('FORCE_EE_ID')
@@ -95,6 +164,13 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--with-notifications', action='store_true', help='Migrate and attach EMAIL notification templates')
     p.add_argument('--notif-secrets-file', help='YAML/JSON for redacted email fields, keyed by notif name')
     p.add_argument('--with-schedules', action='store_true', help='Migrate schedules of each JT')
+    p.add_argument('--schedule-stats', metavar='PATH', default=DEFAULT_VARIANT_STATS,
+                   help='Per-AAP success counts of the schedule payload variants, used to try the likely winner first '
+                        f'and updated after the run ("" = this run only; default: {DEFAULT_VARIANT_STATS})')
+    p.add_argument('--probe-all-surveys', action='store_true',
+                   help='Also read survey_spec for JTs with survey_enabled=false (one extra GET per JT)')
+    p.add_argument('--verify-surveys', action='store_true',
+                   help='After the run, re-read every copied survey from AAP and compare it with AWX')
     p.add_argument(
         '--schedules-only',
         action='store_true',
@@ -108,73 +184,122 @@ def norm(h: str) -> str:
     return h.rstrip('/')
 
 def H(tok: str) -> Dict[str, str]:
-    return {"Authorization": f"Bearer {tok}", "Content-Type": "application/json", "Accept": "application/json"}
+    return awx_http.headers(tok)
 
 def GET(url: str, h: Dict[str, str], v: bool) -> Dict[str, Any]:
-    r = requests.get(url, headers=h, verify=v, timeout=TIMEOUT)
-    if r.status_code != 200:
-        raise RuntimeError(f"GET {url} -> {r.status_code}: {r.text}")
-    return r.json()
+    return awx_http.get_json(url, h, v)
 
-def POST(url: str, h: Dict[str, str], payload: Dict[str, Any], v: bool) -> Dict[str, Any]:
-    r = requests.post(url, headers=h, json=payload, verify=v, timeout=TIMEOUT)
-    if r.status_code in (200, 201, 202):
-        try:
-            return r.json()
-        except ValueError:
-            return {}
-    if r.status_code == 204:  # AAP often returns 204 for association endpoints
-        return {}
-    raise RuntimeError(f"POST {url} -> {r.status_code}:\n{r.text}")
+def POST(url: str, h: Dict[str, str], payload: Dict[str, Any], v: bool, idempotent: bool = False) -> Dict[str, Any]:
+    return awx_http.post_json(url, h, payload, v, idempotent)
 
 def PATCH(url: str, h: Dict[str, str], payload: Dict[str, Any], v: bool) -> Dict[str, Any]:
-    r = requests.patch(url, headers=h, json=payload, verify=v, timeout=TIMEOUT)
-    if r.status_code in (200, 201, 202):
-        try:
-            return r.json()
-        except ValueError:
-            return {}
-    if r.status_code == 204:  # Some PATCH operations can also return 204
-        return {}
-    raise RuntimeError(f"PATCH {url} -> {r.status_code}:\n{r.text}")
+    return awx_http.patch_json(url, h, payload, v)
 
 def ping(aap: str, tok: str, v: bool) -> None:
     u = f"{aap}/api/controller/v2/ping/"
-    r = requests.get(u, headers=H(tok), verify=v, timeout=TIMEOUT)
+    r = awx_http.get(u, H(tok), v)
     if r.status_code != 200:
         raise RuntimeError(f"AAP ping {r.status_code}: {r.text}")
     
-def emit(event: str, **fields: Any) -> None:
-    """Emit one JSON line (NDJSON) for machine-readable logs in AWX."""
+def event_line(event: str, **fields: Any) -> str:
     rec = {"ts": datetime.now(timezone.utc).isoformat(), "event": event}
     rec.update(fields)
-    print(json.dumps(rec, separators=(",", ":"), ensure_ascii=False))
+    return awx_codec.dumps(rec)
+
+def emit(event: str, **fields: Any) -> None:
+    """Emit one JSON line (NDJSON) for machine-readable logs in AWX."""
+    print(event_line(event, **fields))
+
+def shard_slot(seq: int) -> str:
+    """--shard: marks where template seq's output starts, for awx_shards.merge_events."""
+    return event_line(awx_shards.SLOT_EVENT, seq=seq) + "\n"
+
+_name_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_name_locks_guard = threading.Lock()
+
+def name_lock(kind: str, name: str) -> threading.Lock:
+    """Serialize find-or-create of one AAP object name across concurrent JT flows."""
+    with _name_locks_guard:
+        return _name_locks.setdefault((kind, name), threading.Lock())
 
 # ---------------- AWX reads ----------------
+# With --source-snapshot every AWX read below is served from the snapshot file.
+_snapshot: Optional[awx_snapshot.Snapshot] = None
+
 def awx_jt(a: str, t: str, i: int, v: bool) -> Dict[str, Any]:
+    if _snapshot:
+        obj = _snapshot.get("job_templates", i)
+        if obj is None:
+            raise RuntimeError(f"Job template {i} not in snapshot {_snapshot.path}")
+        return obj
     return GET(f"{a}/api/v2/job_templates/{i}/", H(t), v)
 
-def awx_jts(a: str, t: str, v: bool) -> Iterable[Dict[str, Any]]:
-    u = f"{a}/api/v2/job_templates/?page_size=200"
-    hdr = H(t)
-    while u:
-        d = GET(u, hdr, v)
-        for o in d.get('results', []):
-            yield o
-        u = d.get('next')
+def awx_jts(a: str, t: str, v: bool, after_id: int = 0) -> Iterable[Dict[str, Any]]:
+    # Walked per --scan (prefetched pages or id keyset); objects always arrive in order.
+    if _snapshot:
+        return _snapshot.objects("job_templates", after_id)
+    return awx_http.iter_list(f"{a}/api/v2/job_templates/?page_size=200", H(t), v, after_id)
 
 def awx_jt_creds(a: str, t: str, jtid: int, v: bool) -> Iterable[Dict[str, Any]]:
-    u = f"{a}/api/v2/job_templates/{jtid}/credentials/"
-    d = GET(u, H(t), v)
-    for o in d.get('results', d.get('data', [])):
-        yield o
+    if _snapshot:
+        return _snapshot.jt_credentials(jtid)
+    return awx_http.iter_pages(f"{a}/api/v2/job_templates/{jtid}/credentials/?page_size=200", H(t), v)
+
+# summary_fields.credentials[].kind (credential type namespace) -> AWX managed type name
+CRED_KIND_TYPE_NAMES = {
+    "ssh": "Machine",
+    "scm": "Source Control",
+    "vault": "Vault",
+    "net": "Network",
+    "aws": "Amazon Web Services",
+    "openstack": "OpenStack",
+    "vmware": "VMware vCenter",
+    "satellite6": "Red Hat Satellite 6",
+    "gce": "Google Compute Engine",
+    "azure_rm": "Microsoft Azure Resource Manager",
+    "rhv": "Red Hat Virtualization",
+    "insights": "Insights",
+    "controller": "Red Hat Ansible Automation Platform",
+    "kubernetes_bearer_token": "OpenShift or Kubernetes API Bearer Token",
+    "registry": "Container Registry",
+    "github_token": "GitHub Personal Access Token",
+    "gitlab_token": "GitLab Personal Access Token",
+    "galaxy_api_token": "Ansible Galaxy/Automation Hub API Token",
+}
+
+def jt_creds_from_summary(obj: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Credentials from the JT's own summary_fields, shaped like /credentials/ rows
+    (name + summary_fields.credential_type.name). None when the summary is
+    missing, truncated, or has an entry whose type cannot be named (custom
+    credential types), so the caller reads the sub-resource instead.
+    """
+    summary = (obj.get('summary_fields') or {}).get('credentials')
+    if isinstance(summary, dict):
+        results = summary.get('results')
+        if not isinstance(results, list) or summary.get('count', len(results)) > len(results):
+            return None
+        summary = results
+    if not isinstance(summary, list):
+        return None
+    out: List[Dict[str, Any]] = []
+    for c in summary:
+        type_name = CRED_KIND_TYPE_NAMES.get(c.get('kind') or '')
+        if not c.get('name') or not type_name:
+            return None
+        out.append({"id": c.get('id'), "name": c['name'],
+                    "summary_fields": {"credential_type": {"name": type_name}}})
+    return out
 
 def awx_jt_survey_spec(a: str, t: str, jtid: int, v: bool) -> Optional[Dict[str, Any]]:
     """
-    Always attempt to read the survey spec from AWX regardless of enablement.
+    Read the survey spec from AWX. migrate_one only asks when the JT has
+    survey_enabled (or --probe-all-surveys is set).
     Returns a dict with shape {"name": ..., "description": ..., "spec": [...]}
     or None if no survey exists.
     """
+    if _snapshot:
+        return _snapshot.survey_spec(jtid)
     u = f"{a}/api/v2/job_templates/{jtid}/survey_spec/"
     try:
         d = GET(u, H(t), v)
@@ -185,6 +310,8 @@ def awx_jt_survey_spec(a: str, t: str, jtid: int, v: bool) -> Optional[Dict[str,
         return None
 
 def awx_jt_notifications(a: str, t: str, jtid: int, v: bool) -> Dict[str, List[Dict[str, Any]]]:
+    if _snapshot:
+        return _snapshot.jt_notifications(jtid)
     hdr = H(t)
     def one(path: str) -> List[Dict[str, Any]]:
         d = GET(f"{a}/api/v2/job_templates/{jtid}/{path}/", hdr, v)
@@ -195,32 +322,134 @@ def awx_jt_notifications(a: str, t: str, jtid: int, v: bool) -> Dict[str, List[D
         "error":   one("notification_templates_error"),
     }
 
-def awx_jt_schedules(a: str, t: str, jtid: int, v: bool) -> List[Dict[str, Any]]:
-    # First list, then GET each schedule detail to ensure we have extra_data (survey answers), rrule, etc.
-    lst = GET(f"{a}/api/v2/job_templates/{jtid}/schedules/?page_size=200", H(t), v).get("results", [])
+SCHEDULE_DETAIL_FIELDS = ("rrule", "extra_data")
+
+def awx_jt_schedules(a: str, t: str, jtid: int, v: bool,
+                     listed: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    # The list serializer already carries rrule and extra_data (survey answers); the
+    # per-schedule detail GET is only a fallback for rows that lack them.
+    if listed is None and _snapshot:
+        listed = _snapshot.children("schedules", jtid)
+    if listed is None:
+        listed = GET(f"{a}/api/v2/job_templates/{jtid}/schedules/?page_size=200", H(t), v).get("results", [])
     out: List[Dict[str, Any]] = []
-    for s in lst:
+    for s in listed:
         sid = s.get("id")
         if sid is None:
             continue
-        d = GET(f"{a}/api/v2/schedules/{sid}/", H(t), v)
-        out.append(d)
+        if any(k not in s for k in SCHEDULE_DETAIL_FIELDS):
+            s = GET(f"{a}/api/v2/schedules/{sid}/", H(t), v)
+        out.append(s)
     return out
 
-def iso_to_ics_dtstart(dt: str) -> str:
+# ---------------- run context ----------------
+SCHEDULE_BATCH = 100  # JT ids per unified_job_template__in query
+
+class RunContext:
     """
-    Convert ISO8601 ('2025-10-16T14:00:00Z' or with offset) to ICS DTSTART (UTC Z).
+    Run-wide AWX data shared by the migrate_one calls of a bulk run. preload()
+    sits on the JT stream: it reads the schedules of every template with a few
+    /schedules/?unified_job_template__in=... pages per batch and reports the
+    rrules AAP would reject before handing out the first template. prepare()
+    sets the include/exclude filter (set_filter) and builds the email
+    notification catalog. migrate_one falls back to per-JT reads for anything
+    not preloaded (single-JT mode, or a template outside the batch).
     """
-    try:
-        # Handle both Z and offset formats
-        if dt.endswith("Z"):
-            d = dt.datetime.fromisoformat(dt.replace("Z", "+00:00"))
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.notifications: Optional["EmailNotifications"] = None
+        self.survey_checks: List[Tuple[int, str, str]] = []
+        self._lock = threading.Lock()
+        self._schedules: Dict[int, List[Dict[str, Any]]] = {}
+        self._rejected: Dict[int, Set[int]] = {}
+        self.variants = VariantStats(args.schedule_stats or None, args.aap_host)
+        self.invalid_schedules = 0
+        self._inc: Optional[Pattern[str]] = None
+        self._exc: Optional[Pattern[str]] = None
+
+    def prepare(self, notif_secrets_map: Dict[str, Dict[str, Any]],
+                inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> None:
+        self.set_filter(inc, exc)
+        if self.args.with_notifications and not self.args.schedules_only:
+            self.notifications = EmailNotifications(self.args, notif_secrets_map)
+            self.notifications.load(inc, exc)
+
+    def set_filter(self, inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> None:
+        """--include/--exclude: preload only reads schedules for templates the run migrates."""
+        self._inc, self._exc = inc, exc
+
+    def preload(self, objs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        With --with-schedules the whole listing is read before the first
+        template is handed out, so the rejected rrules of all templates are
+        reported in one block before anything is written to AAP.
+        """
+        if not self.args.with_schedules:
+            yield from objs
+            return
+        jts = list(objs)
+        bad: List[Tuple[str, Dict[str, Any], str, List[str]]] = []
+        for k in range(0, len(jts), SCHEDULE_BATCH):
+            bad += self._load_schedules(jts[k:k + SCHEDULE_BATCH])
+        report_invalid_schedules(bad, self)
+        yield from jts
+
+    def _load_schedules(self, jts: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], str, List[str]]]:
+        """Read and check the schedules of the templates this run still syncs schedules for; returns the rejects."""
+        names = {o["id"]: o.get("name", f"jt-{o['id']}") for o in jts if o.get("id") is not None
+                 and awx_shards.in_shard(o["id"], self.args.shard)
+                 and filt(o.get("name", f"jt-{o['id']}"), self._inc, self._exc)
+                 and not journaled("job_templates", o["id"], "schedules")
+                 and not (journaled("job_templates", o["id"], "done") or {}).get("schedules")}
+        if not names:
+            return []
+        grouped: Dict[int, List[Dict[str, Any]]] = {i: [] for i in names}
+        if _snapshot:
+            for i in names:
+                grouped[i] = _snapshot.children("schedules", i)
         else:
-            d = dt.datetime.fromisoformat(dt)
-        d = d.astimezone(dt.timezone.utc)
-        return d.strftime("%Y%m%dT%H%M%SZ")
-    except Exception:
+            u = (f"{self.args.awx_host}/api/v2/schedules/?page_size=200"
+                 f"&unified_job_template__in={','.join(str(i) for i in names)}")
+            for sch in awx_http.iter_pages(u, H(self.args.awx_token), self.args.verify_tls):
+                grouped.setdefault(sch.get("unified_job_template"), []).append(sch)
+        emit("schedule.preload", templates=len(names), schedules=sum(len(g) for g in grouped.values()))
+        # Rows without an rrule get their detail GET later; read_schedules checks those.
+        bad = [(names[i], *b) for i in names for b in invalid_schedules(grouped[i])]
+        with self._lock:
+            self._schedules.update(grouped)
+            for _, sch, _, _ in bad:
+                self._rejected.setdefault(sch["unified_job_template"], set()).add(sch["id"])
+        return bad
+
+    def survey_copied(self, jt_id: int, name: str, content_hash: str) -> None:
+        """Remember a migrated survey for the --verify-surveys pass."""
+        if self.args.verify_surveys:
+            with self._lock:
+                self.survey_checks.append((jt_id, name, content_hash))
+
+    def schedules_invalid(self, n: int) -> None:
+        with self._lock:
+            self.invalid_schedules += n
+
+    def schedules_for(self, jtid: int) -> Optional[List[Dict[str, Any]]]:
+        """Preloaded schedule rows for one JT (handed out once), or None if not preloaded."""
+        with self._lock:
+            return self._schedules.pop(jtid, None)
+
+    def rejected_for(self, jtid: int) -> Set[int]:
+        """Ids of the preloaded schedules of one JT that preload() already reported as invalid."""
+        with self._lock:
+            return self._rejected.pop(jtid, set())
+
+def iso_to_ics_dtstart(value: str) -> str:
+    """
+    Convert ISO8601 ('2025-10-16T14:00:00Z' or with offset) to ICS DTSTART (UTC Z).
+    """
+    d = _parse_iso(value)
+    if d is None:
         return ""
+    return d.astimezone(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
 def normalize_rrule(raw_rrule: str, next_run: Optional[str], timezone_str: Optional[str]) -> Tuple[str, Optional[str]]:
     """
@@ -251,22 +480,29 @@ def normalize_rrule(raw_rrule: str, next_run: Optional[str], timezone_str: Optio
 
     return r, tz
 
+@functools.lru_cache(maxsize=None)
+def _zone(name: str) -> Optional[Any]:
+    """ZoneInfo for name, or None if it does not resolve. Cached: every schedule asks again."""
+    if not ZoneInfo:
+        return None
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
+
 def _canon_tz(tz: Optional[str]) -> Optional[str]:
     if not tz:
         return None
     tz = _TZ_ALIASES.get(tz, tz)
-    try:
-        from zoneinfo import ZoneInfo
-        ZoneInfo(tz)  # validate
-        return tz
-    except Exception:
+    return tz if _zone(tz) else None
+
+def _parse_iso(value: Optional[str]) -> Optional[dt.datetime]:
+    if not value:
         return None
-    
-def _parse_iso(dt: str) -> Optional[dt.datetime]:
     try:
-        if dt.endswith("Z"):
-            return dt.datetime.fromisoformat(dt.replace("Z", "+00:00"))
-        return dt.datetime.fromisoformat(dt)
+        if value.endswith("Z"):
+            return dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return dt.datetime.fromisoformat(value)
     except Exception:
         return None
     
@@ -278,12 +514,8 @@ def _mk_dtstart(next_run_iso: Optional[str], tz: Optional[str]) -> str:
     d = _parse_iso(next_run_iso) or dt.datetime.now(dt.timezone.utc)
     tz_canon = _canon_tz(tz)
     if tz_canon:
-        try:
-            from zoneinfo import ZoneInfo
-            d_local = d.astimezone(ZoneInfo(tz_canon))
-            return f"DTSTART;TZID={tz_canon}:{d_local.strftime('%Y%m%dT%H%M%S')}"
-        except Exception:
-            pass
+        d_local = d.astimezone(_zone(tz_canon))
+        return f"DTSTART;TZID={tz_canon}:{d_local.strftime('%Y%m%dT%H%M%S')}"
     d_utc = d.astimezone(dt.timezone.utc)
     return f"DTSTART:{d_utc.strftime('%Y%m%dT%H%M%SZ')}"
 
@@ -330,12 +562,9 @@ def _format_dtstart(next_run_iso: Optional[str], tz: Optional[str]) -> str:
     d = _parse_iso(next_run_iso) if next_run_iso else datetime.now(timezone.utc)
     if not d:
         d = datetime.now(timezone.utc)
-    if tz and ZoneInfo:
-        try:
-            d = d.astimezone(ZoneInfo(tz))
-            return f"DTSTART;TZID={tz}:{d.strftime('%Y%m%dT%H%M%S')}"
-        except Exception:
-            pass
+    if tz and _zone(tz):
+        d = d.astimezone(_zone(tz))
+        return f"DTSTART;TZID={tz}:{d.strftime('%Y%m%dT%H%M%S')}"
     d = d.astimezone(timezone.utc)
     return f"DTSTART:{d.strftime('%Y%m%dT%H%M%SZ')}"
 
@@ -378,50 +607,159 @@ def schedule_payload_bareminimum(s: Dict[str, Any], jt_id: int, jt_inventory_id:
     if s.get("extra_data"):          p["extra_data"] = s["extra_data"]
     return p
 
-def _validate_ujt(aap_host: str, tok: str, verify: bool, jt_id: int) -> None:
-    # Proactively confirm the JT exists and is accessible (avoids “Bad data in related field”)
-    r = requests.get(f"{aap_host}/api/controller/v2/job_templates/{jt_id}/",
-                     headers=H(tok), verify=verify, timeout=TIMEOUT)
-    if r.status_code != 200:
-        raise RuntimeError(f"Unified Job Template {jt_id} not accessible: {r.status_code} {r.text}")
+SCHEDULE_VARIANTS = ("full-id", "full-url", "bare-id", "bare-url")
+DEFAULT_VARIANT_STATS = os.path.join("artifacts", "schedule_variants.json")
+VARIANT_MEMORY = 200  # attempts per variant kept from earlier runs; older history is scaled down
 
-def try_create_schedule(aap_host: str, aap_tok: str, verify: bool,
-                        jt_id: int, jt_inventory_id: Optional[int], s: Dict[str, Any]) -> bool:
-    _validate_ujt(aap_host, aap_tok, verify, jt_id)
+class VariantStats:
+    """
+    Success/failure counts of the schedule payload variants, per AAP host.
+    order() tries the variant with the best (smoothed) success rate first and
+    keeps the fixed order for ties, so once a variant is known to work on this
+    AAP most schedules take one POST. Counts are read from and saved back to a
+    small JSON file so the next run starts with what this one learned.
+    """
+
+    def __init__(self, path: Optional[str], aap_host: str) -> None:
+        self.path = path
+        self.aap_host = aap_host
+        self._lock = threading.Lock()
+        self.total: Dict[str, Dict[str, float]] = {v: {"ok": 0, "fail": 0} for v in SCHEDULE_VARIANTS}
+        self.run: Dict[str, Dict[str, int]] = {v: {"ok": 0, "fail": 0} for v in SCHEDULE_VARIANTS}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = (awx_codec.loads(f.read()).get("hosts") or {}).get(aap_host) or {}
+            except Exception as e:
+                print(f"WARN: ignoring unreadable schedule variant stats {path}: {e}", file=sys.stderr)
+                saved = {}
+            for v, c in saved.items():
+                if v in self.total:
+                    n = c.get("ok", 0) + c.get("fail", 0)
+                    scale = VARIANT_MEMORY / n if n > VARIANT_MEMORY else 1
+                    self.total[v] = {"ok": c.get("ok", 0) * scale, "fail": c.get("fail", 0) * scale}
+
+    def order(self) -> List[str]:
+        with self._lock:
+            rate = {v: (c["ok"] + 1) / (c["ok"] + c["fail"] + 2) for v, c in self.total.items()}
+        return sorted(SCHEDULE_VARIANTS, key=lambda v: -rate[v])
+
+    def record(self, variant: str, ok: bool) -> None:
+        k = "ok" if ok else "fail"
+        with self._lock:
+            self.total[variant][k] += 1
+            self.run[variant][k] += 1
+
+    def attempts(self) -> int:
+        return sum(c["ok"] + c["fail"] for c in self.run.values())
+
+    def save(self) -> None:
+        if not self.path or not self.attempts():
+            return
+        try:
+            data: Dict[str, Any] = {"version": 1, "hosts": {}}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = awx_codec.loads(f.read())
+            with self._lock:
+                data.setdefault("hosts", {})[self.aap_host] = {
+                    v: {k: round(n, 2) for k, n in c.items()} for v, c in self.total.items()}
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"  # --shard processes may save side by side
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(awx_codec.dumps(data))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"WARN: could not save schedule variant stats to {self.path}: {e}", file=sys.stderr)
 
+def report_invalid_schedules(bad: List[Tuple[str, Dict[str, Any], str, List[str]]],
+                             ctx: Optional[RunContext] = None, indent: str = "") -> Set[int]:
+    """
+    Print and emit rejected schedules, (template, schedule, rrule, problems)
+    each, as one block; returns their ids. Indented under a template's own
+    output, the template name is left out.
+    """
+    if not bad:
+        return set()
+    print(f"{indent}WARN: {len(bad)} schedule(s) fail rrule validation and will not be sent:")
+    for jt_name, sch, rrule_text, problems in bad:
+        where = f"'{sch.get('name', '')}'" if indent else f"{jt_name}: '{sch.get('name', '')}'"
+        print(f"{indent}  {where}: {'; '.join(problems)}")
+        emit("schedule.invalid", template=jt_name, name=sch.get("name", ""), rrule=rrule_text, problems=problems)
+    if ctx:
+        ctx.schedules_invalid(len(bad))
+    return {sch["id"] for _, sch, _, _ in bad}
+
+def invalid_schedules(schedules: Iterable[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str, List[str]]]:
+    """(schedule, rrule as it would be POSTed, problems) for each non-empty rrule validate_rrule rejects."""
+    out = []
+    for s in schedules:
+        if not (s.get("rrule") or "").strip():
+            continue
+        text, _tz = sanitize_rrule(s.get("rrule", ""), s.get("next_run") or s.get("next_run_original"),
+                                   s.get("timezone"))
+        problems = validate_rrule(text)
+        if problems:
+            out.append((s, text, problems))
+    return out
+
+def try_create_schedule(aap_host: str, aap_tok: str, verify: bool,
+                        jt_id: int, jt_inventory_id: Optional[int], s: Dict[str, Any],
+                        stats: Optional[VariantStats] = None) -> Optional[Dict[str, Any]]:
+    # The JT was validated by aap_schedule_names() before the schedule loop.
     def with_ujt_url(payload: Dict[str, Any]) -> Dict[str, Any]:
         q = dict(payload)
         q["unified_job_template"] = f"{aap_host}/api/controller/v2/job_templates/{jt_id}/"
         return q
 
-    variants = [
-        ("full-id",  schedule_payload_minimal(s, jt_id, jt_inventory_id)),
-        ("full-url", with_ujt_url(schedule_payload_minimal(s, jt_id, jt_inventory_id))),
-        ("bare-id",  schedule_payload_bareminimum(s, jt_id, jt_inventory_id)),
-        ("bare-url", with_ujt_url(schedule_payload_bareminimum(s, jt_id, jt_inventory_id))),
-    ]
-    for idx, (label, pl) in enumerate(variants, start=1):
+    builders = {
+        "full-id":  lambda: schedule_payload_minimal(s, jt_id, jt_inventory_id),
+        "full-url": lambda: with_ujt_url(schedule_payload_minimal(s, jt_id, jt_inventory_id)),
+        "bare-id":  lambda: schedule_payload_bareminimum(s, jt_id, jt_inventory_id),
+        "bare-url": lambda: with_ujt_url(schedule_payload_bareminimum(s, jt_id, jt_inventory_id)),
+    }
+    order = stats.order() if stats else list(SCHEDULE_VARIANTS)
+    for idx, label in enumerate(order, start=1):
+        pl = builders[label]()
         try:
-            POST(f"{aap_host}/api/controller/v2/schedules/", H(aap_tok), pl, verify)
+            created = awx_http.create_json(f"{aap_host}/api/controller/v2/schedules/", H(aap_tok), pl, verify,
+                                           lambda: aap_find_schedule(aap_host, aap_tok, verify, jt_id, pl.get("name", "")))
             emit("schedule.create.ok", attempt=idx, variant=label,
                  name=pl.get("name",""), ujt=str(pl.get("unified_job_template")),
                  timezone=pl.get("timezone"), rrule=pl.get("rrule"))
-            return True
+            if stats:
+                stats.record(label, True)
+            return created
         except Exception as e:
             diag = {k: pl.get(k) for k in ("name","unified_job_template","timezone","rrule","inventory","limit")}
             emit("schedule.create.fail", attempt=idx, variant=label, payload=diag, error=str(e))
-    return False
+            if isinstance(e, awx_http.TransientHTTPError):
+                raise  # retries used up: AAP or the network is down, another payload shape will not help
+            # Only AAP rejecting this payload shape says something about the variant.
+            if stats and isinstance(e, awx_http.HTTPStatusError) and 400 <= e.status < 500:
+                stats.record(label, False)
+    return None
+
 
+def aap_find_schedule(aap_host: str, aap_tok: str, verify: bool, jt_id: int, schedule_name: str) -> Optional[Dict[str, Any]]:
+    from requests.utils import quote
+    d = GET(f"{aap_host}/api/controller/v2/job_templates/{jt_id}/schedules/?name={quote(schedule_name)}", H(aap_tok), verify)
+    res = d.get("results") or []
+    return res[0] if res else None
 
-def aap_schedule_exists(aap_host: str, aap_tok: str, verify: bool, jt_id: int, schedule_name: str) -> bool:
+def aap_schedule_names(aap_host: str, aap_tok: str, verify: bool, jt_id: int) -> Dict[str, int]:
+    """
+    Name -> id of the schedules already on AAP JT jt_id, read once per template.
+    Listing them also proves the JT exists and is accessible (avoids “Bad
+    data in related field” on the schedule POSTs).
+    """
     u = f"{aap_host}/api/controller/v2/job_templates/{jt_id}/schedules/?page_size=200"
-    while u:
-        d = GET(u, H(aap_tok), verify)
-        for obj in d.get("results", []):
-            if obj.get("name") == schedule_name:
-                return True
-        u = d.get("next")
-    return False
+    try:
+        return {obj.get("name", ""): obj.get("id") for obj in awx_http.iter_keyset(u, H(aap_tok), verify)}
+    except Exception as e:
+        raise RuntimeError(f"Unified Job Template {jt_id} not accessible: {e}")
 
 def sanitize_timezone(tz: Optional[str]) -> Optional[str]:
     if not tz:
@@ -434,11 +772,7 @@ def sanitize_timezone(tz: Optional[str]) -> Optional[str]:
     }
     tz_fixed = fixes.get(tz, tz)
     if ZoneInfo:
-        try:
-            ZoneInfo(tz_fixed)  # validate
-            return tz_fixed
-        except Exception:
-            return None
+        return tz_fixed if _zone(tz_fixed) else None
     # If ZoneInfo not available, pass fixed value
     return tz_fixed
 
@@ -454,6 +788,8 @@ def sanitize_rrule(raw_rrule: str,
     """
     tz = _canon_tz(timezone_str)
     r = (raw_rrule or "").strip()
+    # AWX stores "DTSTART;TZID=...:... RRULE:..." on one line; split before each part
+    r = re.sub(r"\s+(?=(?:DTSTART|RRULE)[:;])", "\n", r, flags=re.IGNORECASE)
     lines = [ln.strip() for ln in r.splitlines() if ln.strip()]
 
     dtstart_line: Optional[str] = None
@@ -483,20 +819,195 @@ def sanitize_rrule(raw_rrule: str,
     final = f"{dtstart_line}\n{clean_rrule}"
     return final, tz
 
-def assert_inventory_exists_by_id(aap: str, tok: str, inv_id: int, org_id: int, v: bool) -> None:
+RRULE_FREQS = ("SECONDLY", "MINUTELY", "HOURLY", "DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+RRULE_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_DTSTART_RE = re.compile(r"^DTSTART(?:;TZID=([^:]+))?:(\d{8}T\d{6})(Z?)$", re.IGNORECASE)
+_UNTIL_RE = re.compile(r"^(\d{8})(?:T(\d{6})(Z?))?$")
+_INT_RANGES = {"BYSECOND": (0, 60), "BYMINUTE": (0, 59), "BYHOUR": (0, 23), "BYMONTH": (1, 12),
+               "BYMONTHDAY": (-31, 31), "BYSETPOS": (-366, 366)}
+OCCURRENCE_HORIZON_DAYS = 28 * 366  # weekday/leap-year pattern repeats within this window
+
+def validate_rrule(text: str) -> List[str]:
     """
-    Validate that an inventory with id=inv_id exists and belongs to the target org.
+    Check a DTSTART+RRULE string (as produced by sanitize_rrule) against the
+    rules Controller's schedule serializer enforces; returns the problems
+    found, using Controller's wording where it has one. Empty means AAP
+    should accept it.
     """
-    d = GET(f"{aap}/api/controller/v2/inventories/{inv_id}/", H(tok), v)
-    inv_org = d.get('organization')
-    if inv_org not in (None, org_id):
-        raise RuntimeError(
-            f"Inventory id {inv_id} belongs to organization {inv_org}, "
-            f"which does not match target org {org_id}."
-        )
+    lines = [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
+    dtstarts = [ln for ln in lines if ln.upper().startswith("DTSTART")]
+    rules = [ln for ln in lines if ln.upper().startswith("RRULE:")]
+    if not dtstarts:
+        return ["Valid DTSTART required in rrule. Value should start with: DTSTART:YYYYMMDDTHHMMSSZ"]
+    if len(dtstarts) > 1:
+        return ["Multiple DTSTART is not supported."]
+    if not rules:
+        return ["RRULE required in rrule."]
+    if len(rules) > 1:
+        return ["Multiple RRULE is not supported."]
+
+    problems: List[str] = []
+    m = _DTSTART_RE.match(dtstarts[0])
+    start: Optional[dt.datetime] = None
+    if not m:
+        problems.append(f"Valid DTSTART required in rrule: {dtstarts[0]}")
+    elif not m.group(1) and not m.group(3):
+        problems.append("DTSTART cannot be a naive datetime.  Specify ;TZINFO= or YYYYMMDDTHHMMSSZZ.")
+    elif m.group(1) and not _zone(m.group(1)):
+        problems.append(f"Unknown TZID in DTSTART: {m.group(1)}")
+    else:
+        try:
+            start = dt.datetime.strptime(m.group(2), "%Y%m%dT%H%M%S")
+        except ValueError:
+            problems.append(f"DTSTART is not a valid date: {m.group(2)}")
+
+    parts: Dict[str, str] = {}
+    for tok in rules[0][len("RRULE:"):].split(";"):
+        key, sep, val = tok.partition("=")
+        key = key.strip().upper()
+        if not sep or not val.strip():
+            problems.append(f"Malformed RRULE part: {tok!r}")
+        elif key not in _ALLOWED_RRULE_KEYS:
+            problems.append(f"Unknown RRULE key: {key}")
+        elif key in parts:
+            problems.append(f"Duplicate RRULE key: {key}")
+        else:
+            parts[key] = val.strip().upper()
+
+    freq = parts.get("FREQ")
+    if freq not in RRULE_FREQS:
+        problems.append(f"Invalid FREQ: {freq}")
+    elif freq == "SECONDLY":
+        problems.append("SECONDLY is not supported.")
+    interval = parts.get("INTERVAL")
+    if interval is None:
+        problems.append("INTERVAL required in rrule.")
+    elif not interval.isdigit() or int(interval) < 1:
+        problems.append(f"INTERVAL must be a positive integer: {interval}")
+    if "COUNT" in parts:
+        if not parts["COUNT"].isdigit() or int(parts["COUNT"]) < 1:
+            problems.append(f"COUNT must be a positive integer: {parts['COUNT']}")
+        elif int(parts["COUNT"]) > 999:
+            problems.append("COUNT > 999 is unsupported.")
+    until: Optional[dt.date] = None
+    if "UNTIL" in parts:
+        if "COUNT" in parts:
+            problems.append("UNTIL and COUNT must not occur in the same recurrence.")
+        um = _UNTIL_RE.match(parts["UNTIL"])
+        if not um:
+            problems.append(f"Invalid UNTIL: {parts['UNTIL']}")
+        elif um.group(2) and not um.group(3):
+            problems.append("RRULE UNTIL values must be specified in UTC when DTSTART is timezone-aware")
+        else:
+            try:
+                until = dt.datetime.strptime(um.group(1), "%Y%m%d").date()
+            except ValueError:
+                problems.append(f"Invalid UNTIL: {parts['UNTIL']}")
+    if "BYYEARDAY" in parts:
+        problems.append("BYYEARDAY not supported.")
+    if "BYWEEKNO" in parts:
+        problems.append("BYWEEKNO not supported.")
+    if "," in parts.get("BYMONTHDAY", ""):
+        problems.append("Multiple BYMONTHDAYs not supported.")
+    if "," in parts.get("BYMONTH", ""):
+        problems.append("Multiple BYMONTHs not supported.")
+    byday = [d.strip() for d in parts.get("BYDAY", "").split(",") if d.strip()]
+    if any(d[:-2] for d in byday):
+        problems.append("BYDAY with numeric prefix not supported.")
+    if any(d[-2:] not in RRULE_WEEKDAYS for d in byday) or ("WKST" in parts and parts["WKST"] not in RRULE_WEEKDAYS):
+        problems.append("Invalid weekday in BYDAY/WKST")
+    ints: Dict[str, List[int]] = {}
+    for key, (lo, hi) in _INT_RANGES.items():
+        if key not in parts:
+            continue
+        try:
+            ints[key] = [int(x) for x in parts[key].split(",")]
+        except ValueError:
+            problems.append(f"{key} must be a list of integers: {parts[key]}")
+            continue
+        if any(x < lo or x > hi or (x == 0 and lo < 0) for x in ints[key]):
+            problems.append(f"{key} out of range: {parts[key]}")
+
+    if problems or start is None:
+        return problems
+    rule = None
+    if dateutil_rrule is not None:
+        try:
+            rule = dateutil_rrule.rrulestr(_until_utc(text, parts.get("UNTIL", "")), forceset=True)
+        except Exception as e:
+            return [f"rrule parsing failed validation: {e}"]
+    # The bounded day-level search comes first even with dateutil: dateutil compares UNTIL only
+    # with dates that match the rule, so on a rule that never matches it walks on to year 9999.
+    if until and m.group(1):
+        until += dt.timedelta(days=1)  # UNTIL is a UTC date, DTSTART's date is local (up to +14h)
+    if not _has_occurrence(start.date(), until, freq or "", ints, [RRULE_WEEKDAYS.index(d) for d in byday],
+                           interval=int(interval or 1), wkst=RRULE_WEEKDAYS.index(parts.get("WKST", "MO"))):
+        problems.append("rrule never produces an occurrence")
+    elif rule is not None and next(iter(rule), None) is None:  # the first occurrence, at or after DTSTART
+        problems.append("rrule never produces an occurrence")
+    return problems
+
+def _until_utc(text: str, until: str) -> str:
+    """
+    dateutil refuses a date-only UNTIL next to an aware DTSTART; spell it as
+    the last second of that day in UTC, which admits the same occurrences.
+    """
+    if not re.match(r"^\d{8}$", until):
+        return text
+    return re.sub(r"(?i)\bUNTIL=\d{8}(?=;|\s|$)", f"UNTIL={until}T235959Z", text)
+
+def _has_occurrence(start: dt.date, until: Optional[dt.date], freq: str,
+                    ints: Dict[str, List[int]], weekdays: List[int], interval: int = 1, wkst: int = 0) -> bool:
+    """
+    Walk the days from DTSTART (to UNTIL, or a 28-year horizon) looking for
+    one that BYMONTH / BYMONTHDAY / BYDAY admit, with RFC 5545's defaults
+    taken from DTSTART, in a period INTERVAL lets through (DAILY to YEARLY).
+    Day granularity and BYSETPOS is not applied, so it can only err towards
+    an occurrence: the whole check without dateutil, and the bound on
+    dateutil's search with it.
+    """
+    months = ints.get("BYMONTH") or ([start.month] if freq == "YEARLY" and not weekdays and "BYMONTHDAY" not in ints else None)
+    mdays = ints.get("BYMONTHDAY")
+    if mdays is None and not weekdays and freq in ("MONTHLY", "YEARLY"):
+        mdays = [start.day]
+    if not weekdays and mdays is None and freq == "WEEKLY":
+        weekdays = [start.weekday()]
+    week0 = start - dt.timedelta(days=(start.weekday() - wkst) % 7)
+    period = {
+        "DAILY": lambda day: (day - start).days,
+        "WEEKLY": lambda day: (day - week0).days // 7,
+        "MONTHLY": lambda day: (day.year - start.year) * 12 + day.month - start.month,
+        "YEARLY": lambda day: day.year - start.year,
+    }.get(freq) if interval > 1 else None  # HOURLY/MINUTELY: the hours visited shift from day to day
+    last = until or start + dt.timedelta(days=OCCURRENCE_HORIZON_DAYS)
+    day = start
+    while day <= last:
+        month_len = calendar.monthrange(day.year, day.month)[1]
+        if ((not months or day.month in months)
+                and (not mdays or any(d == day.day or month_len + d + 1 == day.day for d in mdays))
+                and (not weekdays or day.weekday() in weekdays)
+                and (not period or period(day) % interval == 0)):
+            return True
+        day += dt.timedelta(days=1)
+    return False
 
 # ---------------- AAP lookups & asserts ----------------
-def q_one(aap: str, tok: str, endpoint: str, name: str, org: int, v: bool) -> Optional[Dict[str, Any]]:
+# Loaded in main() unless --no-aap-catalog; name/id lookups below resolve from it.
+_catalog: Optional[aap_catalog.Catalog] = None
+
+def catalog_kinds(args: argparse.Namespace) -> Tuple[str, ...]:
+    if args.schedules_only:
+        return ("job_templates",)
+    kinds = ["projects", "job_templates", "credentials", "credential_types", "inventories", "execution_environments"]
+    if args.with_notifications:
+        kinds.append("notification_templates")
+    return tuple(kinds)
+
+def q_one(aap: str, tok: str, endpoint: str, name: str, org: int, v: bool,
+          live: bool = False) -> Optional[Dict[str, Any]]:
+    # live=True always asks AAP (recovering from an ambiguous create).
+    if _catalog and not live and _catalog.covers(endpoint):
+        return _catalog.find(endpoint, name)
     from requests.utils import quote
     u = f"{aap}/api/controller/v2/{endpoint}/?name={quote(name)}&organization={org}"
     d = GET(u, H(tok), v)
@@ -505,35 +1016,114 @@ def q_one(aap: str, tok: str, endpoint: str, name: str, org: int, v: bool) -> Op
         return res[0]
     return None
 
-def assert_ee_exists_by_id(aap: str, tok: str, ee_id: int, org_id: int, v: bool) -> None:
-    d = GET(f"{aap}/api/controller/v2/execution_environments/{ee_id}/", H(tok), v)
-    ee_org = d.get('organization')
-    if ee_org not in (None, org_id):
+def aap_by_id(aap: str, tok: str, endpoint: str, obj_id: int, v: bool) -> Dict[str, Any]:
+    d = _catalog.get(endpoint, obj_id) if _catalog and _catalog.covers(endpoint) else None
+    return d if d is not None else GET(f"{aap}/api/controller/v2/{endpoint}/{obj_id}/", H(tok), v)
+
+# (endpoint, id, org) already validated this run; the forced ids are the same for every JT.
+_checked_refs: Set[Tuple[str, int, int]] = set()
+
+def _assert_in_org(aap: str, tok: str, endpoint: str, label: str, obj_id: int, org_id: int, v: bool) -> None:
+    if (endpoint, obj_id, org_id) in _checked_refs:
+        return
+    d = aap_by_id(aap, tok, endpoint, obj_id, v)
+    obj_org = d.get('organization')
+    if obj_org not in (None, org_id):
         raise RuntimeError(
-            f"Execution Environment id {ee_id} belongs to organization {ee_org}, "
+            f"{label} id {obj_id} belongs to organization {obj_org}, "
             f"which does not match target org {org_id}."
         )
+    _checked_refs.add((endpoint, obj_id, org_id))
+
+def assert_inventory_exists_by_id(aap: str, tok: str, inv_id: int, org_id: int, v: bool) -> None:
+    """
+    Validate that an inventory with id=inv_id exists and belongs to the target org.
+    """
+    _assert_in_org(aap, tok, "inventories", "Inventory", inv_id, org_id, v)
+
+def assert_ee_exists_by_id(aap: str, tok: str, ee_id: int, org_id: int, v: bool) -> None:
+    _assert_in_org(aap, tok, "execution_environments", "Execution Environment", ee_id, org_id, v)
 
 def assert_credential_exists_by_id(aap: str, tok: str, cred_id: int, org_id: int, v: bool) -> None:
-    d = GET(f"{aap}/api/controller/v2/credentials/{cred_id}/", H(tok), v)
-    c_org = d.get('organization')
-    if c_org not in (None, org_id):
-        raise RuntimeError(
-            f"Credential id {cred_id} belongs to organization {c_org}, "
-            f"which does not match target org {org_id}."
-        )
+    _assert_in_org(aap, tok, "credentials", "Credential", cred_id, org_id, v)
 
-def find_aap_jt(aap: str, tok: str, name: str, org: int, v: bool) -> Optional[Dict[str, Any]]:
-    from requests.utils import quote
-    u = f"{aap}/api/controller/v2/job_templates/?name={quote(name)}&organization={org}"
-    d = GET(u, H(tok), v)
-    res = d.get('results') or d.get('data') or []
-    if isinstance(res, list) and res:
-        return res[0]
-    return None
+def preflight_forced_refs(args: argparse.Namespace) -> None:
+    """
+    Validate --force-ee-id, --force-inventory-id and --force-machine-cred-id
+    once before any template is touched. A bad id stops the run here instead
+    of failing every template; good ones are remembered, so the per-JT
+    asserts no longer reach AAP.
+    """
+    aap, tok, org, v = args.aap_host, args.aap_token, args.organization_id, args.verify_tls
+    if args.force_ee_id is None:
+        raise SystemExit("You must supply --force-ee-id to set the Execution Environment by API id.")
+    checks = [(assert_ee_exists_by_id, args.force_ee_id),
+              (assert_inventory_exists_by_id, args.force_inventory_id)]
+    if args.force_machine_cred_id is not None and not args.schedules_only:
+        checks.append((assert_credential_exists_by_id, args.force_machine_cred_id))
+    for check, obj_id in checks:
+        try:
+            check(aap, tok, obj_id, org, v)
+        except Exception as e:
+            raise SystemExit(f"Preflight failed: {e}")
+    emit("preflight.ok", ee=args.force_ee_id, inventory=args.force_inventory_id,
+         machine_credential=args.force_machine_cred_id if len(checks) > 2 else None)
+
+def find_aap_jt(aap: str, tok: str, name: str, org: int, v: bool, live: bool = False) -> Optional[Dict[str, Any]]:
+    return q_one(aap, tok, "job_templates", name, org, v, live)
+
+# ---------------- id ledger ----------------
+# Opened in main() unless --ledger ""; see awx_ledger.
+_ledger: Optional[awx_ledger.Ledger] = None
+
+def aap_if_exists(aap: str, tok: str, endpoint: str, obj_id: int, v: bool) -> Optional[Dict[str, Any]]:
+    """The AAP object, or None if it is gone. Served from the catalog when it covers endpoint."""
+    if _catalog and _catalog.covers(endpoint):
+        return _catalog.get(endpoint, obj_id)
+    r = awx_http.get(f"{aap}/api/controller/v2/{endpoint}/{obj_id}/", H(tok), v)
+    if r.status_code == 404:
+        return None
+    if r.status_code != 200:
+        raise RuntimeError(f"GET {endpoint}/{obj_id} -> {r.status_code}: {r.text}")
+    return r.json()
+
+def ledger_lookup(args: argparse.Namespace, kind: str, awx_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """AAP object the ledger maps this AWX object to, after checking it still exists."""
+    if not _ledger or awx_id is None:
+        return None
+    aap_id = _ledger.lookup(kind, args.awx_host, awx_id, args.aap_host)
+    if aap_id is None:
+        return None
+    obj = aap_if_exists(args.aap_host, args.aap_token, kind, aap_id, args.verify_tls)
+    if obj is None:
+        _ledger.forget(kind, args.awx_host, awx_id, args.aap_host)
+        _ledger.hit("stale")
+        return None
+    _ledger.hit("hit")
+    return obj
+
+def ledger_record(args: argparse.Namespace, kind: str, awx_id: Optional[int], aap_id: Optional[int],
+                  name: Optional[str] = None) -> None:
+    if _ledger and not args.dry_run:
+        _ledger.record(kind, args.awx_host, awx_id, args.aap_host, aap_id, name)
+
+# ---------------- checkpoint journal ----------------
+# Opened in main() with --journal or --resume; see awx_journal.
+_journal: Optional[awx_journal.Journal] = None
+
+def journaled(kind: str, awx_id: Any, step: str) -> Optional[Dict[str, Any]]:
+    """Record of a step an earlier run completed for this AWX object (--resume only)."""
+    return _journal.done(f"{kind}:{awx_id}", step) if _journal else None
+
+def journal(args: argparse.Namespace, kind: str, awx_id: Any, step: str, **data: Any) -> None:
+    if _journal and not args.dry_run:
+        _journal.record(f"{kind}:{awx_id}", step, **data)
 
 # Credential resolution helpers
 def aap_get_credential_type_id_by_name(aap: str, tok: str, name: str, verify: bool) -> Optional[int]:
+    if _catalog and _catalog.covers("credential_types"):
+        ct = _catalog.find("credential_types", name)
+        return ct['id'] if ct else None
     from requests.utils import quote
     d = GET(f"{aap}/api/controller/v2/credential_types/?name={quote(name)}", H(tok), verify)
     res = d.get('results') or d.get('data') or []
@@ -542,6 +1132,8 @@ def aap_get_credential_type_id_by_name(aap: str, tok: str, name: str, verify: bo
 def aap_find_credential(aap: str, tok: str, name: str,
                         awx_ctype_name: Optional[str],
                         org_id: int, verify: bool) -> Optional[Dict[str, Any]]:
+    if _catalog and _catalog.covers("credentials"):
+        return _catalog_credential(aap, tok, name, awx_ctype_name, verify)
     from requests.utils import quote
     d = GET(f"{aap}/api/controller/v2/credentials/?name={quote(name)}&organization={org_id}", H(tok), verify)
     res = d.get('results') or d.get('data') or []
@@ -562,6 +1154,21 @@ def aap_find_credential(aap: str, tok: str, name: str,
                 return res[0]
     return res[0] if isinstance(res, list) and res else None
 
+def _catalog_credential(aap: str, tok: str, name: str, awx_ctype_name: Optional[str],
+                        verify: bool) -> Optional[Dict[str, Any]]:
+    # Same preference order as the query path above, from the catalog.
+    res = _catalog.find_all("credentials", name)
+    if len(res) > 1 and awx_ctype_name:
+        for r in res:
+            if ((r.get('summary_fields') or {}).get('credential_type') or {}).get('name') == awx_ctype_name:
+                return r
+        ctid = aap_get_credential_type_id_by_name(aap, tok, awx_ctype_name, verify)
+        if ctid:
+            found = _catalog.find("credentials", name, credential_type=ctid)
+            if found:
+                return found
+    return res[0] if res else None
+
 # ---------------- transforms ----------------
 def filt(name: str, inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> bool:
     if inc and not inc.search(name):
@@ -660,51 +1267,191 @@ def create_email_notification_template(aap: str, tok: str, org_id: int, name: st
         "name": name, "description": desc or "", "organization": org_id,
         "notification_type": "email", "notification_configuration": config,
     }
-    return POST(f"{aap}/api/controller/v2/notification_templates/", H(tok), payload, v)
+    created = awx_http.create_json(f"{aap}/api/controller/v2/notification_templates/", H(tok), payload, v,
+                                   lambda: q_one(aap, tok, "notification_templates", name, org_id, v, live=True))
+    if _catalog:
+        _catalog.add("notification_templates", created)
+    return created
+
+NOTIF_KIND_PATHS = {
+    "started": "notification_templates_started",
+    "success": "notification_templates_success",
+    "error":   "notification_templates_error",
+}
+
+def _is_email(n: Dict[str, Any]) -> bool:
+    return (n.get("notification_type") or "").lower() == "email" and bool(n.get("name"))
+
+class EmailNotifications:
+    """
+    Run-wide email notification state for bulk --with-notifications runs.
+
+    load() reads every AWX email notification template once, finds the JTs
+    each one is attached to with reverse filters on /job_templates/ (three
+    queries per notification instead of three per JT), reads the org's AAP
+    notification templates once into a name -> id map, and creates the
+    missing ones that in-scope JTs use in a single pre-pass. Per-JT work is
+    then a dict lookup plus the attach POST. If AWX rejects the reverse
+    filter, for_jt() returns None and the caller reads per JT as before.
+    With --source-snapshot the AWX side comes from the snapshot's mapping.
+    scan() is the read-only half of load(); migrate_dag.py calls it and then
+    ensure()s each notification as its own graph node.
+    """
+
+    def __init__(self, args: argparse.Namespace, secrets_map: Dict[str, Dict[str, Any]]) -> None:
+        self.args = args
+        self.secrets_map = secrets_map
+        self.aap_ids: Dict[str, int] = {}
+        self.awx_email = 0
+        self._by_jt: Optional[Dict[int, Dict[str, List[Dict[str, Any]]]]] = None
+
+    def load(self, inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> None:
+        used = self.scan(inc, exc)
+        missing = [n for name, n in sorted(used.items()) if name not in self.aap_ids]
+        existing = len(self.aap_ids)
+        if self.args.dry_run:
+            print(f"DRY-RUN: would create {len(missing)} email notification(s) in AAP")
+        else:
+            for n in missing:
+                self.ensure(n)
+        emit("notification.catalog", awx_email=self.awx_email, aap_existing=existing,
+             created=len(missing), reverse=self._by_jt is not None)
+
+    def scan(self, inc: Optional[Pattern[str]], exc: Optional[Pattern[str]]) -> Dict[str, Dict[str, Any]]:
+        """Read both sides without writing; returns the AWX email notifications in-scope JTs use, by name."""
+        a, t, v = self.args.awx_host, self.args.awx_token, self.args.verify_tls
+        jt_names: Dict[int, str] = {}
+        if _snapshot:
+            awx_notifs = list(_snapshot.objects("notification_templates"))
+            self._by_jt = _snapshot.notification_map()
+            for jt_id in self._by_jt:
+                jt_names[jt_id] = (_snapshot.get("job_templates", jt_id) or {}).get("name", "")
+        else:
+            awx_notifs = list(awx_http.iter_pages(f"{a}/api/v2/notification_templates/?page_size=200", H(t), v))
+        emails = [n for n in awx_notifs if _is_email(n)]
+        self.awx_email = len(emails)
+        if not _snapshot:
+            self._by_jt = self._reverse_lookup(emails, jt_names)
+
+        # Only notifications used by JTs this run will migrate are created up front.
+        used: Dict[str, Dict[str, Any]] = {}
+        for jt_id, kinds in (self._by_jt or {}).items():
+            if jt_id > self.args.resume_after_id and awx_shards.in_shard(jt_id, self.args.shard) \
+                    and filt(jt_names.get(jt_id, ""), inc, exc):
+                for n in kinds.values():
+                    used.update((x["name"], x) for x in n if _is_email(x))
+
+        org = self.args.organization_id
+        if _catalog and _catalog.covers("notification_templates"):
+            aap_notifs: Iterable[Dict[str, Any]] = _catalog.objects("notification_templates")
+        else:
+            u = f"{self.args.aap_host}/api/controller/v2/notification_templates/?page_size=200&organization={org}"
+            aap_notifs = awx_http.iter_pages(u, H(self.args.aap_token), v)
+        for n in aap_notifs:
+            if n.get("name"):
+                self.aap_ids[n["name"]] = n["id"]
+
+        for name, n in used.items():
+            if name in self.aap_ids:
+                ledger_record(self.args, "notification_templates", n.get("id"), self.aap_ids[name], name)
+        return used
+
+    def _reverse_lookup(self, emails: List[Dict[str, Any]],
+                        jt_names: Dict[int, str]) -> Optional[Dict[int, Dict[str, List[Dict[str, Any]]]]]:
+        a, t, v = self.args.awx_host, self.args.awx_token, self.args.verify_tls
+        by_jt: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        try:
+            for n in emails:
+                for kind, path in NOTIF_KIND_PATHS.items():
+                    u = f"{a}/api/v2/job_templates/?page_size=200&{path}={n['id']}"
+                    for jt in awx_http.iter_pages(u, H(t), v):
+                        by_jt.setdefault(jt["id"], {k: [] for k in NOTIF_KIND_PATHS})[kind].append(n)
+                        jt_names[jt["id"]] = jt.get("name", "")
+        except Exception as e:
+            print(f"WARN: reverse notification lookup failed, reading per JT: {e}", file=sys.stderr)
+            emit("notification.reverse.fail", error=str(e))
+            return None
+        return by_jt
+
+    def for_jt(self, jtid: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        if self._by_jt is None:
+            return None
+        return self._by_jt.get(jtid, {k: [] for k in NOTIF_KIND_PATHS})
+
+    def ensure(self, n: Dict[str, Any]) -> int:
+        """AAP id for AWX notification n, creating it (or a dry-run placeholder -1) if missing."""
+        name = n["name"]
+        with name_lock("notification_templates", name):
+            if name in self.aap_ids:
+                return self.aap_ids[name]
+            mapped = ledger_lookup(self.args, "notification_templates", n.get("id"))
+            if mapped:
+                self.aap_ids[name] = mapped["id"]
+                return mapped["id"]
+            aap, tok, org, v = self.args.aap_host, self.args.aap_token, self.args.organization_id, self.args.verify_tls
+            if self.args.dry_run:
+                print(f"  DRY-RUN: create email notification '{name}'")
+                notif_id = -1
+            else:
+                conf = merge_email_config(n.get("notification_configuration") or {}, self.secrets_map.get(name, {}))
+                try:
+                    created = create_email_notification_template(aap, tok, org, name, n.get("description", ""),
+                                                                 conf, v)
+                except Exception:
+                    # Another --shard process may have created it first.
+                    created = q_one(aap, tok, "notification_templates", name, org, v, live=True)
+                    if not created:
+                        raise
+                notif_id = created.get("id")
+                print(f"  Created email notification '{name}' -> id {notif_id}")
+                ledger_record(self.args, "notification_templates", n.get("id"), notif_id, name)
+            self.aap_ids[name] = notif_id
+            return notif_id
 
 def attach_notifs_email(aap: str, tok: str, jt_id: int, org_id: int, v: bool,
                         notifs: Dict[str, List[Dict[str, Any]]],
                         secrets_map: Dict[str, Dict[str, Any]],
-                        dry_run: bool) -> None:
-    kind_to_path = {
-        "started": "notification_templates_started",
-        "success": "notification_templates_success",
-        "error":   "notification_templates_error",
-    }
-    for kind, path in kind_to_path.items():
+                        dry_run: bool, catalog: Optional[EmailNotifications] = None) -> None:
+    for kind, path in NOTIF_KIND_PATHS.items():
         for n in notifs.get(kind, []):
-            if (n.get("notification_type") or "").lower() != "email":
+            if not _is_email(n):
                 continue
             name = n.get("name")
-            if not name:
-                continue
-            existing = aap_find_email_notif(aap, tok, name, org_id, v)
-            if not existing:
-                conf = merge_email_config(n.get("notification_configuration") or {},
-                                          secrets_map.get(name, {}))
-                if dry_run:
-                    print(f"  DRY-RUN: create email notification '{name}'")
-                    notif_id = -1
-                else:
-                    created = create_email_notification_template(aap, tok, org_id, name, n.get("description", ""), conf, v)
-                    notif_id = created.get("id")
-                    print(f"  Created email notification '{name}' -> id {notif_id}")
+            if catalog is not None:
+                notif_id = catalog.ensure(n)
             else:
-                notif_id = existing.get("id")
+                with name_lock("notification_templates", name):
+                    existing = aap_find_email_notif(aap, tok, name, org_id, v)
+                    if not existing:
+                        conf = merge_email_config(n.get("notification_configuration") or {},
+                                                  secrets_map.get(name, {}))
+                        if dry_run:
+                            print(f"  DRY-RUN: create email notification '{name}'")
+                            notif_id = -1
+                        else:
+                            created = create_email_notification_template(aap, tok, org_id, name, n.get("description", ""), conf, v)
+                            notif_id = created.get("id")
+                            print(f"  Created email notification '{name}' -> id {notif_id}")
+                    else:
+                        notif_id = existing.get("id")
             if dry_run:
                 print(f"  DRY-RUN: attach notification '{name}' ({kind})")
             else:
-                POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/{path}/", H(tok), {"id": notif_id}, v)
+                POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/{path}/", H(tok), {"id": notif_id}, v, idempotent=True)
 
 # ---------------- create/attach ----------------
 def create_jt(aap: str, tok: str, payload: Dict[str, Any], v: bool) -> Dict[str, Any]:
-    return POST(f"{aap}/api/controller/v2/job_templates/", H(tok), payload, v)
+    created = awx_http.create_json(f"{aap}/api/controller/v2/job_templates/", H(tok), payload, v,
+                                   lambda: find_aap_jt(aap, tok, payload["name"], payload["organization"], v, live=True))
+    if _catalog:
+        _catalog.add("job_templates", created)
+    return created
 
 def patch_enable_survey(aap: str, tok: str, jt_id: int, v: bool) -> None:
     PATCH(f"{aap}/api/controller/v2/job_templates/{jt_id}/", H(tok), {"survey_enabled": True}, v)
 
 def attach_cred_to_jt(aap: str, tok: str, jt_id: int, cred_id: int, v: bool) -> None:
-    POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/credentials/", H(tok), {"id": cred_id}, v)
+    POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/credentials/", H(tok), {"id": cred_id}, v, idempotent=True)
 
 def resolve_cred_ids(aap: str, tok: str, org: int, v: bool,
                      awx_jt_creds_list: Iterable[Dict[str, Any]],
@@ -733,12 +1480,44 @@ def resolve_cred_ids(aap: str, tok: str, org: int, v: bool,
             ids.append(cid)
     return ids
 
+def survey_hash(spec: Optional[Dict[str, Any]]) -> str:
+    """Content hash of a survey (name, description, questions in order); dict key order is ignored."""
+    body = {k: (spec or {}).get(k) for k in ("name", "description", "spec")}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+def aap_jt_survey_spec(aap: str, tok: str, jt_id: int, v: bool) -> Dict[str, Any]:
+    d = GET(f"{aap}/api/controller/v2/job_templates/{jt_id}/survey_spec/", H(tok), v)
+    return d if isinstance(d, dict) else {}
+
+def verify_surveys(args: argparse.Namespace, checks: List[Tuple[int, str, str]]) -> int:
+    """Re-read each copied survey from AAP (concurrently) and compare hashes; returns mismatches."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def one(check: Tuple[int, str, str]) -> Optional[str]:
+        jt_id, name, want = check
+        try:
+            if survey_hash(aap_jt_survey_spec(args.aap_host, args.aap_token, jt_id, args.verify_tls)) == want:
+                return None
+            return "content differs"
+        except Exception as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.http_pool_size)) as pool:
+        results = list(pool.map(one, checks))
+    bad = 0
+    for (jt_id, name, _), err in zip(checks, results):
+        if err:
+            bad += 1
+            print(f"  WARN: survey verification failed for '{name}' (AAP id {jt_id}): {err}")
+    emit("survey.verify", checked=len(checks), mismatched=bad)
+    return bad
+
 def post_survey_spec_to_aap(aap: str, tok: str, jt_id: int, spec: Dict[str, Any], v: bool) -> None:
     """
     POST survey_spec, then enable on the JT.
     Controller returns 200/204; both are success.
     """
-    POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/survey_spec/", H(tok), spec, v)
+    POST(f"{aap}/api/controller/v2/job_templates/{jt_id}/survey_spec/", H(tok), spec, v, idempotent=True)
     PATCH(f"{aap}/api/controller/v2/job_templates/{jt_id}/", H(tok), {"survey_enabled": True}, v)
 
 # ---------------- per-JT migration ----------------
@@ -770,73 +1549,264 @@ def ensure_refs(aap: str, tok: str, org: int, v: bool,
 
     return proj_id, inv_id, ee_id
 
+def read_schedules(args: argparse.Namespace, obj: Dict[str, Any],
+                   ctx: Optional[RunContext] = None) -> Tuple[List[Dict[str, Any]], Set[int]]:
+    """
+    AWX schedules of one JT and the ids whose rrule AAP would reject.
+    Preloaded rows were checked and reported by RunContext.preload(); the
+    others (single-JT mode, rows that needed their detail GET) are checked
+    and reported here, before anything is written for the template.
+    """
+    listed = ctx.schedules_for(obj['id']) if ctx else None
+    schedules = awx_jt_schedules(args.awx_host, args.awx_token, obj['id'], args.verify_tls, listed)
+    checked = {s.get("id") for s in listed or [] if "rrule" in s}
+    rejected = ctx.rejected_for(obj['id']) if listed is not None else set()
+    name = obj.get('name', f"jt-{obj['id']}")
+    bad = [(name, *b) for b in invalid_schedules(s for s in schedules if s["id"] not in checked)]
+    return schedules, rejected | report_invalid_schedules(bad, ctx, indent="  ")
+
+def find_or_create_jt(args: argparse.Namespace, obj: Dict[str, Any], proj_id: Optional[int],
+                      inv_id: Optional[int], ee_id: Optional[int]) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    """
+    Ledger, then name lookup, else create. Returns (AAP JT id, existing AAP JT
+    or None); the id is None when there is nothing to attach to (dry-run
+    create, or --schedules-only with the JT missing in AAP).
+    """
+    name = obj.get('name', f"jt-{obj.get('id', '?')}")
+    with name_lock("job_templates", name):
+        existing = ledger_lookup(args, "job_templates", obj.get('id'))
+        via = " (ledger)" if existing else ""
+        if not existing:
+            existing = find_aap_jt(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
+        jt_id: Optional[int] = None
+
+        if existing:
+            jt_id = existing.get('id')
+            print(f"FOUND existing JT{via}: {name} -> AAP id {jt_id}  [will update attachments/survey/schedules]")
+            if not via:
+                ledger_record(args, "job_templates", obj.get('id'), jt_id, existing.get('name'))
+            # If you prefer to skip updates on existing JTs, uncomment next line:
+            # print(f"SKIP (exists): {name} -> AAP id {jt_id}"); return None, None
+        else:
+            if args.schedules_only:
+                print(f"SKIP (schedules-only, JT missing in AAP): {name}")
+                return None, None
+            payload = jt_payload_from_awx(obj, args.organization_id, proj_id, inv_id, ee_id)
+            if args.dry_run:
+                print(f"DRY-RUN (create JT): {name}  [EE id {args.force_ee_id}]")
+                # In dry-run we don’t have a real jt_id; don’t proceed with actions that need jt_id.
+                return None, None
+            try:
+                created = create_jt(args.aap_host, args.aap_token, payload, args.verify_tls)
+            except Exception:
+                # Another --shard process may have created a same-name template first.
+                existing = find_aap_jt(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls,
+                                       live=True)
+                if not existing:
+                    raise
+                if _catalog:
+                    _catalog.add("job_templates", existing)
+                jt_id = existing.get('id')
+                print(f"FOUND existing JT (created meanwhile): {name} -> AAP id {jt_id}  "
+                      f"[will update attachments/survey/schedules]")
+            else:
+                jt_id = created.get('id')
+                print(f"CREATED JT: {name} -> AAP id {jt_id}  [EE id {args.force_ee_id}]")
+            ledger_record(args, "job_templates", obj.get('id'), jt_id, name)
+
+    # Guard: from here down, jt_id must exist
+    if jt_id is None:
+        raise RuntimeError(f"Internal error: jt_id not set for template '{name}'")
+    return jt_id, existing
+
+def sync_survey(args: argparse.Namespace, jt_id: int, name: str, existing: Optional[Dict[str, Any]],
+                survey_spec: Dict[str, Any], ctx: Optional[RunContext] = None) -> None:
+    """POST spec then enable, unless AAP already has the same content."""
+    if args.dry_run:
+        print("  DRY-RUN: would POST survey_spec and enable survey")
+        return
+    want = survey_hash(survey_spec)
+    have = survey_hash(aap_jt_survey_spec(args.aap_host, args.aap_token, jt_id, args.verify_tls)) if existing else None
+    if have == want and existing.get('survey_enabled'):
+        print("  Survey unchanged in AAP; skipped")
+        emit("survey.skip.unchanged", jt=jt_id)
+    elif have == want:
+        patch_enable_survey(args.aap_host, args.aap_token, jt_id, args.verify_tls)
+        print("  Survey unchanged in AAP; enabled")
+    else:
+        post_survey_spec_to_aap(args.aap_host, args.aap_token, jt_id, survey_spec, args.verify_tls)
+        print(f"  Survey copied & enabled ({len(survey_spec.get('spec') or [])} question(s))")
+    if ctx:
+        ctx.survey_copied(jt_id, name, want)
+
+def sync_schedules(args: argparse.Namespace, jt_id: int, inv_id: Optional[int], schedules: List[Dict[str, Any]],
+                   rejected: Set[int], ctx: Optional[RunContext] = None) -> None:
+    """Create the JT's AWX schedules missing in AAP (ledger, then name), then report what AAP shows."""
+    created_cnt = 0
+    skipped_existing = 0
+    aap_names = aap_schedule_names(args.aap_host, args.aap_token, args.verify_tls, jt_id) if schedules else {}
+    aap_sched_ids = set(aap_names.values())
+    for s in schedules:
+        nm = s.get("name","")
+        raw = (s.get("rrule") or "").strip()
+        if not raw:
+            print(f"  WARN: schedule '{nm}' has empty rrule; skipped")
+            emit("schedule.skip.empty_rrule", name=nm)
+            continue
+        if s["id"] in rejected:
+            continue
+        done = journaled("schedules", s["id"], "done")
+        if done:
+            print(f"  SKIP schedule (journal): '{nm}' -> AAP id {done.get('aap_id')}")
+            skipped_existing += 1
+            continue
+        mapped = _ledger.lookup("schedules", args.awx_host, s["id"], args.aap_host) if _ledger else None
+        if mapped is not None and mapped in aap_sched_ids:
+            print(f"  SKIP existing schedule (ledger): '{nm}' -> AAP id {mapped}")
+            emit("schedule.skip.exists", name=nm, ledger=True)
+            _ledger.hit("hit")
+            journal(args, "schedules", s["id"], "done", aap_id=mapped)
+            skipped_existing += 1
+            continue
+        if mapped is not None:
+            _ledger.forget("schedules", args.awx_host, s["id"], args.aap_host)
+            _ledger.hit("stale")
+        if nm in aap_names:
+            print(f"  SKIP existing schedule: '{nm}'")
+            emit("schedule.skip.exists", name=nm)
+            ledger_record(args, "schedules", s["id"], aap_names[nm], nm)
+            journal(args, "schedules", s["id"], "done", aap_id=aap_names[nm])
+            skipped_existing += 1
+            continue
+        if args.dry_run:
+            print(f"  DRY-RUN: would create schedule '{nm}' (force JT inventory, keep limit)")
+            emit("schedule.dryrun", name=nm)
+            created_cnt += 1
+            continue
+        created = try_create_schedule(args.aap_host, args.aap_token, args.verify_tls, jt_id, inv_id, s,
+                                      ctx.variants if ctx else None)
+        if created is not None:
+            aap_names[nm] = created.get("id")
+            ledger_record(args, "schedules", s["id"], created.get("id"), nm)
+            journal(args, "schedules", s["id"], "done", aap_id=created.get("id"))
+            created_cnt += 1
+        else:
+            print(f"  WARN: giving up on schedule '{nm}' after 4 attempts")
+            emit("schedule.create.giveup", name=nm)
+
+    # verify
+    try:
+        aap_scheds = GET(f"{args.aap_host}/api/controller/v2/job_templates/{jt_id}/schedules/?page_size=200",
+                         H(args.aap_token), args.verify_tls)
+        total = len(aap_scheds.get("results", []))
+        print(f"  Schedules created: {created_cnt}; existing skipped: {skipped_existing}; AAP currently shows {total}")
+        emit("schedule.verify", created=created_cnt, skipped_existing=skipped_existing, aap_count=total)
+    except Exception as _e:
+        print(f"  WARN: schedule verification fetch failed: {_e}")
+        emit("schedule.verify.fail", error=str(_e))
+
+def journal_steps(args: argparse.Namespace, obj: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Journal records (--resume) of the steps this run would perform for one JT.
+    Only "done" is looked up when it covers the run; a JT finished without
+    --with-schedules is not done for a run that adds them.
+    """
+    done = journaled("job_templates", obj['id'], "done")
+    if done and (done.get("schedules") or not args.with_schedules) \
+            and (done.get("notifications") or not args.with_notifications):
+        return {"done": done}
+    steps: Dict[str, Optional[Dict[str, Any]]] = {"done": None, "jt": journaled("job_templates", obj['id'], "jt")}
+    if obj.get('survey_enabled') or args.probe_all_surveys:
+        steps["survey"] = journaled("job_templates", obj['id'], "survey")
+    if not args.schedules_only:
+        steps["credentials"] = journaled("job_templates", obj['id'], "credentials")
+        if args.with_notifications:
+            steps["notifications"] = journaled("job_templates", obj['id'], "notifications")
+    if args.with_schedules:
+        steps["schedules"] = journaled("job_templates", obj['id'], "schedules")
+    return steps
+
+def read_jt(args: argparse.Namespace, obj: Dict[str, Any], ctx: Optional[RunContext] = None) -> Dict[str, Any]:
+    """
+    AWX side of migrate_one: the journal records, survey spec, schedules,
+    credentials and notifications of one JT, for the steps still to do. Only
+    reads, so the --pipeline-depth reader thread can run it templates ahead
+    of the AAP writes.
+    """
+    steps = journal_steps(args, obj)
+    src: Dict[str, Any] = {"steps": steps, "survey_spec": None, "schedules": [], "rejected": set(),
+                           "creds": [], "notifs": {}}
+    if steps["done"]:
+        return src
+    # Survey spec only for JTs that have one enabled (or everything with --probe-all-surveys)
+    if "survey" in steps and not steps["survey"]:
+        src["survey_spec"] = awx_jt_survey_spec(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
+    # Schedules are read and checked up front, so rrules AAP would reject are
+    # reported together before anything is written for this template.
+    if "schedules" in steps and not steps["schedules"]:
+        src["schedules"], src["rejected"] = read_schedules(args, obj, ctx)
+    if "credentials" in steps and not steps["credentials"]:
+        creds = jt_creds_from_summary(obj)
+        if creds is None:
+            creds = list(awx_jt_creds(args.awx_host, args.awx_token, obj['id'], args.verify_tls))
+        src["creds"] = creds
+    if "notifications" in steps and not steps["notifications"]:
+        catalog = ctx.notifications if ctx else None
+        notifs = catalog.for_jt(obj['id']) if catalog else None
+        if notifs is None:
+            notifs = awx_jt_notifications(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
+        src["notifs"] = notifs
+    return src
+
 def migrate_one(args: argparse.Namespace, obj: Dict[str, Any],
-                notif_secrets_map: Dict[str, Dict[str, Any]]) -> None:
+                notif_secrets_map: Dict[str, Dict[str, Any]], ctx: Optional[RunContext] = None,
+                src: Optional[Dict[str, Any]] = None) -> None:
+    """Migrate one JT; src is its read_jt() result when a pipeline reader already fetched it."""
     name = obj.get('name', f"jt-{obj.get('id', '?')}")
+    if src is None:
+        src = read_jt(args, obj, ctx)
+    steps = src["steps"]
+    # With --resume, steps an earlier run journaled are skipped without API calls.
+    if steps["done"]:
+        print(f"SKIP (journal): {name} -> AAP id {steps['done'].get('aap_id')}")
+        return
+    resumed = steps["jt"]
     sf = obj.get('summary_fields') or {}
     proj_name = (sf.get('project') or {}).get('name')
     inv_name  = (sf.get('inventory') or {}).get('name')
 
     # Resolve refs (EE forced via --force-ee-id)
-    proj_id, inv_id, ee_id = ensure_refs(
-        args.aap_host, args.aap_token, args.organization_id, args.verify_tls,
-        proj_name, inv_name, args.force_ee_id, args.force_inventory_id
-    )
-
-
-    # Always fetch AWX survey spec (even if not enabled there)
-    survey_spec = awx_jt_survey_spec(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
+    if resumed:
+        proj_id, inv_id, ee_id = None, args.force_inventory_id, args.force_ee_id
+    else:
+        proj_id, inv_id, ee_id = ensure_refs(
+            args.aap_host, args.aap_token, args.organization_id, args.verify_tls,
+            proj_name, inv_name, args.force_ee_id, args.force_inventory_id
+        )
 
     # Find or create JT on AAP
-    existing = find_aap_jt(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
-    jt_id: Optional[int] = None
-
-    if existing:
-        jt_id = existing.get('id')
-        print(f"FOUND existing JT: {name} -> AAP id {jt_id}  [will update attachments/survey/schedules]")
-        # If you prefer to skip updates on existing JTs, uncomment next line:
-        # print(f"SKIP (exists): {name} -> AAP id {jt_id}"); return
+    if resumed:
+        jt_id, existing = resumed.get('aap_id'), {"id": resumed.get('aap_id')}
+        print(f"RESUMED JT (journal): {name} -> AAP id {jt_id}")
     else:
-        if args.schedules_only:
-            print(f"SKIP (schedules-only, JT missing in AAP): {name}")
-            return
-        payload = jt_payload_from_awx(obj, args.organization_id, proj_id, inv_id, ee_id)
-        if args.dry_run:
-            print(f"DRY-RUN (create JT): {name}  [EE id {args.force_ee_id}]")
-            # In dry-run we don’t have a real jt_id; don’t proceed with actions that need jt_id.
+        jt_id, existing = find_or_create_jt(args, obj, proj_id, inv_id, ee_id)
+        if jt_id is None:
             return
-        created = create_jt(args.aap_host, args.aap_token, payload, args.verify_tls)
-        jt_id = created.get('id')
-        print(f"CREATED JT: {name} -> AAP id {jt_id}  [EE id {args.force_ee_id}]")
-
-    # Guard: from here down, jt_id must exist
-    if jt_id is None:
-        raise RuntimeError(f"Internal error: jt_id not set for template '{name}'")
+        journal(args, "job_templates", obj['id'], "jt", aap_id=jt_id)
 
     # In schedules-only mode, skip non-schedule resources entirely.
     if args.schedules_only:
         print("  schedules-only mode: skipping survey/credentials/notifications")
 
-    # Survey: POST spec then enable
+    # Survey: POST spec then enable, unless AAP already has the same content
+    survey_spec = src["survey_spec"]
     if survey_spec and not args.schedules_only:
-        if args.dry_run:
-            print("  DRY-RUN: would POST survey_spec and enable survey")
-        else:
-            post_survey_spec_to_aap(args.aap_host, args.aap_token, jt_id, survey_spec, args.verify_tls)
-            # verify
-            try:
-                check = GET(f"{args.aap_host}/api/controller/v2/job_templates/{jt_id}/survey_spec/",
-                            H(args.aap_token), args.verify_tls)
-                if isinstance(check, dict) and check.get("spec"):
-                    print(f"  Survey copied & enabled ({len(check['spec'])} question(s))")
-                else:
-                    print("  WARN: survey POSTed but verification showed empty spec")
-            except Exception as _e:
-                print(f"  WARN: survey verification failed: {_e}")
+        sync_survey(args, jt_id, name, existing, survey_spec, ctx)
+        journal(args, "job_templates", obj['id'], "survey")
 
     # Credentials
-    creds = list(awx_jt_creds(args.awx_host, args.awx_token, obj['id'], args.verify_tls))
-    if creds and not args.schedules_only:
+    creds = src["creds"]
+    if creds:
         if args.dry_run:
             print("  DRY-RUN: would attach credentials")
         else:
@@ -845,67 +1815,203 @@ def migrate_one(args: argparse.Namespace, obj: Dict[str, Any],
             for cid in ids:
                 attach_cred_to_jt(args.aap_host, args.aap_token, jt_id, cid, args.verify_tls)
             print(f"  Attached {len(ids)} credential(s)")
+            journal(args, "job_templates", obj['id'], "credentials", ids=ids)
 
     # Notifications (email)
-    if args.with_notifications and not args.schedules_only:
-        notifs = awx_jt_notifications(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
-        if any(notifs.values()):
-            if args.dry_run:
-                print("  DRY-RUN: would create/attach email notifications")
-            else:
-                attach_notifs_email(args.aap_host, args.aap_token, jt_id, args.organization_id, args.verify_tls,
-                                    notifs, notif_secrets_map, args.dry_run)
-                print("  Processed notifications (email)")
+    notifs = src["notifs"]
+    if any(notifs.values()):
+        if args.dry_run:
+            print("  DRY-RUN: would create/attach email notifications")
+        else:
+            attach_notifs_email(args.aap_host, args.aap_token, jt_id, args.organization_id, args.verify_tls,
+                                notifs, notif_secrets_map, args.dry_run, ctx.notifications if ctx else None)
+            print("  Processed notifications (email)")
+            journal(args, "job_templates", obj['id'], "notifications")
 
     # Schedules
-    if args.with_schedules:
-        schedules = awx_jt_schedules(args.awx_host, args.awx_token, obj['id'], args.verify_tls)
-        created_cnt = 0
-        skipped_existing = 0
-        for s in schedules:
-            nm = s.get("name","")
-            raw = (s.get("rrule") or "").strip()
-            if not raw:
-                print(f"  WARN: schedule '{nm}' has empty rrule; skipped")
-                emit("schedule.skip.empty_rrule", name=nm)
-                continue
-            if aap_schedule_exists(args.aap_host, args.aap_token, args.verify_tls, jt_id, nm):
-                print(f"  SKIP existing schedule: '{nm}'")
-                emit("schedule.skip.exists", name=nm)
-                skipped_existing += 1
+    if "schedules" in steps and not steps["schedules"]:
+        sync_schedules(args, jt_id, inv_id, src["schedules"], src["rejected"], ctx)
+        journal(args, "job_templates", obj['id'], "schedules")
+
+    # --schedules-only runs leave the other steps open for a later full run.
+    if not args.schedules_only:
+        journal(args, "job_templates", obj['id'], "done", aap_id=jt_id,
+                schedules=args.with_schedules, notifications=args.with_notifications)
+
+# ---------------- bulk engines ----------------
+def pipelined(args: argparse.Namespace, objs: Iterable[Dict[str, Any]],
+              inc: Optional[Pattern[str]], exc: Optional[Pattern[str]], ctx: RunContext,
+              out: Optional[awx_http.OrderedOutput] = None) -> Iterator[Tuple[Dict[str, Any], Optional[Any]]]:
+    """
+    (obj, future of its read_jt result) pairs. With --pipeline-depth the AWX
+    reads run on awx_http.read_ahead's reader thread while the bulk loop
+    writes earlier templates to AAP; otherwise the future is None and
+    migrate_one reads inline.
+    """
+    if not args.pipeline_depth:
+        return ((obj, None) for obj in objs)
+
+    def fetch(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        name = obj.get('name', f"jt-{obj.get('id', '?')}")
+        if not awx_shards.in_shard(obj.get('id'), args.shard) or not filt(name, inc, exc):
+            return None
+        return read_jt(args, obj, ctx)
+
+    return awx_http.read_ahead(objs, args.pipeline_depth, fetch, out)
+
+def run_bulk(args: argparse.Namespace, notif_secrets_map: Dict[str, Dict[str, Any]],
+             inc: Optional[Pattern[str]], exc: Optional[Pattern[str]], ctx: RunContext,
+             cursor: Optional[awx_http.ScanCursor] = None) -> Tuple[int, int, int]:
+    migrated = filtered = fail = 0
+    ctx.prepare(notif_secrets_map, inc, exc)
+    # The pipeline reader prints ahead of the writer; slots keep the console in template order.
+    # With --shard each template's output is also marked for awx_shards.merge_events.
+    out = awx_http.OrderedOutput(shard_slot if args.shard else None) if args.pipeline_depth or args.shard else None
+    src = pipelined(args, ctx.preload(awx_jts(args.awx_host, args.awx_token, args.verify_tls, args.resume_after_id)),
+                    inc, exc, ctx, out)
+    if out:
+        out.install()
+    try:
+        for i, (obj, pre) in enumerate(src, start=1):
+            if out:
+                out.bind(i)
+            name = obj.get('name', f"jt-{obj.get('id', '?')}")
+            if not awx_shards.in_shard(obj.get('id'), args.shard):
+                pass  # another shard's template: listed, but no output and no counts here
+            elif not filt(name, inc, exc):
+                print(f"[{i}] SKIP (filtered): {name}"); filtered += 1
+            else:
+                try:
+                    migrate_one(args, obj, notif_secrets_map, ctx, pre.result() if pre else None); migrated += 1
+                except Exception as e:
+                    print(f"[{i}] ERROR: {name}: {e}", file=sys.stderr); fail += 1
+            if out:
+                out.bind(None)
+                out.finish(i)
+            if cursor:
+                cursor.done(i, obj.get('id'))
+    finally:
+        if out:
+            out.uninstall()
+    return migrated, filtered, fail
+
+def _migrate_slot(args: argparse.Namespace, out: awx_http.OrderedOutput, i: int, obj: Dict[str, Any],
+                  notif_secrets_map: Dict[str, Dict[str, Any]], ctx: RunContext,
+                  cursor: Optional[awx_http.ScanCursor] = None, pre: Optional[Any] = None) -> bool:
+    name = obj.get('name', f"jt-{obj.get('id', '?')}")
+    out.bind(i)
+    try:
+        migrate_one(args, obj, notif_secrets_map, ctx, pre.result() if pre else None)
+        return True
+    except Exception as e:
+        print(f"[{i}] ERROR: {name}: {e}", file=sys.stderr)
+        return False
+    finally:
+        out.bind(None)
+        out.finish(i)
+        if cursor:
+            cursor.done(i, obj.get('id'))
+
+async def run_bulk_async(args: argparse.Namespace, notif_secrets_map: Dict[str, Dict[str, Any]],
+                         inc: Optional[Pattern[str]], exc: Optional[Pattern[str]], ctx: RunContext,
+                         cursor: Optional[awx_http.ScanCursor] = None) -> Tuple[int, int, int]:
+    """
+    Same walk as run_bulk, with up to --concurrency templates in flight.
+    HTTP runs on aiohttp via awx_http's async transport; each migrate_one keeps
+    its own step order inside a worker, so only different templates overlap.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    conc = max(1, args.concurrency)
+    loop = asyncio.get_running_loop()
+    await awx_http.start_async()
+    pool = ThreadPoolExecutor(max_workers=conc + 1, thread_name_prefix="jt")
+    sem = asyncio.Semaphore(conc)
+    out = awx_http.OrderedOutput(shard_slot if args.shard else None)
+    out.install()
+    filtered = 0
+    flows: List["asyncio.Future[bool]"] = []
+    try:
+        await loop.run_in_executor(pool, ctx.prepare, notif_secrets_map, inc, exc)
+        src = pipelined(args, ctx.preload(awx_jts(args.awx_host, args.awx_token, args.verify_tls,
+                                                  args.resume_after_id)), inc, exc, ctx, out)
+        i = 0
+        while True:
+            item = await loop.run_in_executor(pool, next, src, None)
+            if item is None:
+                break
+            obj, pre = item
+            i += 1
+            name = obj.get('name', f"jt-{obj.get('id', '?')}")
+            if not awx_shards.in_shard(obj.get('id'), args.shard):
+                out.finish(i)
+                if cursor:
+                    cursor.done(i, obj.get('id'))
                 continue
-            if args.dry_run:
-                print(f"  DRY-RUN: would create schedule '{nm}' (force JT inventory, keep limit)")
-                emit("schedule.dryrun", name=nm)
-                created_cnt += 1
+            if not filt(name, inc, exc):
+                out.bind(i); print(f"[{i}] SKIP (filtered): {name}"); out.bind(None)
+                out.finish(i); filtered += 1
+                if cursor:
+                    cursor.done(i, obj.get('id'))
                 continue
-            ok = try_create_schedule(args.aap_host, args.aap_token, args.verify_tls, jt_id, inv_id, s)
-            if ok:
-                created_cnt += 1
-            else:
-                print(f"  WARN: giving up on schedule '{nm}' after 4 attempts")
-                emit("schedule.create.giveup", name=nm)
-
-        # verify
-        try:
-            aap_scheds = GET(f"{args.aap_host}/api/controller/v2/job_templates/{jt_id}/schedules/?page_size=200",
-                             H(args.aap_token), args.verify_tls)
-            total = len(aap_scheds.get("results", []))
-            print(f"  Schedules created: {created_cnt}; existing skipped: {skipped_existing}; AAP currently shows {total}")
-            emit("schedule.verify", created=created_cnt, skipped_existing=skipped_existing, aap_count=total)
-        except Exception as _e:
-            print(f"  WARN: schedule verification fetch failed: {_e}")
-            emit("schedule.verify.fail", error=str(_e))
+            await sem.acquire()
+            fut = loop.run_in_executor(pool, _migrate_slot, args, out, i, obj, notif_secrets_map, ctx, cursor, pre)
+            fut.add_done_callback(lambda _f: sem.release())
+            flows.append(fut)
+    finally:
+        # Drain in-flight flows before the loop stops serving their HTTP calls.
+        oks = await asyncio.gather(*flows, return_exceptions=True)
+        out.uninstall()
+        pool.shutdown(wait=True)
+        await awx_http.stop_async()
+    migrated = sum(1 for ok in oks if ok is True)
+    return migrated, filtered, len(oks) - migrated
 
 # ---------------- main ----------------
+def finish_ledger(args: argparse.Namespace) -> int:
+    """Report ledger and journal use and write --ledger-json; returns the number of mappings exported."""
+    if _journal:
+        emit("journal.stats", path=_journal.path, **_journal.counts)
+    if not _ledger:
+        return 0
+    emit("ledger.stats", path=_ledger.path, **_ledger.counts)
+    return _ledger.export_json(args.ledger_json) if args.ledger_json else 0
+
 def main() -> int:
     args = parse_args()
     args.awx_host = norm(args.awx_host); args.aap_host = norm(args.aap_host)
+    awx_http.configure(pool_size=args.http_pool_size, latency_target=args.latency_target_ms / 1000.0,
+                       page_window=args.page_prefetch, scan_mode=args.scan, scan_ranges=args.scan_ranges)
+    awx_http.set_host_budget(args.awx_host, args.awx_max_inflight)
+    awx_http.set_host_budget(args.aap_host, args.aap_max_inflight)
+    awx_http.set_event_hook(emit)
+    if args.source_snapshot:
+        global _snapshot
+        _snapshot = awx_snapshot.open_for(args.source_snapshot, args.awx_host)
+    if args.http_cache:
+        awx_http.set_cache(awx_cache.HttpCache(args.http_cache, args.cache_ttl, args.cache_max_mb * 1024 * 1024),
+                           [args.awx_host])
     ping(args.aap_host, args.aap_token, args.verify_tls)
 
     if args.schedules_only and not args.with_schedules:
         raise SystemExit("--schedules-only requires --with-schedules")
 
+    if args.aap_catalog:
+        global _catalog
+        _catalog = aap_catalog.Catalog(args.aap_host, args.aap_token, args.verify_tls, args.organization_id,
+                                       catalog_kinds(args))
+        emit("aap.catalog", org=args.organization_id, counts=_catalog.load())
+    preflight_forced_refs(args)
+    if args.ledger:
+        global _ledger
+        _ledger = awx_ledger.Ledger(args.ledger)
+    if args.journal or args.resume:
+        global _journal
+        _journal = awx_journal.Journal(args.resume or args.journal, args.aap_host, [args.awx_host],
+                                       resume=bool(args.resume))
+        if args.resume:
+            emit("journal.resume", path=args.resume, steps=_journal.counts["loaded"])
+
     # Single vs bulk
     template_id = args.template_id
     if template_id is None:
@@ -921,28 +2027,65 @@ def main() -> int:
     if args.with_notifications and args.notif_secrets_file:
         notif_secrets_map = load_notif_secrets(args.notif_secrets_file)
 
+    ctx = RunContext(args)
     if template_id is not None:
+        if args.shard:
+            raise SystemExit("--shard applies to --all runs only")
         obj = awx_jt(args.awx_host, args.awx_token, template_id, args.verify_tls)
-        migrate_one(args, obj, notif_secrets_map)
+        migrate_one(args, obj, notif_secrets_map, ctx)
+        if ctx.survey_checks:
+            verify_surveys(args, ctx.survey_checks)
+        ctx.variants.save()
+        finish_ledger(args)
+        emit("http.stats", hosts=awx_http.stats(), retries=awx_http.retry_stats(),
+             cache=awx_http.cache_stats())
         return 0
 
     if not args.all:
         raise SystemExit("Specify --template-id <ID> (or set TEMPLATE_ID) for single JT, or use --all.")
 
-    migrated = filtered = fail = 0
-    for i, obj in enumerate(awx_jts(args.awx_host, args.awx_token, args.verify_tls), start=1):
-        name = obj.get('name', f"jt-{obj.get('id', '?')}")
-        if not filt(name, inc, exc):
-            print(f"[{i}] SKIP (filtered): {name}"); filtered += 1; continue
-        try:
-            migrate_one(args, obj, notif_secrets_map); migrated += 1
-        except Exception as e:
-            print(f"[{i}] ERROR: {name}: {e}", file=sys.stderr); fail += 1
+    cursor = awx_http.ScanCursor(args.cursor_file) if args.cursor_file else None
+    if args.engine == 'async':
+        migrated, filtered, fail = asyncio.run(run_bulk_async(args, notif_secrets_map, inc, exc, ctx, cursor))
+    else:
+        migrated, filtered, fail = run_bulk(args, notif_secrets_map, inc, exc, ctx, cursor)
+    if args.shard:
+        emit(awx_shards.END_EVENT, shard=awx_shards.label(args.shard))
+    survey_bad = verify_surveys(args, ctx.survey_checks) if ctx.survey_checks else 0
+    ctx.variants.save()
+    exported = finish_ledger(args)
+    emit(awx_shards.SUMMARY_EVENT, migrated=migrated, filtered=filtered, failures=fail,
+         schedules_invalid=ctx.invalid_schedules, surveys_mismatched=survey_bad)
 
     print("\nSummary:")
     print(f"  Migrated attempts: {migrated}")
     print(f"  Filtered:          {filtered}")
     print(f"  Failures:          {fail}")
+    if args.verify_surveys:
+        print(f"  Surveys verified:  {len(ctx.survey_checks)} ({survey_bad} mismatched)")
+    if args.with_schedules:
+        print(f"  Schedules invalid: {ctx.invalid_schedules} (rrule rejected locally, not sent)")
+    if ctx.variants.attempts():
+        vs = ", ".join(f"{v} {c['ok']}/{c['ok'] + c['fail']}" for v, c in ctx.variants.run.items()
+                       if c['ok'] + c['fail'])
+        print(f"  Schedule variants: {vs} (created/attempted)")
+        emit("schedule.variants", run=ctx.variants.run)
+    if _ledger:
+        lc = _ledger.counts
+        print(f"  Id ledger:         {lc['hit']} reused, {lc['stale']} stale dropped, {lc['recorded']} recorded"
+              + (f" (exported {exported} to {args.ledger_json})" if args.ledger_json else ""))
+    if _journal:
+        jc = _journal.counts
+        print(f"  Journal:           {jc['skipped']} step(s) skipped, {jc['recorded']} recorded ({_journal.path})")
+    if cursor and cursor.last_id is not None:
+        print(f"  Last handled id:   {cursor.last_id} (resume with --resume-after-id {cursor.last_id})")
+    rs = awx_http.retry_stats()
+    print(f"  HTTP retries:      {rs['retries']} (waited {rs['wait_s']}s, creates recovered {rs['recovered_creates']})")
+    cs = awx_http.cache_stats()
+    if cs:
+        print(f"  AWX cache:         {cs['fresh']} fresh, {cs['revalidated']} revalidated (304), {cs['miss']} fetched")
+    emit("http.stats", hosts=awx_http.stats(), retries=awx_http.retry_stats(),
+         cache=awx_http.cache_stats())
     return 0 if fail == 0 else 2
 
 if __name__ == "__main__":
@@ -16,12 +16,8 @@ import argparse
 import sys
 import textwrap
 from typing import Dict, Any
-import requests
-import urllib3
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-TIMEOUT = 30  # seconds
+import awx_http
 
 
 def parse_args() -> argparse.Namespace:
@@ -41,6 +37,8 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--project-id', required=True, type=int)
     p.add_argument('--organization-id', required=True, type=int)
     p.add_argument('--verify-tls', action='store_true', help='Enable TLS verification (default: disabled)')
+    p.add_argument('--http-pool-size', type=int, default=awx_http.POOL_SIZE,
+                   help=f'Keep-alive connections per host (default: {awx_http.POOL_SIZE})')
     return p.parse_args()
 
 
@@ -50,25 +48,15 @@ def norm_host(host: str) -> str:
 
 
 def headers(token: str) -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
+    return awx_http.headers(token)
 
 
 def http_get_json(url: str, hdrs: Dict[str, str], verify: bool) -> Dict[str, Any]:
-    r = requests.get(url, headers=hdrs, verify=verify, timeout=TIMEOUT)
-    if r.status_code != 200:
-        raise RuntimeError(f"GET {url} -> {r.status_code}: {r.text}")
-    return r.json()
+    return awx_http.get_json(url, hdrs, verify)
 
 
 def http_post_json(url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool) -> Dict[str, Any]:
-    r = requests.post(url, headers=hdrs, json=payload, verify=verify, timeout=TIMEOUT)
-    if r.status_code not in (200, 201, 202):
-        raise RuntimeError(f"POST {url} -> {r.status_code}:\n{r.text}")
-    return r.json()
+    return awx_http.post_json(url, hdrs, payload, verify)
 
 
 def get_awx_project(awx_host: str, awx_token: str, project_id: int, verify: bool) -> Dict[str, Any]:
@@ -119,7 +107,7 @@ def assert_aap_controller_reachable(aap_host: str, aap_token: str, verify: bool)
     """
     # A simple capability endpoint to prove the base exists & token works.
     url = f"{aap_host}/api/controller/v2/ping/"
-    r = requests.get(url, headers=headers(aap_token), verify=verify, timeout=TIMEOUT)
+    r = awx_http.get(url, headers(aap_token), verify)
     if r.status_code == 401:
         raise RuntimeError("AAP token unauthorized (401). Check token scope/expiration.")
     if r.status_code == 403:
@@ -130,7 +118,7 @@ def assert_aap_controller_reachable(aap_host: str, aap_token: str, verify: bool)
 
 def assert_org_exists(aap_host: str, aap_token: str, org_id: int, verify: bool) -> None:
     url = f"{aap_host}/api/controller/v2/organizations/{org_id}/"
-    r = requests.get(url, headers=headers(aap_token), verify=verify, timeout=TIMEOUT)
+    r = awx_http.get(url, headers(aap_token), verify)
     if r.status_code == 404:
         raise RuntimeError(f"Organization id {org_id} not found on AAP.")
     if r.status_code not in (200,):
@@ -149,6 +137,7 @@ def create_project_on_aap(aap_host: str, aap_token: str, payload: Dict[str, Any]
 
 def main() -> int:
     args = parse_args()
+    awx_http.configure(pool_size=args.http_pool_size)
     awx_host = norm_host(args.awx_host)
     aap_host = norm_host(args.aap_host)
     verify = args.verify_tls
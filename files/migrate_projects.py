@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import os
 import re
 import sys
-from typing import Dict, Any, Iterable, Optional, Pattern, Tuple, List
-import requests
-import urllib3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterable, Optional, Pattern, Tuple, List
 from urllib.parse import urlparse, urlunparse, quote
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-TIMEOUT = 30
+import aap_catalog
+import awx_cache
+import awx_codec
+import awx_http
+import awx_journal
+import awx_ledger
+import awx_shards
+import awx_snapshot
 
 
 def parse_args() -> argparse.Namespace:
@@ -31,8 +37,56 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--include', help='Regex; only project names matching are considered')
     p.add_argument('--exclude', help='Regex; project names matching are excluded')
     p.add_argument('--limit', type=int, help='Stop after N processed')
+    p.add_argument('--workers', type=int, default=1,
+                   help='Bulk and PROD modes: projects looked up/created concurrently; console lines and the '
+                        'receipt keep listing order (default: 1)')
+    p.add_argument('--pipeline-depth', type=int, default=0,
+                   help='Bulk and PROD modes: read the AWX project listing on a separate thread, up to N '
+                        'projects ahead of the AAP writes (0 = read and write in turn)')
+    p.add_argument('--shard', type=awx_shards.parse_shard, metavar='I/N',
+                   help='Bulk and PROD modes: only handle the projects whose AWX id hashes to shard I of N; '
+                        'in PROD mode --receipt-out is then a partial receipt for awx_shards.py receipts')
     p.add_argument('--dry-run', action='store_true', help='Preview only; no creates')
     p.add_argument('--verify-tls', action='store_true', help='Enable TLS verification (default off)')
+    p.add_argument('--http-pool-size', type=int, default=awx_http.POOL_SIZE,
+                   help=f'Keep-alive connections per host (default: {awx_http.POOL_SIZE})')
+    p.add_argument('--source-snapshot', metavar='PATH', action='append', default=[],
+                   help='Read AWX projects from a snapshot made by awx_snapshot.py (repeat for ATST and PROD); '
+                        'each is used for the AWX host it was taken from')
+    p.add_argument('--no-aap-catalog', dest='aap_catalog', action='store_false',
+                   help='Bulk mode: look AAP projects up by name one query at a time instead of preloading the org')
+    p.add_argument('--ledger', metavar='PATH', default=awx_ledger.DEFAULT_PATH,
+                   help='AWX -> AAP id ledger, consulted before name lookups and updated as projects are mapped '
+                        f'("" = off; default: {awx_ledger.DEFAULT_PATH})')
+    p.add_argument('--ledger-json', metavar='PATH', help='After the run, export the ledger as JSON here')
+    j = p.add_mutually_exclusive_group()
+    j.add_argument('--journal', metavar='PATH',
+                   help='Bulk and PROD modes: append each finished project (and its receipt line) to this '
+                        'fsync\'d journal')
+    j.add_argument('--resume', metavar='PATH',
+                   help='Skip the projects recorded in this journal (no API calls for them) and keep appending to it')
+    p.add_argument('--http-cache', metavar='PATH',
+                   help=f'Persistent SQLite cache for AWX GETs (e.g. {awx_cache.DEFAULT_PATH}); off by default')
+    p.add_argument('--cache-ttl', type=float, default=0,
+                   help='Seconds a cached AWX response is used without asking AWX; after that it is revalidated (default: 0)')
+    p.add_argument('--cache-max-mb', type=int, default=awx_cache.DEFAULT_MAX_MB,
+                   help=f'Cache size cap; least-recently-used entries are evicted (default: {awx_cache.DEFAULT_MAX_MB})')
+    p.add_argument('--page-prefetch', type=int, default=awx_http.PAGE_WINDOW,
+                   help=f'AWX list pages fetched concurrently ahead of processing; 1 = sequential (default: {awx_http.PAGE_WINDOW})')
+    p.add_argument('--scan', choices=('page', 'keyset'), default='page',
+                   help='How AWX project lists are walked: page (?page=N) or keyset (?order_by=id&id__gt=<last id>)')
+    p.add_argument('--scan-ranges', type=int, default=1,
+                   help='With --scan keyset, split the id space into N ranges scanned in parallel (default: 1)')
+    p.add_argument('--resume-after-id', type=int, default=0,
+                   help='Only process source projects with id greater than this (e.g. the value left in --cursor-file)')
+    p.add_argument('--cursor-file', metavar='PATH',
+                   help='Write the id of the last handled source project here as the run progresses')
+    p.add_argument('--awx-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AWX (ATST/PROD source) requests')
+    p.add_argument('--aap-max-inflight', type=int, default=awx_http.POOL_SIZE,
+                   help='Upper bound of the adaptive concurrency window for AAP (target) requests')
+    p.add_argument('--latency-target-ms', type=int, default=int(awx_http.LATENCY_TARGET * 1000),
+                   help='p95 latency under which the limiter keeps widening its window')
 
     # PROD compare mode
     p.add_argument('--prod-mode', action='store_true', help='Enable PROD compare/migrate mode')
@@ -44,6 +98,10 @@ def parse_args() -> argparse.Namespace:
     # Offline / artifact options
     p.add_argument('--export-awx-index', help='Export ATST index JSON file (no AAP activity)')
     p.add_argument('--atst-index-file', help='Load ATST index JSON file (skip ATST API calls)')
+    p.add_argument('--compact-index', action='store_true', help='Write the exported index without indentation')
+    p.add_argument('--refresh-index', action='store_true',
+                   help='With --export-awx-index: update the existing index file with AWX changes since it was '
+                        'written (modified__gt + deletion probe) instead of re-exporting everything')
 
     args = p.parse_args()
 
@@ -78,52 +136,63 @@ def norm_host(host: Optional[str]) -> Optional[str]:
 
 
 def headers(token: str) -> Dict[str, str]:
-    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept": "application/json"}
+    return awx_http.headers(token)
 
 
 def get_json(url: str, hdrs: Dict[str, str], verify: bool) -> Dict[str, Any]:
-    r = requests.get(url, headers=hdrs, verify=verify, timeout=TIMEOUT)
-    if r.status_code != 200:
-        raise RuntimeError(f"GET {url} -> {r.status_code}: {r.text}")
-    return r.json()
+    return awx_http.get_json(url, hdrs, verify)
 
 
 def post_json(url: str, hdrs: Dict[str, str], payload: Dict[str, Any], verify: bool) -> Dict[str, Any]:
-    r = requests.post(url, headers=hdrs, json=payload, verify=verify, timeout=TIMEOUT)
-    if r.status_code not in (200, 201, 202):
-        raise RuntimeError(f"POST {url} -> {r.status_code}:\n{r.text}")
-    return r.json()
+    return awx_http.post_json(url, hdrs, payload, verify)
 
 
 def aap_ping(aap_host: str, aap_token: str, verify: bool) -> None:
     url = f"{aap_host}/api/controller/v2/ping/"
-    r = requests.get(url, headers=headers(aap_token), verify=verify, timeout=TIMEOUT)
+    r = awx_http.get(url, headers(aap_token), verify)
     if r.status_code != 200:
         raise RuntimeError(f"AAP controller not reachable at {url} -> {r.status_code}: {r.text}")
 
 
 def assert_org_exists(aap_host: str, aap_token: str, org_id: int, verify: bool) -> None:
     url = f"{aap_host}/api/controller/v2/organizations/{org_id}/"
-    r = requests.get(url, headers=headers(aap_token), verify=verify, timeout=TIMEOUT)
+    r = awx_http.get(url, headers(aap_token), verify)
     if r.status_code == 404:
         raise RuntimeError(f"Organization id {org_id} not found on AAP.")
     if r.status_code != 200:
         raise RuntimeError(f"Failed to validate organization {org_id}: {r.status_code} {r.text}")
 
 
+# Snapshots loaded with --source-snapshot, keyed by the AWX host they were taken from.
+_snapshots: Dict[str, awx_snapshot.Snapshot] = {}
+
+
 def get_awx_project(awx_host: str, awx_token: str, project_id: int, verify: bool) -> Dict[str, Any]:
+    snap = _snapshots.get(awx_host)
+    if snap:
+        obj = snap.get("projects", project_id)
+        if obj is None:
+            raise RuntimeError(f"Project {project_id} not in snapshot {snap.path}")
+        return obj
     url = f"{awx_host}/api/v2/projects/{project_id}/"
     return get_json(url, headers(awx_token), verify)
 
 
-def paged_awx_projects(awx_host: str, awx_token: str, verify: bool) -> Iterable[Dict[str, Any]]:
+def paged_awx_projects(awx_host: str, awx_token: str, verify: bool, after_id: int = 0) -> Iterable[Dict[str, Any]]:
+    # Walked per --scan (prefetched pages or id keyset); objects always arrive in order.
+    snap = _snapshots.get(awx_host)
+    if snap:
+        return snap.objects("projects", after_id)
     url = f"{awx_host}/api/v2/projects/?page_size=200"
-    hdrs = headers(awx_token)
-    while url:
-        data = get_json(url, hdrs, verify)
-        for obj in data.get('results', []):
-            yield obj
-        url = data.get('next')
+    return awx_http.iter_list(url, headers(awx_token), verify, after_id)
+
+
+def project_stream(args, awx_host: str, awx_token: str) -> Iterable[Dict[str, Any]]:
+    """paged_awx_projects, read up to --pipeline-depth projects ahead of the writers on a reader thread."""
+    objs = paged_awx_projects(awx_host, awx_token, args.verify_tls, args.resume_after_id)
+    if not args.pipeline_depth:
+        return objs
+    return (obj for obj, _ in awx_http.read_ahead(objs, args.pipeline_depth))
 
 
 def _strip_trailing_git(url: str) -> str:
@@ -189,7 +258,14 @@ def clean_project_for_aap(src: Dict[str, Any], org_id: int) -> Dict[str, Any]:
     return payload
 
 
-def find_aap_project(aap_host: str, aap_token: str, name: str, org_id: int, verify: bool) -> Optional[Dict[str, Any]]:
+# AAP projects of the target org, preloaded by bulk runs (see aap_catalog).
+_catalog: Optional[aap_catalog.Catalog] = None
+
+
+def find_aap_project(aap_host: str, aap_token: str, name: str, org_id: int, verify: bool,
+                     live: bool = False) -> Optional[Dict[str, Any]]:
+    if _catalog and not live:
+        return _catalog.find("projects", name)
     url = f"{aap_host}/api/controller/v2/projects/?name={quote(name)}&organization={org_id}"
     data = get_json(url, headers(aap_token), verify)
     results = data.get('results') or data.get('data') or []
@@ -198,35 +274,152 @@ def find_aap_project(aap_host: str, aap_token: str, name: str, org_id: int, veri
     return results[0] if results else None
 
 
+_name_locks: Dict[str, threading.Lock] = {}
+_name_locks_guard = threading.Lock()
+
+
+def name_lock(name: str) -> threading.Lock:
+    """Serialize find-or-create of one AAP project name across --workers threads."""
+    with _name_locks_guard:
+        return _name_locks.setdefault(name, threading.Lock())
+
+
 def create_aap_project(aap_host: str, aap_token: str, payload: Dict[str, Any], verify: bool) -> Dict[str, Any]:
     url = f"{aap_host}/api/controller/v2/projects/"
-    return post_json(url, headers(aap_token), payload, verify)
+    created = awx_http.create_json(url, headers(aap_token), payload, verify,
+                                   lambda: find_aap_project(aap_host, aap_token, payload["name"],
+                                                            payload["organization"], verify, live=True))
+    if _catalog:
+        _catalog.add("projects", created)
+    return created
+
+
+# AWX -> AAP id ledger, opened in main() unless --ledger "" (see awx_ledger).
+_ledger: Optional[awx_ledger.Ledger] = None
+
+
+def ledger_project(args, awx_host: str, awx_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """AAP project the ledger maps this AWX project to, after checking it still exists."""
+    if not _ledger or awx_id is None:
+        return None
+    aap_id = _ledger.lookup("projects", awx_host, awx_id, args.aap_host)
+    if aap_id is None:
+        return None
+    if _catalog:
+        obj = _catalog.get("projects", aap_id)
+    else:
+        r = awx_http.get(f"{args.aap_host}/api/controller/v2/projects/{aap_id}/", headers(args.aap_token),
+                         args.verify_tls)
+        if r.status_code not in (200, 404):
+            raise RuntimeError(f"GET projects/{aap_id} -> {r.status_code}: {r.text}")
+        obj = r.json() if r.status_code == 200 else None
+    if obj is None:
+        _ledger.forget("projects", awx_host, awx_id, args.aap_host)
+        _ledger.hit("stale")
+        return None
+    _ledger.hit("hit")
+    return obj
+
+
+def ledger_record(args, awx_host: str, awx_id: Optional[int], aap_obj: Dict[str, Any]) -> None:
+    if _ledger and not args.dry_run:
+        _ledger.record("projects", awx_host, awx_id, args.aap_host, aap_obj.get("id"), aap_obj.get("name"))
+
+
+def print_ledger_summary(args) -> None:
+    if not _ledger:
+        return
+    lc = _ledger.counts
+    line = f"  Id ledger: {lc['hit']} reused, {lc['stale']} stale dropped, {lc['recorded']} recorded"
+    if args.ledger_json:
+        line += f" (exported {_ledger.export_json(args.ledger_json)} to {args.ledger_json})"
+    print(line)
+
+
+# Checkpoint journal, opened in main() with --journal or --resume (see awx_journal).
+_journal: Optional[awx_journal.Journal] = None
+
+
+def journaled(kind: str, awx_id: Any) -> Optional[Dict[str, Any]]:
+    return _journal.done(f"{kind}:{awx_id}", "done") if _journal else None
+
+
+def journal(args, kind: str, awx_id: Any, **data: Any) -> None:
+    if _journal and not args.dry_run:
+        _journal.record(f"{kind}:{awx_id}", "done", **data)
+
+
+def print_journal_summary() -> None:
+    if _journal:
+        jc = _journal.counts
+        print(f"  Journal: {jc['skipped']} project(s) skipped, {jc['recorded']} recorded ({_journal.path})")
 
 
 # ---------- Offline index helpers ----------
-def export_atst_index(awx_host: str, awx_token: str, verify: bool, out_path: str) -> None:
+def _index_entry(obj: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": obj.get("name"),
+        "id": obj.get("id"),
+        "scm_url": obj.get("scm_url"),
+        "scm_branch": obj.get("scm_branch"),
+        "modified": obj.get("modified"),
+    }
+
+
+def _write_atst_index(awx_host: str, by_id: Dict[int, Dict[str, Any]], out_path: str, compact: bool) -> None:
+    # "projects" is derived from "by_id" in id order (a later id wins a shared key), so an
+    # incrementally refreshed index is byte-identical to a fresh export.
+    mapping: Dict[str, Dict[str, Any]] = {}
+    for pid in sorted(by_id):
+        obj = by_id[pid]
+        url, branch = project_key(obj)
+        mapping[f"{url}@@{branch}"] = {k: obj.get(k) for k in ("name", "id", "scm_url", "scm_branch")}
+    watermark = max((o.get("modified") or "" for o in by_id.values()), default="")
+    data = {"version": 1, "source": awx_host, "watermark": watermark, "projects": mapping,
+            "by_id": {str(pid): by_id[pid] for pid in sorted(by_id)}}
+    awx_codec.dump_file(data, out_path, compact=compact)
+
+
+def export_atst_index(awx_host: str, awx_token: str, verify: bool, out_path: str, compact: bool = False) -> None:
     """
     Export ATST project index keyed by (norm_url, branch).
     Value contains minimal fields necessary for audit:
       { "name": ..., "id": ..., "scm_url": ..., "scm_branch": ... }
+    "by_id" and "watermark" (newest AWX modified) let refresh_atst_index update it later.
     """
-    mapping: Dict[str, Dict[str, Any]] = {}
-    for obj in paged_awx_projects(awx_host, awx_token, verify):
-        url, branch = project_key(obj)
-        key = f"{url}@@{branch}"
-        mapping[key] = {
-            "name": obj.get("name"),
-            "id": obj.get("id"),
-            "scm_url": obj.get("scm_url"),
-            "scm_branch": obj.get("scm_branch"),
-        }
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({"version": 1, "source": awx_host, "projects": mapping}, f, indent=2, ensure_ascii=False)
+    by_id = {obj["id"]: _index_entry(obj) for obj in paged_awx_projects(awx_host, awx_token, verify)}
+    _write_atst_index(awx_host, by_id, out_path, compact)
+
+
+def refresh_atst_index(awx_host: str, awx_token: str, verify: bool, path: str, compact: bool = False) -> str:
+    """
+    Update an exported index in place: projects modified since shortly before
+    the watermark are re-read, deleted ones are found with count-only id
+    probes. Falls back to a full export when the file is missing, from another
+    host, or predates by_id.
+    """
+    data = awx_codec.load_file(path) if os.path.exists(path) else {}
+    if "by_id" not in data or data.get("source") != awx_host:
+        export_atst_index(awx_host, awx_token, verify, path, compact)
+        return "full export"
+    by_id = {int(k): v for k, v in data["by_id"].items()}
+    url = f"{awx_host}/api/v2/projects/?page_size=200"
+    # The export's listing was not atomic: a project on an early page edited while later
+    # pages were read is older than the watermark, so re-read from CLOCK_MARGIN before it.
+    wm = data.get("watermark")
+    since = awx_snapshot.rewind(wm) if wm else None
+    listed = awx_http.iter_pages(awx_http.with_query(url, modified__gt=since), headers(awx_token), verify)
+    changed = [e for e in map(_index_entry, listed) if by_id.get(e["id"]) != e]
+    gone = awx_snapshot.deleted_ids(awx_host, "projects", sorted(by_id), headers(awx_token), verify)
+    by_id.update((o["id"], o) for o in changed)
+    for pid in gone:
+        by_id.pop(pid, None)
+    _write_atst_index(awx_host, by_id, path, compact)
+    return f"{len(changed)} changed, {len(gone)} deleted"
 
 
 def load_atst_index_from_file(path: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = awx_codec.load_file(path)
     projects = data.get("projects", {})
     mapping: Dict[Tuple[str, str], Dict[str, Any]] = {}
     for key, obj in projects.items():
@@ -248,6 +441,97 @@ def load_projects_map_live(awx_host: str, awx_token: str, verify: bool) -> Dict[
 
 
 # ---------- Runners ----------
+class ProjectPool:
+    """
+    Runs the per-project steps of a bulk loop (ledger/AAP lookup, create,
+    receipt line) on up to --workers threads. The loop itself stays in the
+    caller, so include/exclude and --limit are decided in listing order as
+    before. Each project's console output is held in its [idx] slot and
+    released in order (awx_http.OrderedOutput), results are kept by idx, and
+    --cursor-file only moves past projects that have finished. With one
+    worker every step runs inline.
+    """
+
+    def __init__(self, workers: int, cursor_file: Optional[str] = None) -> None:
+        self.workers = max(1, workers)
+        self.results: Dict[int, Any] = {}
+        self._cursor = awx_http.ScanCursor(cursor_file) if cursor_file else None
+        self._out = awx_http.OrderedOutput() if self.workers > 1 else None
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="proj") if self.workers > 1 else None
+        self._room = threading.BoundedSemaphore(self.workers * 2)
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "ProjectPool":
+        if self._out:
+            self._out.install()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=True)
+        if self._out:
+            self._out.uninstall()
+        if exc is None and self._error is not None:
+            raise self._error
+
+    def submit(self, idx: int, obj_id: Any, fn: Callable[..., Any], *fn_args: Any) -> None:
+        """Run fn(*fn_args) for project idx; its return value lands in results[idx]."""
+        if self._error is not None:
+            raise self._error
+        if not self._pool:
+            self._run(idx, obj_id, fn, fn_args)
+            return
+        self._room.acquire()
+        self._pool.submit(self._pooled, idx, obj_id, fn, fn_args)
+
+    def note(self, idx: int, obj_id: Any, line: str) -> None:
+        """Print line as project idx's whole output (filtered skips)."""
+        self._run(idx, obj_id, print, (line,))
+
+    def pass_over(self, idx: int, obj_id: Any) -> None:
+        """Another --shard's project: no output, but the cursor and the output order move past it."""
+        self._run(idx, obj_id, lambda: None, ())
+
+    def _run(self, idx: int, obj_id: Any, fn: Callable[..., Any], fn_args: Tuple[Any, ...]) -> None:
+        if self._out:
+            self._out.bind(idx)
+        try:
+            self.results[idx] = fn(*fn_args)
+        except BaseException as e:
+            if not self._pool:
+                raise
+            self._error = self._error or e
+        finally:
+            if self._out:
+                self._out.bind(None)
+                self._out.finish(idx)
+            if self._cursor:
+                self._cursor.done(idx, obj_id)
+
+    def _pooled(self, idx: int, obj_id: Any, fn: Callable[..., Any], fn_args: Tuple[Any, ...]) -> None:
+        try:
+            self._run(idx, obj_id, fn, fn_args)
+        finally:
+            self._room.release()
+
+
+def print_http_stats() -> None:
+    rs = awx_http.retry_stats()
+    print(f"  HTTP retries: {rs['retries']} (waited {rs['wait_s']}s, creates recovered {rs['recovered_creates']})")
+    cs = awx_http.cache_stats()
+    if cs:
+        print(f"  AWX cache: {cs['fresh']} fresh, {cs['revalidated']} revalidated (304), {cs['miss']} fetched")
+    for host, st in awx_http.stats().items():
+        print(f"  HTTP {host}: {st['requests']} request(s) over {st['connections']} connection(s), "
+              f"window {st.get('window', '-')}, throttled {st.get('throttles', 0)}x")
+
+
+def print_http_event(event: str, **fields: Any) -> None:
+    """Limiter events as one console line each, so the AWX job output shows why a run slowed down."""
+    detail = " ".join(f"{k}={v}" for k, v in fields.items())
+    print(f"  [{event}] {detail}", file=sys.stderr if event == "http.throttle" else sys.stdout)
+
+
 def run_single(args) -> int:
     aap_ping(args.aap_host, args.aap_token, args.verify_tls)
     assert_org_exists(args.aap_host, args.aap_token, args.organization_id, args.verify_tls)
@@ -255,20 +539,66 @@ def run_single(args) -> int:
     awx_proj = get_awx_project(args.awx_host, args.awx_token, args.project_id, args.verify_tls)
     name = awx_proj.get('name', f"project-{args.project_id}")
 
-    existing = find_aap_project(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
+    existing = ledger_project(args, args.awx_host, args.project_id)
+    via = ", ledger" if existing else ""
+    if not existing:
+        existing = find_aap_project(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
     if existing:
-        print(f"SKIP (exists): {name} -> AAP id {existing.get('id')}")
-        return 0
-
-    payload = clean_project_for_aap(awx_proj, args.organization_id)
-    if args.dry_run:
-        print(f"DRY-RUN (create): {name}")
-        return 0
-    created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
-    print(f"CREATED: {name} -> AAP id {created.get('id')}")
+        print(f"SKIP (exists{via}): {name} -> AAP id {existing.get('id')}")
+        ledger_record(args, args.awx_host, args.project_id, existing)
+    else:
+        payload = clean_project_for_aap(awx_proj, args.organization_id)
+        if args.dry_run:
+            print(f"DRY-RUN (create): {name}")
+            return 0
+        created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
+        print(f"CREATED: {name} -> AAP id {created.get('id')}")
+        ledger_record(args, args.awx_host, args.project_id, created)
+    print_ledger_summary(args)
     return 0
 
 
+def ensure_project(args, awx_proj: Dict[str, Any], name: str,
+                   tag: str = "") -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Ledger, then name lookup, else create one ATST project in AAP. Returns
+    ("exists" or "migrated", AAP project; None for a dry-run create). Console
+    lines start with tag, e.g. "[12] ".
+    """
+    with name_lock(name):
+        existing = ledger_project(args, args.awx_host, awx_proj.get('id'))
+        via = ", ledger" if existing else ""
+        if not existing:
+            existing = find_aap_project(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
+        if existing:
+            print(f"{tag}SKIP (exists{via}): {name} -> AAP id {existing.get('id')}")
+            ledger_record(args, args.awx_host, awx_proj.get('id'), existing)
+            return "exists", existing
+        payload = clean_project_for_aap(awx_proj, args.organization_id)
+        if args.dry_run:
+            print(f"{tag}DRY-RUN (create): {name}")
+            return "migrated", None
+        created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
+        print(f"{tag}CREATED: {name} -> AAP id {created.get('id')}")
+        ledger_record(args, args.awx_host, awx_proj.get('id'), created)
+        return "migrated", created
+
+
+def migrate_project(args, idx: int, awx_proj: Dict[str, Any], name: str) -> str:
+    """Bulk mode steps for one ATST project; returns "exists", "migrated" or "failed"."""
+    done = journaled("projects", awx_proj.get('id'))
+    if done:
+        print(f"[{idx}] SKIP (journal): {name} -> AAP id {done.get('aap_id')}")
+        return done["outcome"]
+    try:
+        outcome, aap_obj = ensure_project(args, awx_proj, name, f"[{idx}] ")
+        journal(args, "projects", awx_proj.get('id'), outcome=outcome, aap_id=(aap_obj or {}).get('id'))
+        return outcome
+    except Exception as e:
+        print(f"[{idx}] ERROR: {name}: {e}", file=sys.stderr)
+        return "failed"
+
+
 def run_bulk_atst(args) -> int:
     aap_ping(args.aap_host, args.aap_token, args.verify_tls)
     assert_org_exists(args.aap_host, args.aap_token, args.organization_id, args.verify_tls)
@@ -276,44 +606,104 @@ def run_bulk_atst(args) -> int:
     include_re: Optional[Pattern[str]] = re.compile(args.include) if args.include else None
     exclude_re: Optional[Pattern[str]] = re.compile(args.exclude) if args.exclude else None
 
-    migrated = skipped_existing = skipped_filtered = failures = processed = 0
-    for idx, awx_proj in enumerate(paged_awx_projects(args.awx_host, args.awx_token, args.verify_tls), start=1):
-        name = awx_proj.get('name', f'project-{awx_proj.get("id","?")}')
-        processed += 1
-        if not should_migrate(name, include_re, exclude_re):
-            print(f"[{idx}] SKIP (filtered): {name}")
-            skipped_filtered += 1
+    if args.aap_catalog:
+        global _catalog
+        _catalog = aap_catalog.Catalog(args.aap_host, args.aap_token, args.verify_tls, args.organization_id,
+                                       ("projects",))
+        print(f"AAP projects in org {args.organization_id}: {_catalog.load()['projects']} (preloaded)")
+
+    skipped_filtered = processed = 0
+    limited = False
+    with ProjectPool(args.workers, args.cursor_file) as pool:
+        for idx, awx_proj in enumerate(project_stream(args, args.awx_host, args.awx_token), start=1):
+            name = awx_proj.get('name', f'project-{awx_proj.get("id","?")}')
+            processed += 1
+            # Other shards' projects still count toward --limit, so every shard stops at the same place.
+            owned = awx_shards.in_shard(awx_proj.get('id'), args.shard)
+            if not should_migrate(name, include_re, exclude_re):
+                if owned:
+                    pool.note(idx, awx_proj.get('id'), f"[{idx}] SKIP (filtered): {name}")
+                    skipped_filtered += 1
+                else:
+                    pool.pass_over(idx, awx_proj.get('id'))
+                if args.limit and processed >= args.limit:
+                    break
+                continue
+            if owned:
+                pool.submit(idx, awx_proj.get('id'), migrate_project, args, idx, awx_proj, name)
+            else:
+                pool.pass_over(idx, awx_proj.get('id'))
             if args.limit and processed >= args.limit:
+                limited = True
                 break
-            continue
-        try:
-            existing = find_aap_project(args.aap_host, args.aap_token, name, args.organization_id, args.verify_tls)
-            if existing:
-                print(f"[{idx}] SKIP (exists): {name} -> AAP id {existing.get('id')}")
-                skipped_existing += 1
-            else:
-                payload = clean_project_for_aap(awx_proj, args.organization_id)
-                if args.dry_run:
-                    print(f"[{idx}] DRY-RUN (create): {name}")
-                else:
-                    created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
-                    print(f"[{idx}] CREATED: {name} -> AAP id {created.get('id')}")
-                migrated += 1
-        except Exception as e:
-            failures += 1
-            print(f"[{idx}] ERROR: {name}: {e}", file=sys.stderr)
-        if args.limit and processed >= args.limit:
-            print(f"Limit {args.limit} reached, stopping.")
-            break
+    if limited:
+        print(f"Limit {args.limit} reached, stopping.")
+
+    outcomes = list(pool.results.values())
+    migrated, skipped_existing, failures = (outcomes.count(o) for o in ("migrated", "exists", "failed"))
 
     print("\nSummary:")
     print(f"  Migrated (or would migrate in dry-run): {migrated}")
     print(f"  Skipped existing:                      {skipped_existing}")
     print(f"  Skipped by include/exclude filters:    {skipped_filtered}")
     print(f"  Failures:                              {failures}")
+    print_ledger_summary(args)
+    print_journal_summary()
+    print_http_stats()
     return 0 if failures == 0 else 2
 
 
+def compare_prod_project(args, idx: int, p: Dict[str, Any], name: str,
+                         atst_map: Dict[Tuple[str, str], Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    PROD mode steps for one project; returns (outcome, receipt line) with
+    outcome "already", "match", "migrated" or "failed". Projects a --resume
+    journal already holds are replayed from it, receipt line included.
+    """
+    done = journaled("prod_projects", p.get('id'))
+    if done:
+        print(f"[{idx}] SKIP (journal): {done['line']}")
+        return done["outcome"], done["line"]
+    outcome, line = _compare_prod_project(args, idx, p, name, atst_map)
+    if outcome != "failed":
+        journal(args, "prod_projects", p.get('id'), outcome=outcome, line=line)
+    return outcome, line
+
+
+def _compare_prod_project(args, idx: int, p: Dict[str, Any], name: str,
+                          atst_map: Dict[Tuple[str, str], Dict[str, Any]]) -> Tuple[str, str]:
+    key = project_key(p)
+    pretty = printable_key(key)
+    atst_match = atst_map.get(key)
+
+    mapped = None if atst_match else ledger_project(args, args.prod_awx_host, p.get('id'))
+    if mapped:
+        line = f"EXISTS: AAP id={mapped.get('id')}, name='{mapped.get('name')}', from PROD='{name}', key={pretty}"
+        print(f"[{idx}] SKIP (ledger): {line}")
+        return "already", line
+    if atst_match:
+        atst_name = atst_match.get('name', f'project-{atst_match.get("id","?")}')
+        line = f"MATCH: ATST name='{atst_name}', PROD name='{name}', key={pretty}"
+        print(f"[{idx}] {line}")
+        return "match", line
+
+    payload = clean_project_for_aap(p, args.organization_id)
+    payload['name'] = f"{args.prod_prefix}{payload['name']}"
+    try:
+        if args.dry_run:
+            print(f"[{idx}] DRY-RUN (create): {payload['name']} from PROD '{name}' key={pretty}")
+            return "migrated", f"DRYRUN-CREATE: name='{payload['name']}', from PROD='{name}', key={pretty}"
+        with name_lock(payload['name']):
+            created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
+        print(f"[{idx}] CREATED: {payload['name']} -> AAP id {created.get('id')} (from PROD '{name}')")
+        ledger_record(args, args.prod_awx_host, p.get('id'), created)
+        return "migrated", f"CREATED: AAP id={created.get('id')}, name='{payload['name']}', from PROD='{name}', key={pretty}"
+    except Exception as e:
+        msg = f"ERROR creating from PROD '{name}' key={pretty}: {e}"
+        print(f"[{idx}] {msg}", file=sys.stderr)
+        return "failed", msg
+
+
 def run_prod_compare(args) -> int:
     aap_ping(args.aap_host, args.aap_token, args.verify_tls)
     assert_org_exists(args.aap_host, args.aap_token, args.organization_id, args.verify_tls)
@@ -330,69 +720,58 @@ def run_prod_compare(args) -> int:
         atst_map = load_projects_map_live(args.awx_host, args.awx_token, args.verify_tls)
     print(f"ATST projects indexed: {len(atst_map)}")
 
-    # Load PROD projects live (we’re running on prod_server with access)
+    # Load PROD projects live (we’re running on prod_server with access).
+    # With --pipeline-depth the listing streams in while projects are written.
     print("Loading PROD projects via API...")
-    prod_list: List[Dict[str, Any]] = list(paged_awx_projects(args.prod_awx_host, args.prod_awx_token, args.verify_tls))
-    print(f"PROD projects discovered: {len(prod_list)}")
-
-    receipt: List[str] = []
-    migrated = matches = filtered = failures = processed = 0
-
-    for idx, p in enumerate(prod_list, start=1):
-        name = p.get('name', f'project-{p.get("id","?")}')
-        if not should_migrate(name, include_re, exclude_re):
-            filtered += 1
-            print(f"[{idx}] SKIP (filtered): {name}")
-            continue
-
-        processed += 1
-        key = project_key(p)
-        pretty = printable_key(key)
-        atst_match = atst_map.get(key)
-
-        if atst_match:
-            matches += 1
-            atst_name = atst_match.get('name', f'project-{atst_match.get("id","?")}')
-            line = f"MATCH: ATST name='{atst_name}', PROD name='{name}', key={pretty}"
-            print(f"[{idx}] {line}")
-            receipt.append(line)
-        else:
-            payload = clean_project_for_aap(p, args.organization_id)
-            payload['name'] = f"{args.prod_prefix}{payload['name']}"
-            try:
-                if args.dry_run:
-                    print(f"[{idx}] DRY-RUN (create): {payload['name']} from PROD '{name}' key={pretty}")
-                    line = f"DRYRUN-CREATE: name='{payload['name']}', from PROD='{name}', key={pretty}"
+    prod_list: Iterable[Dict[str, Any]] = project_stream(args, args.prod_awx_host, args.prod_awx_token)
+    if not args.pipeline_depth:
+        prod_list = list(prod_list)
+        print(f"PROD projects discovered: {len(prod_list)}")
+    filtered = processed = walked = 0
+    limited = False
+    with ProjectPool(args.workers, args.cursor_file) as pool:
+        for idx, p in enumerate(prod_list, start=1):
+            walked = idx
+            name = p.get('name', f'project-{p.get("id","?")}')
+            owned = awx_shards.in_shard(p.get('id'), args.shard)
+            if not should_migrate(name, include_re, exclude_re):
+                if owned:
+                    filtered += 1
+                    pool.note(idx, p.get('id'), f"[{idx}] SKIP (filtered): {name}")
                 else:
-                    created = create_aap_project(args.aap_host, args.aap_token, payload, args.verify_tls)
-                    print(f"[{idx}] CREATED: {payload['name']} -> AAP id {created.get('id')} (from PROD '{name}')")
-                    line = f"CREATED: AAP id={created.get('id')}, name='{payload['name']}', from PROD='{name}', key={pretty}"
-                receipt.append(line)
-                migrated += 1
-            except Exception as e:
-                failures += 1
-                msg = f"ERROR creating from PROD '{name}' key={pretty}: {e}"
-                print(f"[{idx}] {msg}", file=sys.stderr)
-                receipt.append(msg)
-
-        if args.limit and processed >= args.limit:
-            print(f"Limit {args.limit} reached, stopping.")
-            break
-
-    # Write receipt
+                    pool.pass_over(idx, p.get('id'))
+                continue
+
+            processed += 1
+            if owned:
+                pool.submit(idx, p.get('id'), compare_prod_project, args, idx, p, name, atst_map)
+            else:
+                pool.pass_over(idx, p.get('id'))
+            if args.limit and processed >= args.limit:
+                limited = True
+                break
+    if args.pipeline_depth:
+        print(f"PROD projects walked: {walked}")
+    if limited:
+        print(f"Limit {args.limit} reached, stopping.")
+
+    # Receipt lines in PROD listing order, whichever worker finished first.
+    results = [(i, pool.results[i]) for i in sorted(pool.results) if pool.results[i] is not None]
+    receipt: List[Tuple[int, str]] = [(i, line) for i, (_, line) in results]
+    outcomes = [outcome for _, (outcome, _) in results]
+    matches, already, migrated, failures = (outcomes.count(o) for o in ("match", "already", "migrated", "failed"))
+    counts = {"matches": matches, "already": already, "migrated": migrated, "filtered": filtered,
+              "failures": failures}
+
+    # Write receipt (a shard writes its part; awx_shards.py receipts joins them)
+    src = args.atst_index_file or (args.awx_host or "ATST(API)")
+    header = [f"ATST: {src}", f"PROD: {args.prod_awx_host}", f"AAP:  {args.aap_host}",
+              f"OrgID: {args.organization_id}", f"DryRun: {args.dry_run}", f"Prefix: {args.prod_prefix}"]
     try:
-        with open(args.receipt_out, "w", encoding="utf-8") as f:
-            f.write("== PROJECT MIGRATION RECEIPT ==\n")
-            src = args.atst_index_file or (args.awx_host or "ATST(API)")
-            f.write(f"ATST: {src}\nPROD: {args.prod_awx_host}\nAAP:  {args.aap_host}\n")
-            f.write(f"OrgID: {args.organization_id}\nDryRun: {args.dry_run}\nPrefix: {args.prod_prefix}\n\n")
-            for line in receipt:
-                f.write(line + "\n")
-            f.write("\nSummary:\n")
-            f.write(f"  Matches (skipped): {matches}\n")
-            f.write(f"  Migrated:          {migrated}\n")
-            f.write(f"  Filtered:          {filtered}\n")
-            f.write(f"  Failures:          {failures}\n")
+        if args.shard:
+            awx_shards.write_partial_receipt(args.receipt_out, args.shard, header, receipt, counts)
+        else:
+            awx_shards.write_receipt(args.receipt_out, header, [line for _, line in receipt], counts)
         print(f"\nReceipt written to: {args.receipt_out}")
     except Exception as e:
         print(f"WARNING: failed to write receipt to {args.receipt_out}: {e}", file=sys.stderr)
@@ -402,26 +781,64 @@ def run_prod_compare(args) -> int:
     print(f"  Migrated (or would migrate in dry-run): {migrated}")
     print(f"  Filtered by include/exclude:            {filtered}")
     print(f"  Failures:                               {failures}")
+    print(f"  Already migrated (ledger):              {already}")
+    print_ledger_summary(args)
+    print_journal_summary()
+    print_http_stats()
     return 0 if failures == 0 else 2
 
 
 def main() -> int:
     args = parse_args()
+    awx_http.configure(pool_size=args.http_pool_size, latency_target=args.latency_target_ms / 1000.0,
+                       page_window=args.page_prefetch, scan_mode=args.scan, scan_ranges=args.scan_ranges)
+    awx_http.set_event_hook(print_http_event)
     args.aap_host = norm_host(args.aap_host)
+    awx_http.set_host_budget(args.aap_host, args.aap_max_inflight)
     if args.awx_host:
         args.awx_host = norm_host(args.awx_host)
+        awx_http.set_host_budget(args.awx_host, args.awx_max_inflight)
     if args.prod_awx_host:
         args.prod_awx_host = norm_host(args.prod_awx_host)
-
+        awx_http.set_host_budget(args.prod_awx_host, args.awx_max_inflight)
+    if args.http_cache:
+        awx_http.set_cache(awx_cache.HttpCache(args.http_cache, args.cache_ttl, args.cache_max_mb * 1024 * 1024),
+                           [args.awx_host, args.prod_awx_host])
+    for path in args.source_snapshot:
+        snap = awx_snapshot.Snapshot(path)
+        if snap.source not in (args.awx_host, args.prod_awx_host):
+            raise SystemExit(f"Snapshot {path} was taken from {snap.source or '?'}, which is neither --awx-host "
+                             f"nor --prod-awx-host")
+        _snapshots[snap.source] = snap
+        print(f"Reading {snap.source} from snapshot {path} (taken {snap.meta('finished_at')})")
+
+    if args.export_awx_index and args.refresh_index:
+        how = refresh_atst_index(args.awx_host, args.awx_token, args.verify_tls, args.export_awx_index,
+                                 args.compact_index)
+        print(f"Refreshed ATST index ({how}) -> {args.export_awx_index}")
+        return 0
     if args.export_awx_index:
-        export_atst_index(args.awx_host, args.awx_token, args.verify_tls, args.export_awx_index)
+        export_atst_index(args.awx_host, args.awx_token, args.verify_tls, args.export_awx_index, args.compact_index)
         print(f"Exported ATST index -> {args.export_awx_index}")
         return 0
 
+    if args.ledger:
+        global _ledger
+        _ledger = awx_ledger.Ledger(args.ledger)
+    if args.journal or args.resume:
+        global _journal
+        _journal = awx_journal.Journal(args.resume or args.journal, args.aap_host,
+                                       [args.prod_awx_host if args.prod_mode else args.awx_host],
+                                       resume=bool(args.resume))
+        if args.resume:
+            print(f"Resuming from journal {args.resume} ({_journal.counts['loaded']} project(s) recorded)")
+
     if args.prod_mode:
         return run_prod_compare(args)
 
     if args.project_id:
+        if args.shard:
+            raise SystemExit("--shard applies to --all and PROD runs only")
         return run_single(args)
     return run_bulk_atst(args)
 
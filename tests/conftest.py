@@ -0,0 +1,52 @@
+"""The scripts in files/ import their sibling modules directly, as the playbooks run them."""
+import json
+import os
+import sys
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files"))
+
+import awx_http  # noqa: E402
+
+
+class Reply:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.text = body if isinstance(body, str) else json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeHTTP:
+    """
+    Stands in for awx_http.request, the one place every read and write goes
+    through. route(method, url, payload) returns (status, body) or
+    (status, body, headers), or raises awx_http.TransientHTTPError to act
+    like a dropped connection. Every call is kept in .calls and its
+    headers in .headers; retries do not sleep.
+    """
+
+    def __init__(self, monkeypatch, route):
+        self.route = route
+        self.calls = []
+        self.headers = []
+        monkeypatch.setattr(awx_http, "request", self.request)
+        monkeypatch.setattr(awx_http.time, "sleep", lambda s: None)
+
+    def request(self, method, url, hdrs, verify, payload=None):
+        self.calls.append((method, url, payload))
+        self.headers.append(dict(hdrs))
+        return Reply(*self.route(method, url, payload))
+
+    def paths(self, method=None):
+        u = [urlsplit(url) for m, url, _ in self.calls if method in (None, m)]
+        return [p.path + ("?" + p.query if p.query else "") for p in u]
+
+
+@pytest.fixture
+def fake_http(monkeypatch):
+    return lambda route: FakeHTTP(monkeypatch, route)
@@ -0,0 +1,134 @@
+"""
+In-memory AWX API for the snapshot and index tests, served through the
+fake awx_http.request layer (conftest.FakeHTTP). It knows the list filters
+the crawlers use: page/page_size, id__in, id__gt/id__lte, order_by,
+modified__gt, <rel>__modified__gt, notification_templates_<kind> and the
+activity stream. Objects are stamped with `modified` from a clock that
+starts a day in the past, so what the tests change afterwards is newer
+than any crawl's start time.
+"""
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+KINDS = ("projects", "job_templates", "credentials", "notification_templates", "schedules", "inventories")
+NOTIF_KINDS = ("started", "success", "error")
+
+
+class FakeAWX:
+    host = "https://awx.example.com"
+
+    def __init__(self):
+        self.db = {kind: {} for kind in KINDS}
+        self.surveys = {}
+        self.jt_creds = {}
+        self.jt_notifs = {}
+        self.activity = []
+        self.clock = datetime.now(timezone.utc) - timedelta(days=1)
+
+    # ---- changing AWX ----
+    def tick(self):
+        self.clock += timedelta(milliseconds=1)
+        return self.clock.isoformat()
+
+    def now(self):
+        """Later edits happen after the crawl that preceded them started."""
+        self.clock = max(self.clock, datetime.now(timezone.utc))
+
+    def put(self, endpoint, oid, **fields):
+        obj = dict(self.db[endpoint].get(oid, {"id": oid}), **fields)
+        obj["modified"] = self.tick()
+        self.db[endpoint][oid] = obj
+        return obj
+
+    def delete(self, kind, oid):
+        del self.db[kind][oid]
+
+    def attach(self, jt_id, kind, nt_id):
+        """Attach a notification template: the JT's modified does not move, the activity stream records it."""
+        self.jt_notifs.setdefault(jt_id, {k: [] for k in NOTIF_KINDS})[kind].append(nt_id)
+        self._associated(jt_id)
+
+    def add_credential(self, jt_id, cred_id):
+        self.jt_creds.setdefault(jt_id, []).append(cred_id)
+        self._associated(jt_id)
+
+    def _associated(self, jt_id):
+        self.activity.append({"timestamp": self.tick(), "operation": "associate",
+                              "summary_fields": {"job_template": [{"id": jt_id}]}})
+
+    # ---- rendering ----
+    def render(self, kind, obj):
+        if kind != "job_templates":
+            return dict(obj)
+        out = dict(obj)
+        proj = self.db["projects"].get(obj.get("project"), {})
+        creds = [{"id": c, "name": self.db["credentials"][c]["name"]}
+                 for c in self.jt_creds.get(obj["id"], []) if c in self.db["credentials"]]
+        out["summary_fields"] = {
+            "project": {"id": proj.get("id"), "name": proj.get("name")},
+            # long lists come back truncated, like AWX's summary_fields
+            "credentials": creds if len(creds) <= 2 else {"count": len(creds), "results": creds[:2]},
+        }
+        return out
+
+    def _related_modified(self, obj, rel):
+        if rel == "credentials":
+            return [self.db["credentials"][c]["modified"] for c in self.jt_creds.get(obj["id"], [])
+                    if c in self.db["credentials"]]
+        target = self.db["projects" if rel == "project" else "inventories"].get(obj.get(rel))
+        return [target["modified"]] if target else []
+
+    def _matches(self, kind, obj, q):
+        for key, val in q.items():
+            if key in ("page", "page_size", "order_by"):
+                continue
+            if key == "id__in" and obj["id"] not in {int(x) for x in val.split(",")}:
+                return False
+            if key == "id__gt" and not obj["id"] > int(val):
+                return False
+            if key == "id__lte" and not obj["id"] <= int(val):
+                return False
+            if key == "modified__gt" and not obj["modified"] > val:
+                return False
+            if key.endswith("__modified__gt") and not any(m > val for m in
+                                                          self._related_modified(obj, key.split("__")[0])):
+                return False
+            if key.startswith("notification_templates_"):
+                attached = self.jt_notifs.get(obj["id"], {}).get(key[len("notification_templates_"):], [])
+                if int(val) not in attached:
+                    return False
+        return True
+
+    def _page(self, path, q, rows):
+        size = int(q.get("page_size", 25))
+        page = int(q.get("page", 1))
+        more = page * size < len(rows)
+        return {"count": len(rows), "results": rows[(page - 1) * size:page * size],
+                "next": f"{path}?{urlencode(dict(q, page=page + 1))}" if more else None}
+
+    def route(self, method, url, payload):
+        assert method == "GET", f"the crawl only reads: {method} {url}"
+        u = urlsplit(url)
+        q = dict(parse_qsl(u.query))
+        parts = u.path.strip("/").split("/")[2:]  # after api/v2
+        kind = parts[0]
+        if kind == "activity_stream":
+            rows = [e for e in self.activity if e["timestamp"] > q.get("timestamp__gt", "")]
+            return 200, self._page(u.path, q, rows)
+        if len(parts) == 1:
+            rows = [self.render(kind, o) for _, o in sorted(self.db[kind].items())
+                    if self._matches(kind, o, q)]
+            if q.get("order_by") == "-id":
+                rows.reverse()
+            return 200, self._page(u.path, q, rows)
+        oid = int(parts[1])
+        if oid not in self.db[kind]:
+            return 404, {"detail": "Not found."}
+        if len(parts) == 2:
+            return 200, self.render(kind, self.db[kind][oid])
+        if parts[2] == "survey_spec":
+            return 200, self.surveys.get(oid, {})
+        if parts[2] == "credentials":
+            rows = [self.db["credentials"][c] for c in self.jt_creds.get(oid, []) if c in self.db["credentials"]]
+            return 200, self._page(u.path, q, rows)
+        raise AssertionError(f"unexpected GET {url}")
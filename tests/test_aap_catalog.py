@@ -0,0 +1,60 @@
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+import aap_catalog
+
+AAP = {
+    "projects": [{"id": 1, "name": "p", "organization": 1}, {"id": 2, "name": "p", "organization": 2},
+                 {"id": 3, "name": "q", "organization": 1}],
+    "credentials": [{"id": 5, "name": "c", "organization": 1, "credential_type": 1},
+                    {"id": 6, "name": "c", "organization": 1, "credential_type": 3}],
+    "execution_environments": [{"id": 7, "name": "ee", "organization": None}],
+}
+
+
+@pytest.fixture
+def catalog(fake_http):
+    def route(method, url, payload):
+        u = urlsplit(url)
+        q = dict(parse_qsl(u.query))
+        rows = [o for o in AAP[u.path.split("/")[-2]]
+                if "organization" not in q or o["organization"] == int(q["organization"])]
+        return 200, {"count": len(rows), "results": rows, "next": None}
+    http = fake_http(route)
+    cat = aap_catalog.Catalog("https://aap", "t", True, 1, kinds=("projects", "credentials", "execution_environments"))
+    assert cat.load() == {"projects": 2, "credentials": 2, "execution_environments": 1}
+    assert len(http.calls) == 3
+    return cat
+
+
+def test_find_is_scoped_to_the_org(catalog):
+    assert catalog.find("projects", "p")["id"] == 1
+    assert catalog.find("projects", "missing") is None
+    assert catalog.find("execution_environments", "ee")["id"] == 7  # global kinds ignore the org
+
+
+def test_find_by_credential_type(catalog):
+    assert [c["id"] for c in catalog.find_all("credentials", "c")] == [5, 6]
+    assert catalog.find("credentials", "c", credential_type=3)["id"] == 6
+    assert catalog.find("credentials", "c", credential_type=9) is None
+
+
+def test_add_indexes_created_and_renamed_objects(catalog):
+    catalog.add("projects", {"id": 10, "name": "new", "organization": 1})
+    assert catalog.find("projects", "new")["id"] == 10
+    catalog.add("projects", {"id": 3, "name": "p", "organization": 1})  # 3 renamed from q to p
+    assert catalog.find("projects", "q") is None
+    assert [o["id"] for o in catalog.find_all("projects", "p")] == [1, 3]
+    catalog.add("projects", {"id": 1, "name": "old", "organization": 1})
+    assert catalog.find("projects", "p")["id"] == 3
+    catalog.add("projects", {"id": 1, "name": "p", "organization": 1})
+    assert [o["id"] for o in catalog.find_all("projects", "p")] == [1, 3]  # still id order
+    assert catalog.get("projects", 1)["name"] == "p"
+
+
+def test_uncovered_kinds(catalog):
+    assert not catalog.covers("job_templates")
+    catalog.add("job_templates", {"id": 1, "name": "jt"})  # ignored
+    with pytest.raises(ValueError):
+        aap_catalog.Catalog("https://aap", "t", True, 1, kinds=("users",))
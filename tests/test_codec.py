@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import awx_codec
+
+DOC = {"name": "Übersicht – prod", "ids": [1, 2, 3], "nested": {"ok": True, "none": None, "f": 1.5}}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(awx_codec, "orjson", None)
+    return request.param
+
+
+def test_dumps_matches_stdlib_layout(backend):
+    assert awx_codec.dumps(DOC) == json.dumps(DOC, separators=(",", ":"), ensure_ascii=False)
+    assert awx_codec.dumps(DOC, compact=False) == json.dumps(DOC, indent=2, ensure_ascii=False)
+    assert awx_codec.loads(awx_codec.dumps(DOC)) == DOC
+
+
+def test_values_orjson_refuses_fall_back(backend):
+    big = {"n": 2 ** 70}
+    assert awx_codec.loads(awx_codec.dumps(big)) == big
+
+
+def test_files_are_identical_across_backends(tmp_path, monkeypatch):
+    pytest.importorskip("orjson")
+    for compact in (False, True):
+        fast, slow = tmp_path / f"fast{compact}.json", tmp_path / f"slow{compact}.json"
+        awx_codec.dump_file(DOC, str(fast), compact=compact)
+        with monkeypatch.context() as m:
+            m.setattr(awx_codec, "orjson", None)
+            awx_codec.dump_file(DOC, str(slow), compact=compact)
+        assert fast.read_bytes() == slow.read_bytes()
+        assert awx_codec.load_file(str(slow)) == DOC
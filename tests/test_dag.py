@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+import migrate_dag
+
+
+def boom(*_):
+    raise RuntimeError("boom")
+
+
+def recorder():
+    """Node bodies that log their calls and return their key (or fn of their deps' results)."""
+    calls = []
+
+    def node(key, fn=None):
+        def run(*deps):
+            calls.append((key, deps))
+            return fn(*deps) if fn else key
+        return run
+
+    return calls, node
+
+
+def test_results_flow_to_dependents_in_listed_order(capsys):
+    calls, node = recorder()
+    dag = migrate_dag.Dag()
+    dag.add("a", "project", "A", node("a"))
+    dag.add("e", "project", "E", node("e"))
+    dag.add("b", "job_template", "B", node("b", lambda a, e: a + e), deps=("a", "e"))
+    dag.run(workers=4)
+    assert dag.nodes["b"].result == "ae"
+    assert ("b", ("a", "e")) in calls
+    assert dag.counts() == {"project": {"ok": 2, "failed": 0, "blocked": 0},
+                            "job_template": {"ok": 1, "failed": 0, "blocked": 0}}
+
+
+def test_failure_blocks_all_dependents_transitively(capsys):
+    calls, node = recorder()
+    dag = migrate_dag.Dag()
+    dag.add("a", "project", "A", node("a", boom))
+    dag.add("b", "job_template", "B", node("b"), deps=("a",))
+    dag.add("c", "job_template", "C", node("c"), deps=("a",))
+    dag.add("d", "survey", "D", node("d"), deps=("b",))
+    dag.add("e", "project", "E", node("e"))
+    dag.run(workers=2)
+    assert {k: n.status for k, n in dag.nodes.items()} == {
+        "a": "failed", "b": "blocked", "c": "blocked", "d": "blocked", "e": "ok"}
+    assert sorted(k for k, _ in calls) == ["a", "e"]
+    out = capsys.readouterr()
+    assert "[a] ERROR: A: boom" in out.err
+    assert "[b] BLOCKED: B: a failed" in out.out
+    assert "[d] BLOCKED: D: b blocked" in out.out
+
+
+def test_dependency_must_exist():
+    dag = migrate_dag.Dag()
+    with pytest.raises(ValueError):
+        dag.add("b", "job_template", "B", lambda: None, deps=("a",))
+
+
+def test_base_exception_in_node_is_reraised_without_hanging(capsys):
+    def interrupt(*_):
+        raise KeyboardInterrupt
+
+    dag = migrate_dag.Dag()
+    dag.add("a", "project", "A", interrupt)
+    dag.add("b", "job_template", "B", lambda a: a, deps=("a",))
+    dag.add("c", "project", "C", lambda: "c")
+    done = []
+
+    def run():
+        try:
+            dag.run(workers=2)
+        except KeyboardInterrupt:
+            done.append("interrupted")
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(timeout=10)
+    assert done == ["interrupted"]
+    assert dag.nodes["a"].status == "failed"
+    assert dag.nodes["b"].status == "blocked"
+
+
+def test_build_preloads_schedules_only_for_included_templates(monkeypatch):
+    import argparse
+    import re
+    from urllib.parse import parse_qs, urlsplit
+
+    mjt = migrate_dag.mjt
+    jts = [{"id": i, "name": name, "summary_fields": {"credentials": []}}
+           for i, name in ((1, "keep-a"), (2, "other"), (3, "keep-drop"), (4, "keep-b"))]
+    asked = []
+
+    def iter_pages(url, hdrs, verify, window=None):
+        ids = [int(x) for x in parse_qs(urlsplit(url).query)["unified_job_template__in"][0].split(",")]
+        asked.append(ids)
+        return [{"id": i * 10, "unified_job_template": i, "name": f"s{i}", "rrule": "", "extra_data": {}}
+                for i in ids]
+
+    monkeypatch.setattr(mjt, "awx_jts", lambda *a: iter(jts))
+    monkeypatch.setattr(mjt.awx_http, "iter_pages", iter_pages)
+    args = argparse.Namespace(awx_host="https://awx", awx_token="t", verify_tls=True, resume_after_id=0,
+                              with_schedules=True, with_notifications=False, schedules_only=False,
+                              probe_all_surveys=False, schedule_stats="", aap_host="https://aap",
+                              verify_surveys=False, shard=None, force_machine_cred_id=None)
+    ctx = mjt.RunContext(args)
+    dag, filtered = migrate_dag.build(args, ctx, {}, re.compile("^keep"), re.compile("drop"))
+    assert asked == [[1, 4]]
+    assert filtered == 2
+    assert sorted(k for k in dag.nodes if k.endswith(":schedules")) == ["jt:1:schedules", "jt:4:schedules"]
+    assert ctx._schedules == {}
@@ -0,0 +1,69 @@
+import pytest
+
+import awx_cache
+import awx_http
+
+URL = "https://awx/api/v2/projects/?page_size=200"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = awx_cache.HttpCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(awx_http, "_cache", None)
+    monkeypatch.setattr(awx_http, "_cache_hosts", set())
+    awx_http.set_cache(c, ["https://awx"])
+    yield c
+    c.close()
+
+
+class EtagAWX:
+    """An AWX endpoint that answers 304 when If-None-Match carries its current ETag."""
+
+    def __init__(self, fake_http, body):
+        self.etag, self.body = '"v1"', body
+        self.http = fake_http(self.route)
+
+    def route(self, method, url, payload):
+        if self.http.headers[-1].get("If-None-Match") == self.etag:
+            return 304, ""
+        return 200, self.body, {"ETag": self.etag}
+
+
+def test_revalidates_with_etag_and_reuses_body(cache, fake_http):
+    awx = EtagAWX(fake_http, {"results": [1]})
+    http = awx.http
+    assert awx_http.get_json(URL, {"Authorization": "Bearer a"}, True) == {"results": [1]}
+    assert awx_http.get_json(URL, {"Authorization": "Bearer a"}, True) == {"results": [1]}
+    assert http.headers[1]["If-None-Match"] == '"v1"'
+    awx.etag, awx.body = '"v2"', {"results": [1, 2]}
+    assert awx_http.get_json(URL, {"Authorization": "Bearer a"}, True) == {"results": [1, 2]}
+    assert cache.stats()["miss"] == 2 and cache.stats()["revalidated"] == 1
+
+
+def test_fresh_entries_need_no_request(cache, fake_http):
+    cache.ttl = 60
+    http = EtagAWX(fake_http, {"ok": 1}).http
+    for _ in range(3):
+        assert awx_http.get_json(URL, {"Authorization": "Bearer a"}, True) == {"ok": 1}
+    assert len(http.calls) == 1
+    awx_http.get_json(URL, {"Authorization": "Bearer b"}, True)  # another token: another entry
+    assert len(http.calls) == 2
+
+
+def test_only_awx_source_reads_are_cached(cache, fake_http):
+    cache.ttl = 60
+    http = fake_http(lambda method, url, payload: (200, {"ok": 1}))
+    for _ in range(2):
+        awx_http.get_json("https://aap/api/controller/v2/projects/", {}, True)
+    assert len(http.calls) == 2
+
+
+def test_lru_eviction_keeps_cache_under_cap(tmp_path):
+    c = awx_cache.HttpCache(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    for i in range(5):
+        c.put(f"k{i}", f"u{i}", None, None, "x" * 30)
+    assert c.stats()["bytes"] <= 90
+    assert c.get("k0") is None and c.get("k4") is not None
+    c.put("big", "u", None, None, "x" * 101)  # larger than the cap: not stored
+    assert c.get("big") is None
+    c.close()
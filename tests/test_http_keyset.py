@@ -0,0 +1,77 @@
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+import awx_http
+
+URL = "https://awx/api/v2/projects/?page_size=5"
+IDS = [1, 2, 3, 7, 8, 20, 21, 22, 23, 24, 25, 40, 41, 99, 100, 101]
+
+
+def awx_keyset(ids):
+    """An AWX list endpoint honouring order_by=id/-id, id__gt and id__lte."""
+    def route(method, url, payload):
+        q = dict(parse_qsl(urlsplit(url).query))
+        assert "page" not in q
+        hits = sorted(i for i in ids if i > int(q.get("id__gt", 0)) and i <= int(q.get("id__lte", 10 ** 9)))
+        if q.get("order_by") == "-id":
+            hits.reverse()
+        size = int(q.get("page_size", 25))
+        return 200, {"count": len(hits), "results": [{"id": i} for i in hits[:size]],
+                     "next": "/next" if len(hits) > size else None}
+    return route
+
+
+def test_iter_keyset_walks_id_cursor(fake_http):
+    http = fake_http(awx_keyset(IDS))
+    assert [o["id"] for o in awx_http.iter_keyset(URL, {}, True)] == IDS
+    cursors = [int(dict(parse_qsl(urlsplit(url).query))["id__gt"]) for _, url, _ in http.calls]
+    assert cursors == [0, 8, 24, 100]
+
+
+def test_iter_keyset_bounds(fake_http):
+    fake_http(awx_keyset(IDS))
+    assert [o["id"] for o in awx_http.iter_keyset(URL, {}, True, after_id=8, upto_id=40)] == [20, 21, 22, 23, 24, 25, 40]
+
+
+@pytest.mark.parametrize("ranges", [1, 2, 3, 7, 50])
+@pytest.mark.parametrize("after_id", [0, 22, 101])
+def test_iter_keyset_ranges_is_one_ascending_scan(fake_http, ranges, after_id):
+    fake_http(awx_keyset(IDS))
+    got = [o["id"] for o in awx_http.iter_keyset_ranges(URL, {}, True, ranges, after_id)]
+    assert got == [i for i in IDS if i > after_id]
+
+
+def test_iter_keyset_ranges_raises_scanner_errors(fake_http):
+    inner = awx_keyset(IDS)
+
+    def route(method, url, payload):
+        if "id__gt=51" in url:
+            return 400, "bad filter"
+        return inner(method, url, payload)
+    fake_http(route)
+    with pytest.raises(RuntimeError, match="-> 400"):
+        list(awx_http.iter_keyset_ranges(URL, {}, True, 2))
+
+
+def test_scan_cursor_moves_only_past_finished_prefix(tmp_path):
+    path = tmp_path / "cursor"
+    cur = awx_http.ScanCursor(str(path))
+    cur.done(2, 20)
+    assert cur.last_id is None and not path.exists()
+    cur.done(1, 10)
+    assert cur.last_id == 20 and path.read_text() == "20\n"
+    cur.done(4, 40)
+    cur.done(3, 30)
+    assert path.read_text() == "40\n"
+
+
+def test_scan_cursor_track_marks_objects_when_the_next_is_asked_for(tmp_path):
+    cur = awx_http.ScanCursor(str(tmp_path / "cursor"))
+    it = cur.track([{"id": 5}, {"id": 6}])
+    next(it)
+    assert cur.last_id is None  # the loop body for id 5 has not finished yet
+    next(it)
+    assert cur.last_id == 5
+    assert list(it) == []
+    assert cur.last_id == 6
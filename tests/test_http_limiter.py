@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import awx_http
+
+
+@pytest.fixture
+def events(monkeypatch):
+    seen = []
+    monkeypatch.setattr(awx_http, "_event_hook", lambda event, **fields: seen.append((event, fields)))
+    return seen
+
+
+def ok(lim, latency=0.01):
+    lim.acquire()
+    lim.release(latency, 200, None)
+
+
+def test_window_grows_additively_up_to_maximum(events):
+    lim = awx_http.AdaptiveLimiter("aap", maximum=6, target=1.0)
+    assert lim.window == 4
+    for _ in range(4):
+        ok(lim)
+    assert int(lim.window) == 4 and lim.window > 4.9  # +1/window per reply
+    ok(lim)
+    assert int(lim.window) == 5
+    assert events[-1] == ("http.window", {"host": "aap", "window": 5, "p95_ms": None})
+    for _ in range(100):
+        ok(lim)
+    assert lim.window == 6
+
+
+def test_throttle_halves_window_and_honours_retry_after(events, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(awx_http.time, "monotonic", lambda: now[0])
+    lim = awx_http.AdaptiveLimiter("aap", maximum=10, target=1.0)
+    lim.acquire()
+    lim.release(0.01, 429, "7")
+    assert lim.window == 2 and lim.throttles == 1
+    assert events == [("http.throttle", {"host": "aap", "status": 429, "retry_after": 7.0, "window": 2})]
+    assert lim._pause_until == 107.0
+    now[0] = 108.0
+    lim.acquire()
+    lim.release(0.01, None, None)  # transport error: halved again, never below 1
+    lim.acquire()
+    lim.release(0.01, 503, None)
+    assert lim.window == 1 and lim.throttles == 3
+
+
+def test_slow_p95_shrinks_window(events):
+    lim = awx_http.AdaptiveLimiter("aap", maximum=10, target=0.5)
+    for _ in range(9):
+        ok(lim, latency=2.0)  # under 10 samples p95 is unknown: still growing
+    grown = lim.window
+    assert grown > 4
+    ok(lim, latency=2.0)
+    assert lim.window == pytest.approx(grown * 0.9)
+
+
+def test_acquire_blocks_at_window(events):
+    lim = awx_http.AdaptiveLimiter("aap", maximum=1, target=1.0)
+    lim.acquire()
+    got = threading.Event()
+    t = threading.Thread(target=lambda: (lim.acquire(), got.set()))
+    t.start()
+    assert not got.wait(0.1)
+    lim.release(0.01, 200, None)
+    assert got.wait(5)
+    t.join()
+    assert lim.inflight == 1
@@ -0,0 +1,61 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pytest
+
+import awx_http
+
+URL = "https://awx/api/v2/job_templates/?page_size=10"
+
+
+def awx_list(ids, max_page_size=200):
+    """An AWX list endpoint over objects with these ids: ?page=N pages, capped page_size, `next` as a path."""
+    objs = [{"id": i} for i in sorted(ids)]
+
+    def route(method, url, payload):
+        u = urlsplit(url)
+        q = dict(parse_qsl(u.query))
+        size = min(int(q.get("page_size", 25)), max_page_size)
+        page = int(q.get("page", 1))
+        chunk = objs[(page - 1) * size:page * size]
+        more = page * size < len(objs)
+        return 200, {"count": len(objs), "results": chunk,
+                     "next": f"{u.path}?{urlencode(dict(q, page=page + 1))}" if more else None}
+    return route
+
+
+@pytest.mark.parametrize("window", [1, 4])
+@pytest.mark.parametrize("n", [0, 1, 10, 11, 95])
+def test_iter_pages_yields_everything_in_order(fake_http, window, n):
+    http = fake_http(awx_list(range(1, n + 1)))
+    assert [o["id"] for o in awx_http.iter_pages(URL, {}, True, window=window)] == list(range(1, n + 1))
+    assert len(http.calls) == max(1, -(-n // 10))
+
+
+def test_iter_pages_uses_the_page_size_the_server_capped_to(fake_http):
+    http = fake_http(awx_list(range(1, 24), max_page_size=7))
+    assert [o["id"] for o in awx_http.iter_pages(URL, {}, True, window=3)] == list(range(1, 24))
+    pages = sorted(int(dict(parse_qsl(urlsplit(url).query)).get("page", 1)) for _, url, _ in http.calls)
+    assert pages == [1, 2, 3, 4]
+
+
+def test_iter_pages_starts_at_the_given_page(fake_http):
+    http = fake_http(awx_list(range(1, 36)))
+    got = [o["id"] for o in awx_http.iter_pages(URL + "&page=2", {}, True, window=4)]
+    assert got == list(range(11, 36))
+    assert len(http.calls) == 3
+
+
+def test_iter_pages_follows_next_without_count(fake_http):
+    inner = awx_list(range(1, 26))
+
+    def route(method, url, payload):
+        status, body = inner(method, url, payload)
+        body.pop("count")
+        return status, body
+    fake_http(route)
+    assert [o["id"] for o in awx_http.iter_pages(URL, {}, True, window=4)] == list(range(1, 26))
+
+
+def test_with_query_replaces_and_drops_params():
+    assert awx_http.with_query(URL, page=3) == "https://awx/api/v2/job_templates/?page_size=10&page=3"
+    assert awx_http.with_query(URL + "&page=3", page=None) == URL
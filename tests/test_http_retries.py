@@ -0,0 +1,64 @@
+import pytest
+
+import awx_http
+
+URL = "https://aap/api/controller/v2/projects/"
+
+
+@pytest.fixture(autouse=True)
+def no_event_hook(monkeypatch):
+    monkeypatch.setattr(awx_http, "_event_hook", None)
+
+
+def test_create_looks_up_before_retrying(fake_http):
+    """A 502'd create that went through is found by name, not POSTed twice."""
+    http = fake_http(lambda method, url, payload: (502, "bad gateway"))
+    lookups = []
+
+    def lookup():
+        lookups.append(1)
+        return {"id": 9, "name": "p"}
+
+    assert awx_http.create_json(URL, {}, {"name": "p"}, True, lookup) == {"id": 9, "name": "p"}
+    assert [m for m, _, _ in http.calls] == ["POST"]
+    assert lookups == [1]
+
+
+def test_create_retries_when_lookup_finds_nothing(fake_http):
+    replies = iter([(503, "busy", {"Retry-After": "1"}), (201, {"id": 4})])
+    http = fake_http(lambda method, url, payload: next(replies))
+    assert awx_http.create_json(URL, {}, {"name": "p"}, True, lambda: None) == {"id": 4}
+    assert len(http.calls) == 2
+
+
+def test_create_dropped_connection_counts_as_transient(fake_http):
+    def route(method, url, payload):
+        raise awx_http.TransientHTTPError("POST -> ConnectionError")
+    http = fake_http(route)
+    with pytest.raises(awx_http.TransientHTTPError):
+        awx_http.create_json(URL, {}, {"name": "p"}, True, lambda: None)
+    assert len(http.calls) == awx_http.RETRIES + 1
+
+
+def test_create_client_error_is_not_retried(fake_http):
+    http = fake_http(lambda method, url, payload: (400, {"name": ["exists"]}))
+    with pytest.raises(RuntimeError, match="-> 400"):
+        awx_http.create_json(URL, {}, {"name": "p"}, True, lambda: pytest.fail("no lookup on a 400"))
+    assert len(http.calls) == 1
+
+
+def test_get_json_retries_throttles_then_succeeds(fake_http):
+    replies = iter([(429, "slow down"), (504, "timeout"), (200, {"ok": True})])
+    http = fake_http(lambda method, url, payload: next(replies))
+    assert awx_http.get_json("https://awx/api/v2/ping/", {}, True) == {"ok": True}
+    assert len(http.calls) == 3
+
+
+def test_non_idempotent_post_is_sent_once(fake_http):
+    http = fake_http(lambda method, url, payload: (503, "busy"))
+    with pytest.raises(awx_http.TransientHTTPError):
+        awx_http.post_json(URL, {}, {"name": "p"}, True)
+    assert len(http.calls) == 1
+    with pytest.raises(awx_http.TransientHTTPError):
+        awx_http.post_json(URL, {}, {"id": 1}, True, idempotent=True)
+    assert len(http.calls) == 2 + awx_http.RETRIES
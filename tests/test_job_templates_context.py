@@ -0,0 +1,95 @@
+import argparse
+import re
+from urllib.parse import parse_qs, urlsplit
+
+import migrate_job_templates as mjt
+
+
+def make_args(**kw):
+    args = argparse.Namespace(awx_host="https://awx", awx_token="t", verify_tls=True, with_schedules=True,
+                              with_notifications=False, schedules_only=False, schedule_stats="",
+                              aap_host="https://aap", verify_surveys=False, shard=None)
+    vars(args).update(kw)
+    return args
+
+
+def fake_schedules(monkeypatch, n_per_jt=1):
+    asked = []
+
+    def iter_pages(url, hdrs, verify, window=None):
+        ids = [int(x) for x in parse_qs(urlsplit(url).query)["unified_job_template__in"][0].split(",")]
+        asked.append(ids)
+        for i in ids:
+            for k in range(n_per_jt):
+                yield {"id": i * 10 + k, "unified_job_template": i}
+
+    monkeypatch.setattr(mjt.awx_http, "iter_pages", iter_pages)
+    return asked
+
+
+def test_preload_reads_schedules_only_for_included_templates(monkeypatch):
+    asked = fake_schedules(monkeypatch)
+    ctx = mjt.RunContext(make_args())
+    ctx.prepare({}, re.compile("^keep"), re.compile("drop"))
+    jts = [{"id": 1, "name": "keep-a"}, {"id": 2, "name": "other"}, {"id": 3, "name": "keep-drop"},
+           {"id": 4, "name": "keep-b"}]
+    assert list(ctx.preload(jts)) == jts
+    assert asked == [[1, 4]]
+    assert ctx.schedules_for(1) == [{"id": 10, "unified_job_template": 1}]
+    assert ctx.schedules_for(1) is None  # handed out once
+    assert ctx.schedules_for(2) is None
+
+
+def test_preload_batches_and_shards(monkeypatch):
+    asked = fake_schedules(monkeypatch)
+    monkeypatch.setattr(mjt, "SCHEDULE_BATCH", 3)
+    ctx = mjt.RunContext(make_args(shard=(1, 2)))
+    ctx.prepare({}, None, None)
+    jts = [{"id": i, "name": f"jt{i}"} for i in range(1, 8)]
+    assert list(ctx.preload(jts)) == jts
+    mine = [i for i in range(1, 8) if mjt.awx_shards.in_shard(i, (1, 2))]
+    assert [i for ids in asked for i in ids] == mine
+    assert all(len(ids) <= 3 for ids in asked)
+
+
+BAD = "DTSTART:20250101T000000Z\nRRULE:FREQ=YEARLY;INTERVAL=1;BYMONTH=2;BYMONTHDAY=30"
+GOOD = "DTSTART:20250101T000000Z\nRRULE:FREQ=DAILY;INTERVAL=1"
+
+
+def test_preload_reports_every_rejected_rrule_before_the_first_template(monkeypatch, capsys):
+    monkeypatch.setattr(mjt, "SCHEDULE_BATCH", 2)
+
+    def iter_pages(url, hdrs, verify, window=None):
+        for i in parse_qs(urlsplit(url).query)["unified_job_template__in"][0].split(","):
+            i = int(i)
+            yield {"id": i * 10, "name": f"s{i}", "unified_job_template": i, "extra_data": {},
+                   "rrule": BAD if i in (1, 3) else GOOD}
+
+    monkeypatch.setattr(mjt.awx_http, "iter_pages", iter_pages)
+    ctx = mjt.RunContext(make_args())
+    ctx.prepare({}, None, None)
+    jts = iter(ctx.preload([{"id": i, "name": f"jt{i}"} for i in (1, 2, 3)]))
+    first = next(jts)
+    out = capsys.readouterr().out
+    assert first["id"] == 1
+    assert "WARN: 2 schedule(s) fail rrule validation" in out
+    assert "jt1: 's1'" in out and "jt3: 's3'" in out
+    assert out.count('"schedule.invalid"') == 2
+    assert ctx.invalid_schedules == 2
+
+    schedules, rejected = mjt.read_schedules(ctx.args, first, ctx)
+    assert [s["id"] for s in schedules] == [10] and rejected == {10}
+    assert mjt.read_schedules(ctx.args, {"id": 2, "name": "jt2"}, ctx)[1] == set()
+    assert "WARN" not in capsys.readouterr().out  # reported once, up front
+    assert ctx.invalid_schedules == 2
+
+
+def test_schedules_not_preloaded_are_checked_per_template(monkeypatch, capsys):
+    monkeypatch.setattr(mjt, "GET", lambda url, hdrs, verify: {"results": [
+        {"id": 50, "name": "s5", "unified_job_template": 5, "extra_data": {}, "rrule": BAD}]})
+    ctx = mjt.RunContext(make_args())
+    schedules, rejected = mjt.read_schedules(ctx.args, {"id": 5, "name": "jt5"}, ctx)
+    assert rejected == {50}
+    out = capsys.readouterr().out
+    assert "  WARN: 1 schedule(s) fail rrule validation" in out and "    's5': " in out
+    assert ctx.invalid_schedules == 1
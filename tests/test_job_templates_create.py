@@ -0,0 +1,44 @@
+import argparse
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import migrate_job_templates as mjt
+
+
+def make_args(**kw):
+    args = argparse.Namespace(awx_host="https://awx", aap_host="https://aap", aap_token="t", organization_id=1,
+                              verify_tls=True, schedules_only=False, dry_run=False, force_ee_id=5)
+    vars(args).update(kw)
+    return args
+
+
+def aap_job_templates(other_shard_creates):
+    """AAP where another --shard process creates the same-name JT just before our POST arrives."""
+    jts = []
+
+    def route(method, url, payload):
+        u = urlsplit(url)
+        if method == "GET" and u.path.endswith("/job_templates/"):
+            name = parse_qs(u.query)["name"][0]
+            return 200, {"count": 0, "results": [jt for jt in jts if jt["name"] == name]}
+        if method == "POST" and u.path.endswith("/job_templates/"):
+            if other_shard_creates:
+                jts.append({"id": 77, "name": payload["name"]})
+            return 400, {"__all__": ["Job Template with this Name and Organization already exists."]}
+        raise AssertionError(f"unexpected {method} {url}")
+    return route
+
+
+def test_create_conflict_reuses_the_template_another_shard_created(fake_http, capsys):
+    http = fake_http(aap_job_templates(other_shard_creates=True))
+    jt_id, existing = mjt.find_or_create_jt(make_args(), {"id": 3, "name": "deploy"}, 10, 50, 5)
+    assert (jt_id, existing) == (77, {"id": 77, "name": "deploy"})
+    assert [m for m, _, _ in http.calls] == ["GET", "POST", "GET"]
+    assert "FOUND existing JT (created meanwhile): deploy -> AAP id 77" in capsys.readouterr().out
+
+
+def test_create_failure_without_a_template_is_raised(fake_http):
+    fake_http(aap_job_templates(other_shard_creates=False))
+    with pytest.raises(RuntimeError, match="-> 400"):
+        mjt.find_or_create_jt(make_args(), {"id": 3, "name": "deploy"}, 10, 50, 5)
@@ -0,0 +1,56 @@
+import pytest
+
+import awx_journal
+
+AAP = "https://aap"
+AWX = ["https://awx"]
+
+
+def write_run(path, *steps):
+    j = awx_journal.Journal(str(path), AAP, AWX)
+    for obj, step, data in steps:
+        j.record(obj, step, **data)
+    j.close()
+
+
+def test_resume_skips_recorded_steps(tmp_path):
+    path = tmp_path / "j.ndjson"
+    write_run(path, ("jt:1", "jt", {"id": 7}), ("jt:1", "done", {}))
+    j = awx_journal.Journal(str(path), AAP, AWX, resume=True)
+    assert j.done("jt:1", "jt")["id"] == 7
+    assert j.done("jt:2", "jt") is None
+    assert j.counts == {"skipped": 1, "recorded": 0, "loaded": 2}
+    j.close()
+
+
+def test_torn_last_line_is_ignored_and_appends_start_on_a_new_line(tmp_path):
+    path = tmp_path / "j.ndjson"
+    write_run(path, ("jt:1", "jt", {"id": 7}))
+    with open(path, "ab") as f:
+        f.write(b'{"o":"jt:1","step":"sur')  # killed mid-write
+    j = awx_journal.Journal(str(path), AAP, AWX, resume=True)
+    assert j.counts["loaded"] == 1
+    j.record("jt:1", "survey")
+    j.close()
+    lines = path.read_bytes().splitlines()
+    assert lines[2] == b'{"o":"jt:1","step":"sur'
+    j = awx_journal.Journal(str(path), AAP, AWX, resume=True)
+    assert j.done("jt:1", "survey") is not None
+    assert j.counts["loaded"] == 2
+    j.close()
+
+
+def test_without_resume_nothing_is_skipped(tmp_path):
+    path = tmp_path / "j.ndjson"
+    write_run(path, ("jt:1", "jt", {"id": 7}))
+    j = awx_journal.Journal(str(path), AAP, AWX)
+    assert j.done("jt:1", "jt") is None
+    j.close()
+
+
+@pytest.mark.parametrize("aap, awx", [("https://other-aap", AWX), (AAP, ["https://other-awx"]), (AAP, [])])
+def test_resume_against_other_hosts_is_refused(tmp_path, aap, awx):
+    path = tmp_path / "j.ndjson"
+    write_run(path, ("jt:1", "jt", {"id": 7}))
+    with pytest.raises(SystemExit, match="was written for"):
+        awx_journal.Journal(str(path), aap, awx, resume=True)
@@ -0,0 +1,74 @@
+import argparse
+import json
+
+import pytest
+
+import awx_ledger
+import migrate_job_templates as mjt
+import migrate_projects as mp
+
+AWX, AAP = "https://awx", "https://aap"
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    led = awx_ledger.Ledger(str(tmp_path / "ledger.sqlite"))
+    yield led
+    led.close()
+
+
+def aap_with(ids):
+    """AAP answering GET <kind>/<id>/ with 200 for the ids it still has and 404 for the rest."""
+    def route(method, url, payload):
+        oid = int(url.rstrip("/").rsplit("/", 1)[1])
+        return (200, {"id": oid, "name": f"obj{oid}"}) if oid in ids else (404, {"detail": "Not found."})
+    return route
+
+
+def args():
+    return argparse.Namespace(awx_host=AWX, aap_host=AAP, aap_token="t", verify_tls=True, dry_run=False)
+
+
+def test_record_is_keyed_by_both_hosts(ledger):
+    ledger.record("job_templates", AWX, 4, AAP, 40, "jt4")
+    ledger.record("job_templates", AWX, 4, AAP, 40, "jt4")  # unchanged: not recorded again
+    ledger.record("job_templates", "https://prod-awx", 4, AAP, 41, "jt4")
+    ledger.record("job_templates", AWX, 5, AAP, -1, "dry-run")  # placeholder ids are never stored
+    assert ledger.lookup("job_templates", AWX, 4, AAP) == 40
+    assert ledger.lookup("job_templates", "https://prod-awx", 4, AAP) == 41
+    assert ledger.lookup("job_templates", AWX, 4, "https://other-aap") is None
+    assert ledger.lookup("job_templates", AWX, 5, AAP) is None
+    assert ledger.counts["recorded"] == 2
+
+
+def test_jt_lookup_evicts_stale_entries(ledger, fake_http, monkeypatch):
+    monkeypatch.setattr(mjt, "_ledger", ledger)
+    monkeypatch.setattr(mjt, "_catalog", None)
+    fake_http(aap_with({40}))
+    ledger.record("job_templates", AWX, 4, AAP, 40, "jt4")
+    ledger.record("job_templates", AWX, 5, AAP, 50, "jt5")
+    assert mjt.ledger_lookup(args(), "job_templates", 4)["id"] == 40
+    assert mjt.ledger_lookup(args(), "job_templates", 5) is None  # AAP 50 was deleted
+    assert ledger.lookup("job_templates", AWX, 5, AAP) is None
+    assert mjt.ledger_lookup(args(), "job_templates", 6) is None  # never mapped
+    assert ledger.counts == {"hit": 1, "stale": 1, "recorded": 2}
+
+
+def test_project_lookup_evicts_stale_entries(ledger, fake_http, monkeypatch):
+    monkeypatch.setattr(mp, "_ledger", ledger)
+    monkeypatch.setattr(mp, "_catalog", None)
+    http = fake_http(aap_with(set()))
+    ledger.record("projects", AWX, 1, AAP, 10, "p1")
+    assert mp.ledger_project(args(), AWX, 1) is None
+    assert mp.ledger_project(args(), AWX, 1) is None  # evicted: no second GET
+    assert len(http.calls) == 1
+    assert ledger.counts["stale"] == 1
+
+
+def test_export_json(ledger, tmp_path):
+    ledger.record("projects", AWX, 1, AAP, 10, "p1")
+    out = tmp_path / "ledger.json"
+    assert ledger.export_json(str(out)) == 1
+    rows = json.loads(out.read_text())["mappings"]
+    assert [(r["kind"], r["awx_id"], r["aap_id"], r["name"]) for r in rows] == [("projects", 1, 10, "p1")]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
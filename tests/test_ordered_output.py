@@ -0,0 +1,86 @@
+import sys
+import threading
+
+import awx_http
+import migrate_projects as mp
+
+
+def test_slots_are_released_in_order(capsys):
+    out = awx_http.OrderedOutput()
+    out.install()
+    try:
+        print("before")  # unbound: straight through
+        for slot in (3, 1, 2):
+            out.bind(slot)
+            print(f"slot {slot} out")
+            print(f"slot {slot} err", file=sys.stderr)
+        out.bind(None)
+        out.finish(3)
+        out.finish(2)
+        print("unbound meanwhile")
+        out.finish(1)
+    finally:
+        out.uninstall()
+    captured = capsys.readouterr()
+    assert captured.out == "before\nunbound meanwhile\nslot 1 out\nslot 2 out\nslot 3 out\n"
+    assert captured.err == "slot 1 err\nslot 2 err\nslot 3 err\n"
+
+
+def test_header_only_for_slots_that_printed(capsys):
+    out = awx_http.OrderedOutput(header=lambda slot: f"--- {slot}\n")
+    out.install()
+    try:
+        out.bind(2)
+        print("two")
+        out.bind(None)
+        out.finish(1)
+        out.finish(2)
+    finally:
+        out.uninstall()
+    assert capsys.readouterr().out == "--- 2\ntwo\n"
+
+
+def test_threads_finishing_in_any_order(capsys):
+    out = awx_http.OrderedOutput()
+    n = 20
+    gates = [threading.Event() for _ in range(n + 1)]
+
+    def work(slot):
+        out.bind(slot)
+        gates[slot].wait(5)
+        print(f"[{slot}] done")
+        out.bind(None)
+        out.finish(slot)
+
+    out.install()
+    try:
+        threads = [threading.Thread(target=work, args=(s,)) for s in range(1, n + 1)]
+        for t in threads:
+            t.start()
+        for slot in reversed(range(1, n + 1)):
+            gates[slot].set()
+        for t in threads:
+            t.join()
+    finally:
+        out.uninstall()
+    assert capsys.readouterr().out == "".join(f"[{s}] done\n" for s in range(1, n + 1))
+
+
+def test_project_pool_output_results_and_cursor(tmp_path, capsys):
+    cursor = tmp_path / "cursor"
+    gates = {idx: threading.Event() for idx in (1, 2, 3)}
+
+    def step(idx):
+        gates[idx].wait(5)
+        print(f"[{idx}] CREATED")
+        return idx * 10
+
+    with mp.ProjectPool(3, str(cursor)) as pool:
+        for idx in (1, 2, 3):
+            pool.submit(idx, 100 + idx, step, idx)
+        gates[3].set()
+        gates[2].set()
+        gates[1].set()
+    assert pool.results == {1: 10, 2: 20, 3: 30}
+    assert capsys.readouterr().out == "[1] CREATED\n[2] CREATED\n[3] CREATED\n"
+    assert cursor.read_text() == "103\n"
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+import awx_http
+
+
+def test_yields_in_order_with_fetch_results_and_errors():
+    def fetch(obj):
+        if obj == 3:
+            raise RuntimeError("bad sub-resource")
+        return obj * 10
+
+    got = [(obj, fut.exception() or fut.result()) for obj, fut in awx_http.read_ahead(range(1, 6), 2, fetch)]
+    assert [obj for obj, _ in got] == [1, 2, 3, 4, 5]
+    assert [r for _, r in got][:2] == [10, 20]
+    assert isinstance(got[2][1], RuntimeError)  # one bad object does not end the stream
+    assert [r for _, r in got][3:] == [40, 50]
+
+
+def test_reader_stays_at_most_depth_ahead():
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(obj):
+        with lock:
+            fetched.append(obj)
+
+    it = awx_http.read_ahead(range(100), 3, fetch)
+    next(it)
+    threading.Event().wait(0.2)  # give the reader every chance to run away
+    with lock:
+        # one handed out, `depth` queued, one fetched and waiting for room
+        assert len(fetched) <= 1 + 3 + 1
+    assert len(list(it)) == 99
+
+
+def test_failing_listing_ends_the_stream_where_it_failed():
+    def listing():
+        yield 1
+        yield 2
+        raise RuntimeError("page 3 -> 500")
+
+    it = awx_http.read_ahead(listing(), 4)
+    assert [obj for obj, _ in [next(it), next(it)]] == [1, 2]
+    with pytest.raises(RuntimeError, match="page 3"):
+        next(it)
+
+
+def test_fetch_output_goes_to_the_objects_slot(capsys):
+    out = awx_http.OrderedOutput()
+    out.install()
+    try:
+        for seq, (obj, fut) in enumerate(awx_http.read_ahead("abc", 2, lambda o: print(f"read {o}"), out), start=1):
+            out.bind(seq)
+            print(f"write {obj}")
+            out.bind(None)
+            out.finish(seq)
+    finally:
+        out.uninstall()
+    assert capsys.readouterr().out == "read a\nwrite a\nread b\nwrite b\nread c\nwrite c\n"
+
+
+def test_closing_early_stops_the_reader():
+    started = threading.Event()
+
+    def endless():
+        n = 0
+        while True:
+            started.set()
+            n += 1
+            yield n
+
+    before = set(threading.enumerate())
+    it = awx_http.read_ahead(endless(), 2)
+    next(it)
+    reader = [t for t in threading.enumerate() if t not in before]
+    it.close()
+    assert started.is_set() and len(reader) == 1
+    reader[0].join(5)  # its blocked put gives up once it sees the stop flag
+    assert not reader[0].is_alive()
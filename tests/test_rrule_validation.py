@@ -0,0 +1,95 @@
+import datetime as dt
+import time
+
+import pytest
+
+import migrate_job_templates as mjt
+
+TZID_RULE = "DTSTART;TZID=America/Chicago:20250101T010000\nRRULE:FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,WE"
+Z_RULE = "DTSTART:20250101T010000Z\nRRULE:FREQ=MONTHLY;INTERVAL=1;BYMONTHDAY=-1"
+
+
+@pytest.fixture(params=["dateutil", "stdlib"])
+def engine(request, monkeypatch):
+    """Run each test once through dateutil (as Controller does) and once through _has_occurrence."""
+    if request.param == "dateutil":
+        pytest.importorskip("dateutil")
+    else:
+        monkeypatch.setattr(mjt, "dateutil_rrule", None)
+    return request.param
+
+
+@pytest.mark.parametrize("text", [TZID_RULE, Z_RULE])
+def test_valid_rules_pass(engine, text):
+    assert mjt.validate_rrule(text) == []
+
+
+@pytest.mark.parametrize("until", ["20261231", "20261231T235959Z"])
+@pytest.mark.parametrize("text", [TZID_RULE, Z_RULE])
+def test_until_date_only_or_utc(engine, text, until):
+    assert mjt.validate_rrule(f"{text};UNTIL={until}") == []
+
+
+@pytest.mark.parametrize("text", [TZID_RULE, Z_RULE])
+def test_until_local_time_rejected(engine, text):
+    assert mjt.validate_rrule(f"{text};UNTIL=20261231T000000") == [
+        "RRULE UNTIL values must be specified in UTC when DTSTART is timezone-aware"]
+
+
+@pytest.mark.parametrize("text", [
+    "DTSTART:20250101T010000Z\nRRULE:FREQ=DAILY;INTERVAL=1;UNTIL=20241231",
+    "DTSTART;TZID=America/Chicago:20250101T010000\nRRULE:FREQ=YEARLY;INTERVAL=1;BYMONTH=2;BYMONTHDAY=30",
+])
+def test_rule_without_occurrence(engine, text):
+    assert mjt.validate_rrule(text) == ["rrule never produces an occurrence"]
+
+
+@pytest.mark.parametrize("rule", [
+    "FREQ=DAILY;INTERVAL=1;BYMONTH=2;BYMONTHDAY=30",
+    "FREQ=HOURLY;INTERVAL=1;BYMONTH=2;BYMONTHDAY=30",
+    "FREQ=MINUTELY;INTERVAL=1;BYMONTH=2;BYMONTHDAY=30",
+    "FREQ=DAILY;INTERVAL=7;BYDAY=TU",  # DTSTART is a Wednesday: every 7th day is one too
+    "FREQ=MONTHLY;INTERVAL=12;BYMONTH=2",
+])
+def test_rule_without_occurrence_is_rejected_quickly(engine, rule):
+    started = time.monotonic()
+    assert mjt.validate_rrule(f"DTSTART:20250101T000000Z\nRRULE:{rule}") == ["rrule never produces an occurrence"]
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.parametrize("rule", ["FREQ=WEEKLY;INTERVAL=2;BYDAY=TU", "FREQ=MONTHLY;INTERVAL=13;BYMONTH=2"])
+def test_interval_reaching_a_match(engine, rule):
+    assert mjt.validate_rrule(f"DTSTART:20250101T000000Z\nRRULE:{rule}") == []
+
+
+def test_until_is_a_utc_date_next_to_a_local_dtstart(engine):
+    # 08:00 on Jan 2 in Auckland is 19:00 UTC on Jan 1, before UNTIL
+    text = "DTSTART;TZID=Pacific/Auckland:20250102T080000\nRRULE:FREQ=DAILY;INTERVAL=1;UNTIL=20250101"
+    assert mjt.validate_rrule(text) == []
+
+
+@pytest.mark.parametrize("text, problem", [
+    ("RRULE:FREQ=DAILY;INTERVAL=1", "Valid DTSTART required"),
+    ("DTSTART:20250101T010000\nRRULE:FREQ=DAILY;INTERVAL=1", "DTSTART cannot be a naive datetime"),
+    ("DTSTART:20250101T010000Z\nRRULE:FREQ=DAILY", "INTERVAL required in rrule."),
+    ("DTSTART:20250101T010000Z\nRRULE:FREQ=SECONDLY;INTERVAL=1", "SECONDLY is not supported."),
+    ("DTSTART:20250101T010000Z\nRRULE:FREQ=DAILY;INTERVAL=1;COUNT=2;UNTIL=20261231",
+     "UNTIL and COUNT must not occur in the same recurrence."),
+    ("DTSTART:20250101T010000Z\nRRULE:FREQ=MONTHLY;INTERVAL=1;BYDAY=1MO", "BYDAY with numeric prefix not supported."),
+])
+def test_controller_rules(text, problem):
+    assert any(p.startswith(problem) for p in mjt.validate_rrule(text))
+
+
+def test_has_occurrence_defaults_from_dtstart():
+    start = dt.date(2025, 1, 31)
+    # MONTHLY without BYMONTHDAY repeats DTSTART's day
+    assert mjt._has_occurrence(start, None, "MONTHLY", {}, [])
+    assert mjt._has_occurrence(start, dt.date(2025, 1, 31), "MONTHLY", {}, [])
+    # negative BYMONTHDAY counts from the end of the month
+    assert mjt._has_occurrence(dt.date(2025, 2, 1), dt.date(2025, 2, 28), "MONTHLY", {"BYMONTHDAY": [-1]}, [])
+    # Feb 30 never comes, within the 28-year horizon or otherwise
+    assert not mjt._has_occurrence(start, None, "YEARLY", {"BYMONTH": [2], "BYMONTHDAY": [30]}, [])
+    # WEEKLY without BYDAY stays on DTSTART's weekday
+    assert not mjt._has_occurrence(dt.date(2025, 1, 6), dt.date(2025, 1, 5), "WEEKLY", {}, [])
+    assert mjt._has_occurrence(dt.date(2025, 1, 1), dt.date(2025, 1, 7), "DAILY", {}, [0])
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import migrate_job_templates as mjt
+
+
+def test_order_keeps_fixed_order_until_a_variant_is_known():
+    stats = mjt.VariantStats(None, "https://aap")
+    assert stats.order() == list(mjt.SCHEDULE_VARIANTS)
+    stats.record("full-id", False)
+    stats.record("bare-url", True)
+    assert stats.order() == ["bare-url", "full-url", "bare-id", "full-id"]
+
+
+def test_save_and_reload_per_host(tmp_path):
+    path = str(tmp_path / "sub" / "variants.json")
+    a = mjt.VariantStats(path, "https://aap-a")
+    a.save()  # nothing attempted: no file
+    assert not (tmp_path / "sub").exists()
+    a.record("bare-id", True)
+    a.record("full-id", False)
+    a.save()
+    b = mjt.VariantStats(path, "https://aap-b")
+    b.record("full-url", True)
+    b.save()
+    saved = json.loads(open(path).read())["hosts"]
+    assert saved["https://aap-a"]["bare-id"] == {"ok": 1, "fail": 0}
+    assert saved["https://aap-b"]["full-url"] == {"ok": 1, "fail": 0}
+    assert mjt.VariantStats(path, "https://aap-a").order()[0] == "bare-id"
+    assert mjt.VariantStats(path, "https://aap-b").order()[0] == "full-url"
+    assert mjt.VariantStats(path, "https://aap-c").order() == list(mjt.SCHEDULE_VARIANTS)
+    assert [p.name for p in (tmp_path / "sub").iterdir()] == ["variants.json"]
+
+
+def test_old_history_is_scaled_down(tmp_path):
+    path = tmp_path / "variants.json"
+    path.write_text(json.dumps({"version": 1, "hosts": {"https://aap": {
+        "full-id": {"ok": 800, "fail": 1200}, "gone-variant": {"ok": 5, "fail": 0}}}}))
+    stats = mjt.VariantStats(str(path), "https://aap")
+    assert stats.total["full-id"] == {"ok": 80, "fail": 120}
+    assert "gone-variant" not in stats.total
+    for _ in range(60):  # a fresh streak outweighs the scaled-down history
+        stats.record("full-id", True)
+    assert stats.order()[0] == "full-id"
+
+
+def test_unreadable_file_is_ignored(tmp_path, capsys):
+    path = tmp_path / "variants.json"
+    path.write_text("{not json")
+    assert mjt.VariantStats(str(path), "https://aap").order() == list(mjt.SCHEDULE_VARIANTS)
+    assert "ignoring unreadable" in capsys.readouterr().err
+
+
+SCHEDULE = {"id": 7, "name": "nightly", "rrule": "DTSTART:20250101T020000Z RRULE:FREQ=DAILY;INTERVAL=1",
+            "timezone": "UTC", "extra_data": {}}
+
+
+def create(fake_http, replies, stats):
+    """try_create_schedule against AAP answering the schedule POSTs with `replies` in turn."""
+    replies = iter(replies)
+
+    def route(method, url, payload):
+        if method == "GET":  # create_json's lookup before a retry
+            return 200, {"results": []}
+        return next(replies)
+
+    http = fake_http(route)
+    created = mjt.try_create_schedule("https://aap", "t", True, 5, None, dict(SCHEDULE), stats)
+    return created, [p for m, p, _ in http.calls if m == "POST"]
+
+
+def test_rejected_variant_is_recorded_and_next_one_tried(fake_http, capsys):
+    stats = mjt.VariantStats(None, "https://aap")
+    created, posts = create(fake_http, [(400, {"rrule": ["bad"]}), (201, {"id": 11})], stats)
+    assert created == {"id": 11}
+    assert len(posts) == 2
+    assert stats.run["full-id"] == {"ok": 0, "fail": 1}
+    assert stats.run["full-url"] == {"ok": 1, "fail": 0}
+
+
+def test_outage_stops_the_variant_loop_without_touching_stats(fake_http, capsys):
+    stats = mjt.VariantStats(None, "https://aap")
+    with pytest.raises(mjt.awx_http.TransientHTTPError):
+        create(fake_http, [(503, "down")] * 20, stats)
+    out = capsys.readouterr().out
+    assert out.count('"schedule.create.fail"') == 1
+    assert '"variant":"full-id"' in out.replace(' ', '') and '"full-url"' not in out
+    assert stats.attempts() == 0
+
+
+def test_server_errors_are_not_held_against_a_variant(fake_http, capsys):
+    stats = mjt.VariantStats(None, "https://aap")
+    created, posts = create(fake_http, [(500, "oops")] * 4, stats)
+    assert created is None and len(posts) == 4
+    assert stats.attempts() == 0
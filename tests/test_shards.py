@@ -0,0 +1,115 @@
+import pytest
+
+import awx_codec
+import awx_shards
+
+
+def test_receipt_summary_keeps_baseline_lines_first(tmp_path):
+    path = tmp_path / "receipt.txt"
+    awx_shards.write_receipt(str(path), ["AWX: a"], ["[1] MATCH: p"],
+                             {"matches": 1, "already": 2, "migrated": 3, "filtered": 4, "failures": 5})
+    summary = path.read_text().split("\nSummary:\n")[1].splitlines()
+    assert summary == [
+        "  Matches (skipped): 1",
+        "  Migrated:          3",
+        "  Filtered:          4",
+        "  Failures:          5",
+        "  Already migrated:  2",
+    ]
+
+
+def ev(event, **fields):
+    return awx_codec.dumps(dict(event=event, **fields)) + "\n"
+
+
+def shard_out(tmp_path, lab, slots, summary):
+    """A shard's stdout: start-up text, its templates' slots, the end marker and its totals."""
+    text = ["Loaded catalog\n", ev("preflight.ok", ts="t" + lab)]
+    for seq, name in slots:
+        text += [ev(awx_shards.SLOT_EVENT, seq=seq), f"CREATED JT: {name}\n", ev("jt.done", name=name)]
+    text += [ev(awx_shards.END_EVENT, shard=lab), f"Migrated attempts: {summary['migrated']}\n",
+             ev(awx_shards.SUMMARY_EVENT, migrated=summary["migrated"], failures=summary["failures"]),
+             ev("http.stats", shard=lab)]
+    path = tmp_path / f"shard-{lab.replace('/', '-')}.out"
+    path.write_text("".join(text))
+    return str(path)
+
+
+@pytest.fixture
+def shards(tmp_path):
+    return [shard_out(tmp_path, "2/2", [(2, "b"), (3, "c")], {"migrated": 2, "failures": 1}),
+            shard_out(tmp_path, "1/2", [(1, "a"), (4, "d")], {"migrated": 2, "failures": 0})]
+
+
+def test_in_shard_is_a_partition():
+    owners = [[i for i in (1, 2, 3) if awx_shards.in_shard(obj_id, (i, 3))] for obj_id in range(200)]
+    assert all(len(o) == 1 for o in owners)
+    assert {o[0] for o in owners} == {1, 2, 3}
+    assert all(awx_shards.in_shard(obj_id, None) for obj_id in range(5))
+
+
+def test_merge_events_restores_listing_order_and_sums_totals(shards):
+    merged = awx_shards.merge_events(shards)
+    assert [e["event"] for e in merged] == ["preflight.ok", "jt.done", "jt.done", "jt.done", "jt.done",
+                                            "bulk.summary", "http.stats", "http.stats"]
+    assert [e["name"] for e in merged if e["event"] == "jt.done"] == ["a", "b", "c", "d"]
+    assert [e for e in merged if e["event"] == "bulk.summary"] == [
+        {"event": "bulk.summary", "migrated": 4, "failures": 1}]
+
+
+def test_merge_events_keeps_identical_run_level_events_once(tmp_path):
+    paths = []
+    for lab in ("1/2", "2/2"):
+        path = tmp_path / f"{lab[0]}.out"
+        path.write_text(ev("aap.catalog", ts=lab, objects=3) + ev(awx_shards.END_EVENT, shard=lab))
+        paths.append(str(path))
+    assert [e["event"] for e in awx_shards.merge_events(paths)] == ["aap.catalog"]
+
+
+def test_merge_console_orders_template_text(shards):
+    assert awx_shards.merge_console(shards) == (
+        "== shard 1/2 ==\nLoaded catalog\n== shard 2/2 ==\nLoaded catalog\n"
+        "CREATED JT: a\nCREATED JT: b\nCREATED JT: c\nCREATED JT: d\n"
+        "== shard 1/2 ==\nMigrated attempts: 2\n== shard 2/2 ==\nMigrated attempts: 2\n")
+
+
+def test_merge_refuses_missing_or_unfinished_shards(tmp_path, shards):
+    with pytest.raises(SystemExit, match="Need shards"):
+        awx_shards.merge_events(shards[:1])
+    unfinished = tmp_path / "x.out"
+    unfinished.write_text(ev(awx_shards.SLOT_EVENT, seq=5))
+    with pytest.raises(SystemExit, match="no shard end marker"):
+        awx_shards.merge_console(shards + [str(unfinished)])
+
+
+def test_merge_receipts_matches_a_single_receipt(tmp_path):
+    header = ["AWX: prod", "AAP: aap"]
+    lines = [(1, "[1] MATCH: p1"), (2, "[2] CREATED: p2"), (3, "[3] SKIP (filtered): p3"), (4, "[4] EXISTS: p4")]
+    counts = {"matches": 1, "already": 1, "migrated": 1, "filtered": 1, "failures": 0}
+    single = tmp_path / "single.txt"
+    awx_shards.write_receipt(str(single), header, [line for _, line in lines], counts)
+    parts = []
+    for lab, mine, part_counts in (("1/2", lines[::2], {"matches": 1, "filtered": 1}),
+                                   ("2/2", lines[1::2], {"migrated": 1, "already": 1})):
+        path = tmp_path / f"part-{lab[0]}.json"
+        awx_shards.write_partial_receipt(str(path), awx_shards.parse_shard(lab), header, mine, part_counts)
+        parts.append(str(path))
+    merged = tmp_path / "merged.txt"
+    assert awx_shards.merge_receipts(parts[::-1], str(merged)) == 4
+    assert merged.read_text() == single.read_text()
+
+
+def test_merge_receipts_refuses_other_runs(tmp_path):
+    parts = []
+    for lab, host in (("1/2", "a"), ("2/2", "b")):
+        path = tmp_path / f"part-{lab[0]}.json"
+        awx_shards.write_partial_receipt(str(path), awx_shards.parse_shard(lab), [host], [], {})
+        parts.append(str(path))
+    with pytest.raises(SystemExit, match="header differs"):
+        awx_shards.merge_receipts(parts, str(tmp_path / "out.txt"))
+
+
+@pytest.mark.parametrize("text", ["3", "0/2", "3/2", "a/b"])
+def test_parse_shard_rejects(text):
+    with pytest.raises(Exception):
+        awx_shards.parse_shard(text)
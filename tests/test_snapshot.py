@@ -0,0 +1,66 @@
+import pytest
+
+import awx_snapshot
+from fake_awx import FakeAWX
+
+
+def populate(awx):
+    for i in (1, 2, 3):
+        awx.put("projects", i, name=f"proj{i}", scm_url=f"https://git/r{i}.git", scm_branch="main")
+    awx.put("inventories", 1, name="inv")
+    for c in (1, 2, 3, 4):
+        awx.put("credentials", c, name=f"cred{c}", kind="ssh")
+    for n in (1, 2):
+        awx.put("notification_templates", n, name=f"mail{n}", notification_type="email")
+    for j in (1, 2, 3):
+        awx.put("job_templates", j, name=f"jt{j}", project=j, inventory=1, survey_enabled=j == 1)
+        awx.put("schedules", 10 * j, name=f"s{j}", unified_job_template=j, rrule="DTSTART:20250101T000000Z",
+                extra_data={})
+    awx.surveys[1] = {"name": "", "description": "", "spec": [{"variable": "x"}]}
+    awx.jt_creds = {1: [1], 2: [1, 2, 3, 4]}
+    awx.attach(1, "started", 1)
+    awx.attach(2, "error", 2)
+
+
+@pytest.fixture
+def awx(fake_http):
+    awx = FakeAWX()
+    populate(awx)
+    fake_http(awx.route)
+    return awx
+
+
+def test_crawl_reads_lists_and_per_jt_details(awx, tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    counts = awx_snapshot.crawl(awx.host, "t", True, path, workers=4)
+    assert counts == {"projects": 3, "job_templates": 3, "credentials": 4, "notification_templates": 2,
+                      "schedules": 3, "survey_specs": 1, "jt_credentials": 1, "jt_notifications": 2}
+    snap = awx_snapshot.open_for(path, awx.host + "/")
+    assert [o["name"] for o in snap.objects("job_templates")] == ["jt1", "jt2", "jt3"]
+    assert [o["id"] for o in snap.objects("projects", after_id=1)] == [2, 3]
+    assert snap.survey_spec(1)["spec"] == [{"variable": "x"}]
+    assert snap.survey_spec(2) is None
+    assert [c["name"] for c in snap.jt_credentials(1)] == ["cred1"]  # joined from summary_fields
+    assert [c["name"] for c in snap.jt_credentials(2)] == ["cred1", "cred2", "cred3", "cred4"]  # crawled sub-list
+    assert [s["id"] for s in snap.children("schedules", 2)] == [20]
+    assert [n["name"] for n in snap.jt_notifications(1)["started"]] == ["mail1"]
+    assert {jt: {k: [n["id"] for n in v] for k, v in m.items()} for jt, m in snap.notification_map().items()} == {
+        1: {"started": [1], "success": [], "error": []}, 2: {"started": [], "success": [], "error": [2]}}
+    snap.close()
+    assert not (tmp_path / "snap.sqlite.partial").exists()
+
+
+def test_snapshot_is_only_used_for_its_host(awx, tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    awx_snapshot.crawl(awx.host, "t", True, path)
+    with pytest.raises(SystemExit, match="was taken from"):
+        awx_snapshot.open_for(path, "https://other-awx")
+
+
+def test_deleted_ids_probes_by_count(awx, fake_http, monkeypatch):
+    monkeypatch.setattr(awx_snapshot, "PROBE_CHUNK", 2)
+    http = fake_http(awx.route)
+    awx.delete("credentials", 3)
+    assert awx_snapshot.deleted_ids(awx.host, "credentials", [1, 2, 3, 4], {}, True) == [3]
+    # chunk [1, 2] is answered by its count alone; only [3, 4] is listed
+    assert len(http.calls) == 3
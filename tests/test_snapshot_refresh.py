@@ -0,0 +1,135 @@
+import sqlite3
+
+import pytest
+
+import awx_snapshot
+import migrate_projects as mp
+from fake_awx import FakeAWX
+from test_snapshot import populate
+
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT kind, id, name, parent, modified, body FROM objects ORDER BY kind, id").fetchall()
+
+
+@pytest.fixture
+def awx(fake_http):
+    awx = FakeAWX()
+    populate(awx)
+    fake_http(awx.route)
+    return awx
+
+
+def change(awx):
+    """Edits of every kind refresh() has to notice, including ones that do not bump the JT's modified."""
+    awx.now()
+    awx.put("projects", 2, name="proj2-renamed")         # JT 2's summary_fields.project
+    awx.put("credentials", 3, name="cred3-renamed")      # JT 2's truncated credential list
+    awx.add_credential(1, 4)                             # association: activity stream only
+    awx.attach(3, "success", 1)
+    awx.put("job_templates", 1, description="new survey")
+    awx.surveys[1] = {"name": "", "description": "", "spec": [{"variable": "y"}]}
+    awx.put("job_templates", 4, name="jt4", project=1, inventory=1, survey_enabled=False)
+    awx.put("schedules", 40, name="s4", unified_job_template=4, rrule="DTSTART:20250101T000000Z", extra_data={})
+    awx.delete("job_templates", 2)
+    awx.delete("schedules", 20)
+    awx.put("projects", 2, name="proj2-again")
+
+
+def test_refresh_equals_fresh_crawl(awx, tmp_path):
+    old, fresh = str(tmp_path / "old.sqlite"), str(tmp_path / "fresh.sqlite")
+    awx_snapshot.crawl(awx.host, "t", True, old, workers=4)
+    change(awx)
+    report = awx_snapshot.refresh(old, awx.host, "t", True, workers=4)
+    awx_snapshot.crawl(awx.host, "t", True, fresh, workers=4)
+    assert rows(old) == rows(fresh)
+    assert report["deleted"]["job_templates"] == 1 and report["deleted"]["schedules"] == 1
+    assert report["changed"]["job_templates"] == 3  # 1 (modified), 3 (activity stream), 4 (new)
+
+
+def test_refresh_without_changes_keeps_rows(awx, tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    awx_snapshot.crawl(awx.host, "t", True, path)
+    before = rows(path)
+    report = awx_snapshot.refresh(path, awx.host, "t", True)
+    assert rows(path) == before
+    assert not any(report["changed"].values()) and not any(report["deleted"].values())
+
+
+def test_refresh_refuses_another_host(awx, tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    awx_snapshot.crawl(awx.host, "t", True, path)
+    with pytest.raises(SystemExit, match="was taken from"):
+        awx_snapshot.refresh(path, "https://other-awx", "t", True)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_refreshed_atst_index_is_byte_identical_to_fresh_export(awx, tmp_path, compact):
+    old, fresh = str(tmp_path / "old.json"), str(tmp_path / "fresh.json")
+    awx.put("projects", 4, name="proj4", scm_url="https://git/r3.git", scm_branch="main")  # shares 3's key
+    mp.export_atst_index(awx.host, "t", True, old, compact)
+    awx.now()
+    awx.put("projects", 3, name="proj3-renamed")  # the earlier id of a shared key changes
+    awx.put("projects", 1, scm_branch="dev")
+    awx.put("projects", 5, name="proj5", scm_url="https://git/r5.git", scm_branch="main")
+    awx.delete("projects", 2)
+    assert mp.refresh_atst_index(awx.host, "t", True, old, compact) == "3 changed, 1 deleted"
+    mp.export_atst_index(awx.host, "t", True, fresh, compact)
+    with open(old, "rb") as a, open(fresh, "rb") as b:
+        assert a.read() == b.read()
+    assert mp.load_atst_index_from_file(old)[("https://git/r3", "main")]["name"] == "proj4"
+
+
+def test_refresh_atst_index_falls_back_to_full_export(awx, tmp_path):
+    path = str(tmp_path / "idx.json")
+    assert mp.refresh_atst_index(awx.host, "t", True, path) == "full export"
+    assert set(mp.load_atst_index_from_file(path)) == {(f"https://git/r{i}", "main") for i in (1, 2, 3)}
+
+
+def edited_mid_listing(awx, kind, edit):
+    """AWX route serving 2 objects per page that runs edit() right after the first page of `kind`."""
+    pending = [edit]
+
+    def route(method, url, payload):
+        reply = awx.route(method, url.replace("page_size=200", "page_size=2"), payload)
+        if pending and f"/{kind}/" in url and "page=" not in url and "__gt" not in url:
+            awx.now()
+            pending.pop()()
+        return reply
+    return route
+
+
+def test_refresh_catches_edits_made_during_the_crawl(fake_http, tmp_path):
+    awx = FakeAWX()
+    populate(awx)
+
+    def edit():  # project 1 was just read; project 3, edited later, sets the watermark
+        awx.put("projects", 1, name="proj1-renamed")
+        awx.put("projects", 3, name="proj3-renamed")
+
+    fake_http(edited_mid_listing(awx, "projects", edit))
+    old, fresh = str(tmp_path / "old.sqlite"), str(tmp_path / "fresh.sqlite")
+    awx_snapshot.crawl(awx.host, "t", True, old, workers=4)
+    with sqlite3.connect(old) as db:
+        assert db.execute("SELECT name FROM objects WHERE kind = 'projects' AND id = 1").fetchone() == ("proj1",)
+    awx_snapshot.refresh(old, awx.host, "t", True, workers=4)
+    awx_snapshot.crawl(awx.host, "t", True, fresh, workers=4)
+    assert rows(old) == rows(fresh)
+
+
+def test_refreshed_atst_index_catches_edits_made_during_the_export(fake_http, tmp_path):
+    awx = FakeAWX()
+    populate(awx)
+
+    def edit():
+        awx.put("projects", 1, scm_branch="dev")
+        awx.put("projects", 3, name="proj3-renamed")
+
+    fake_http(edited_mid_listing(awx, "projects", edit))
+    old, fresh = str(tmp_path / "old.json"), str(tmp_path / "fresh.json")
+    mp.export_atst_index(awx.host, "t", True, old)
+    assert mp.refresh_atst_index(awx.host, "t", True, old) == "1 changed, 0 deleted"
+    mp.export_atst_index(awx.host, "t", True, fresh)
+    with open(old, "rb") as a, open(fresh, "rb") as b:
+        assert a.read() == b.read()